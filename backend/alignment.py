@@ -0,0 +1,89 @@
+import heapq
+from bisect import bisect_left
+from itertools import accumulate
+from typing import List, Dict, Optional, Sequence, Tuple
+
+
+class SpeakerTimeline:
+    """Diarization turns indexed for fast overlap queries.
+
+    ``best_speakers`` answers a batch of queries in one sweep by start time:
+    a pointer over the turns, sorted by start, adds each turn once it starts
+    before a query ends, and a heap keyed by end time evicts turns that
+    ended before a query starts. Only turns around a query are scored, so
+    aligning T segments against D turns costs O((T + D) log D) plus the size
+    of the overlaps, however long a single turn is.
+    """
+
+    def __init__(self, turns: List[Dict]):
+        self.turns = sorted(turns, key=lambda turn: turn["start"])
+        self.starts = [turn["start"] for turn in self.turns]
+        # Index of the turn ending latest among turns[:i + 1]
+        self.latest_ends = list(accumulate(
+            range(len(self.turns)),
+            lambda best, i: i if self.turns[i]["end"] > self.turns[best]["end"] else best
+        ))
+
+    def best_speakers(self, intervals: Sequence[Tuple[float, float]]) -> List[Tuple[Optional[str], float]]:
+        """Return, per (start, end) interval, the speaker overlapping it the most and the overlap"""
+        results: List[Tuple[Optional[str], float]] = [(None, 0.0)] * len(intervals)
+        active: List[Tuple[float, int]] = []  # heap of (end, turn index)
+        next_turn = 0
+
+        for q in sorted(range(len(intervals)), key=lambda q: intervals[q][0]):
+            start, end = intervals[q]
+            while next_turn < len(self.turns) and self.turns[next_turn]["start"] < end:
+                heapq.heappush(active, (self.turns[next_turn]["end"], next_turn))
+                next_turn += 1
+            # Queries come by start, so a turn ended here cannot overlap a later one
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+
+            best, best_overlap = None, 0.0
+            for turn_end, i in active:
+                overlap = min(end, turn_end) - max(start, self.turns[i]["start"])
+                # Ties go to the earliest turn, whatever the heap order
+                if overlap > best_overlap or (overlap == best_overlap and best is not None and i < best):
+                    best, best_overlap = i, overlap
+            if best is not None:
+                results[q] = (self.turns[best]["speaker"], best_overlap)
+        return results
+
+    def nearest_speaker(self, time: float) -> Optional[str]:
+        """Return the speaker of the turn closest to a point in time"""
+        if not self.turns:
+            return None
+        # Closest turn starting at or after the time, and of those starting
+        # before it the one ending latest
+        i = bisect_left(self.starts, time)
+        candidates = self.turns[i:i + 1]
+        if i > 0:
+            candidates.append(self.turns[self.latest_ends[i - 1]])
+        return min(
+            candidates,
+            key=lambda turn: max(turn["start"] - time, time - turn["end"], 0.0)
+        )["speaker"]
+
+
+def split_words_by_speaker(
+    words: List[Dict],
+    matches: List[Tuple[Optional[str], float]],
+    timeline: SpeakerTimeline
+) -> List[Tuple[str, List[Dict], bool]]:
+    """Assign each word to a speaker and group consecutive words per speaker.
+
+    ``matches`` holds each word's (speaker, overlap) from
+    ``timeline.best_speakers``; words overlapping no turn go to the nearest
+    one. Returns (speaker, words, overlapped) runs, where ``overlapped``
+    tells whether every word in the run overlapped a diarization turn.
+    """
+    runs = []
+    for word, (speaker, overlap) in zip(words, matches):
+        if speaker is None:
+            speaker = timeline.nearest_speaker((word["start"] + word["end"]) / 2) or "Unknown"
+        if runs and runs[-1][0] == speaker:
+            runs[-1][1].append(word)
+            runs[-1][2] = runs[-1][2] and overlap > 0
+        else:
+            runs.append([speaker, [word], overlap > 0])
+    return [tuple(run) for run in runs]
@@ -0,0 +1,110 @@
+import logging
+from typing import BinaryIO, Iterator, Optional
+import numpy as np
+import soundfile as sf
+from .resampler import StreamingResampler
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SECONDS = 10.0
+INT16_SCALE = np.float32(1.0 / 32768.0)
+
+
+def pcm16_to_float32(pcm: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Scale int16 PCM to float32 in [-1, 1) in one pass, without temporaries"""
+    if out is None:
+        out = np.empty(len(pcm), dtype=np.float32)
+    return np.multiply(pcm, INT16_SCALE, out=out, dtype=np.float32)
+
+
+class PcmWorkspace:
+    """Reusable float32 buffer for converting one session's int16 chunks.
+
+    ``convert`` returns a view into the buffer, which the next call
+    overwrites, so it suits callers that finish with (or copy) a chunk before
+    converting the next one. The buffer grows geometrically and is never
+    shrunk.
+    """
+
+    def __init__(self, initial_samples: int = 0):
+        self._buffer = np.empty(initial_samples, dtype=np.float32)
+
+    def convert(self, pcm: np.ndarray) -> np.ndarray:
+        n = len(pcm)
+        if n > len(self._buffer):
+            self._buffer = np.empty(max(n, 2 * len(self._buffer)), dtype=np.float32)
+        return pcm16_to_float32(pcm, self._buffer[:n])
+
+
+def _to_mono(block: np.ndarray) -> np.ndarray:
+    return block if block.ndim == 1 else block.mean(axis=1, dtype=np.float32)
+
+
+def iter_audio_blocks(
+    file: BinaryIO,
+    target_rate: int,
+    block_seconds: float = BLOCK_SECONDS,
+    raw_sample_rate: Optional[int] = None
+) -> Iterator[np.ndarray]:
+    """Decode an audio file block by block into mono float32 at ``target_rate``.
+
+    Containers libsndfile understands (WAV, FLAC, OGG, and MP3 with
+    libsndfile >= 1.1) are parsed from their headers. Anything else is read
+    as headerless 16-bit PCM at ``raw_sample_rate`` (default: the target
+    rate), which is what clients sent before uploads were decoded.
+    """
+    try:
+        sound_file = sf.SoundFile(file)
+    except (RuntimeError, TypeError) as e:
+        # TypeError: a ".raw" file name makes soundfile ask for the sample rate
+        logger.info(f"Not a recognised audio container, reading as raw int16 PCM: {e}")
+        file.seek(0)
+        sample_rate = raw_sample_rate or target_rate
+        resampler = StreamingResampler(sample_rate, target_rate)
+        block_bytes = int(block_seconds * sample_rate) * 2
+        while True:
+            data = file.read(block_bytes)
+            if not data:
+                break
+            pcm = np.frombuffer(data[:len(data) // 2 * 2], dtype=np.int16)
+            yield resampler.process(pcm16_to_float32(pcm))
+        yield resampler.flush()
+        return
+
+    with sound_file:
+        # One resampler for the whole file, so block borders leave no artifacts
+        resampler = StreamingResampler(sound_file.samplerate, target_rate)
+        block_frames = int(block_seconds * sound_file.samplerate)
+        for block in sound_file.blocks(blocksize=block_frames, dtype="float32", always_2d=False):
+            yield resampler.process(_to_mono(block))
+        yield resampler.flush()
+
+
+def read_audio_file(file: BinaryIO, target_rate: int, raw_sample_rate: Optional[int] = None) -> np.ndarray:
+    """Decode a whole audio file into one mono float32 array at ``target_rate``.
+
+    Only the decoded float32 output is held in memory, never the encoded
+    file; when the container reports its length the output is preallocated
+    and filled in place.
+    """
+    expected = None
+    try:
+        info = sf.info(file)
+        expected = int(np.ceil(info.frames * target_rate / info.samplerate)) + 1
+    except (RuntimeError, TypeError):
+        pass
+    file.seek(0)
+
+    if expected is None:
+        blocks = list(iter_audio_blocks(file, target_rate, raw_sample_rate=raw_sample_rate))
+        return np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
+
+    audio = np.empty(expected, dtype=np.float32)
+    filled = 0
+    for block in iter_audio_blocks(file, target_rate, raw_sample_rate=raw_sample_rate):
+        if filled + len(block) > len(audio):
+            # Only if the header understated the length
+            audio = np.concatenate([audio[:filled], np.empty(len(block) * 4, dtype=np.float32)])
+        audio[filled:filled + len(block)] = block
+        filled += len(block)
+    return audio[:filled]
@@ -0,0 +1,80 @@
+import struct
+from dataclasses import dataclass
+import numpy as np
+
+# Binary audio frame layout (little-endian), followed by raw PCM samples:
+#   magic        4s   b"SRA1"
+#   session_id   12s  raw bytes of the session ObjectId
+#   sequence     I    per-session frame counter
+#   sample_rate  I    Hz
+#   format       B    FORMAT_INT16 or FORMAT_FLOAT32
+#   flags        B    FLAG_STREAMING
+#   epoch        H    chosen by the sender each time it restarts sequence numbers
+HEADER = struct.Struct("<4s12sIIBBH")
+HEADER_SIZE = HEADER.size
+MAGIC = b"SRA1"
+
+FORMAT_INT16 = 1
+FORMAT_FLOAT32 = 2
+FORMAT_DTYPES = {FORMAT_INT16: np.int16, FORMAT_FLOAT32: np.float32}
+
+FLAG_STREAMING = 0x01
+
+
+@dataclass
+class AudioFrame:
+    session_id: str
+    sequence: int
+    epoch: int
+    sample_rate: int
+    streaming: bool
+    samples: np.ndarray  # read-only view into the received frame
+
+
+def parse_audio_frame(data: bytes) -> AudioFrame:
+    """Parse a binary audio frame without copying the PCM payload"""
+    if len(data) < HEADER_SIZE:
+        raise ValueError("Audio frame shorter than header")
+
+    magic, session_id, sequence, sample_rate, fmt, flags, epoch = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Invalid audio frame magic")
+    if fmt not in FORMAT_DTYPES:
+        raise ValueError(f"Unsupported audio format: {fmt}")
+
+    dtype = FORMAT_DTYPES[fmt]
+    payload = len(data) - HEADER_SIZE
+    count = payload // np.dtype(dtype).itemsize
+    samples = np.frombuffer(data, dtype=dtype, count=count, offset=HEADER_SIZE)
+
+    return AudioFrame(
+        session_id=session_id.hex(),
+        sequence=sequence,
+        epoch=epoch,
+        sample_rate=sample_rate,
+        streaming=bool(flags & FLAG_STREAMING),
+        samples=samples
+    )
+
+
+def build_audio_frame(
+    session_id: str,
+    sequence: int,
+    sample_rate: int,
+    samples: np.ndarray,
+    streaming: bool = False,
+    epoch: int = 0
+) -> bytes:
+    """Build a binary audio frame, e.g. for Python clients and benchmarks"""
+    fmt = FORMAT_FLOAT32 if samples.dtype == np.float32 else FORMAT_INT16
+    samples = np.ascontiguousarray(samples, dtype=FORMAT_DTYPES[fmt])
+    header = HEADER.pack(
+        MAGIC,
+        bytes.fromhex(session_id),
+        sequence,
+        sample_rate,
+        fmt,
+        FLAG_STREAMING if streaming else 0,
+        epoch
+    )
+    return header + samples.tobytes()
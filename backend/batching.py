@@ -0,0 +1,403 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple, Any
+import numpy as np
+import torch
+import whisper
+from whisper.audio import FRAMES_PER_SECOND, N_FRAMES, N_SAMPLES, HOP_LENGTH, SAMPLE_RATE
+from whisper.decoding import DecodingResult
+from whisper.timing import add_word_timestamps
+from whisper.tokenizer import get_tokenizer
+from .inference import InferenceExecutor
+from .feature_cache import FeatureCache
+
+logger = logging.getLogger(__name__)
+
+# Decoding defaults of whisper.transcribe
+TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+class _BatchRequest:
+    def __init__(
+        self,
+        audio: np.ndarray,
+        language: Optional[str],
+        initial_prompt: Optional[str],
+        future: asyncio.Future
+    ):
+        self.audio = audio
+        self.language = language
+        self.initial_prompt = initial_prompt
+        self.future = future
+        self.submitted = time.perf_counter()
+
+    @property
+    def key(self) -> Tuple[Optional[str], Optional[str]]:
+        """Requests with the same key share decoding options"""
+        return self.language, self.initial_prompt
+
+
+class WhisperBatchScheduler:
+    """Micro-batches Whisper decoding across sessions.
+
+    Windows of up to 30 seconds from any session are collected for at most
+    ``max_wait_ms`` (or until ``max_batch_size`` are waiting), padded to
+    Whisper's 30 second input, and decoded together: the encoder and the
+    greedy/beam search run once per batch instead of once per window. Up to
+    one batch per inference worker is in flight.
+
+    Results match ``model.transcribe`` on the same window: requests are
+    grouped by language and prompt, since a batch shares decoding options,
+    and decoding keeps timestamps, the temperature fallback and the
+    no-speech check. Windows transcribe would decode in more than one pass
+    (speech running past the last timestamp) are handed to transcribe.
+    """
+
+    def __init__(
+        self,
+        model,
+        executor: InferenceExecutor,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 50.0,
+        beam_size: Optional[int] = None,
+        word_timestamps: bool = True,
+        feature_cache: Optional[FeatureCache] = None,
+        cache_encoder: bool = False,
+        model_name: str = "whisper"
+    ):
+        self.model = model
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.beam_size = beam_size
+        self.word_timestamps = word_timestamps
+        self.fp16 = next(model.parameters()).device.type == "cuda"
+        self.dtype = torch.float16 if self.fp16 else torch.float32
+        self.input_stride = N_FRAMES // model.dims.n_audio_ctx  # mel frames per timestamp token
+        self.time_precision = self.input_stride * HOP_LENGTH / SAMPLE_RATE
+        self.feature_cache = feature_cache
+        self.cache_encoder = cache_encoder and feature_cache is not None
+        self.model_name = model_name
+        self._pending: List[_BatchRequest] = []
+        self._arrived = asyncio.Event()
+        self._slots = asyncio.Semaphore(executor.workers)  # batches in flight
+        self._task: Optional[asyncio.Task] = None
+        self._batches: Set[asyncio.Task] = set()
+        self.metrics = {
+            "batch_count": 0,
+            "batch_items_total": 0,
+            "batch_latency_seconds_total": 0.0,
+            "batch_transcribe_fallbacks": 0
+        }
+
+    @staticmethod
+    def accepts(audio: np.ndarray) -> bool:
+        """Whether a window fits in a single Whisper input"""
+        return len(audio) <= N_SAMPLES
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._batches):
+            task.cancel()
+
+    async def submit(
+        self,
+        audio: np.ndarray,
+        language: Optional[str] = None,
+        initial_prompt: Optional[str] = None
+    ) -> Dict:
+        """Queue a window and wait for its transcription"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(_BatchRequest(audio, language, initial_prompt, future))
+        self._arrived.set()
+        return await future
+
+    async def _run(self):
+        while True:
+            await self._arrived.wait()
+            # Wait for a free worker first; requests arriving meanwhile join the batch
+            await self._slots.acquire()
+
+            # Hold the first request for at most max_wait to let a batch form
+            deadline = self._pending[0].submitted + self.max_wait
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._arrived.clear()
+                try:
+                    await asyncio.wait_for(self._arrived.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            key = self._pending[0].key
+            batch = [r for r in self._pending if r.key == key][:self.max_batch_size]
+            self._pending = [r for r in self._pending if r not in batch]
+            if self._pending:
+                self._arrived.set()
+            else:
+                self._arrived.clear()
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _dispatch(self, batch: List[_BatchRequest]):
+        """Decode one batch on the executor and resolve its requests"""
+        try:
+            results = await self.executor.run(lambda: self._decode_batch(batch))
+        except Exception as e:
+            logger.error(f"Error decoding Whisper batch: {e}")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+            now = time.perf_counter()
+            self.metrics["batch_count"] += 1
+            self.metrics["batch_items_total"] += len(batch)
+            self.metrics["batch_latency_seconds_total"] += sum(now - r.submitted for r in batch)
+
+        for request, result in zip(batch, results):
+            if result is not None and not request.future.done():
+                request.future.set_result(result)
+
+        unfinished = [request for request, result in zip(batch, results) if result is None]
+        if unfinished:
+            self.metrics["batch_transcribe_fallbacks"] += len(unfinished)
+            await asyncio.gather(*(self._transcribe(request) for request in unfinished))
+
+    async def _transcribe(self, request: _BatchRequest):
+        """Transcribe one window with model.transcribe"""
+        try:
+            result = await self.executor.run(
+                lambda: self.model.transcribe(
+                    request.audio,
+                    language=request.language,
+                    initial_prompt=request.initial_prompt,
+                    word_timestamps=self.word_timestamps,
+                    beam_size=self.beam_size,
+                    fp16=self.fp16,
+                    verbose=False
+                )
+            )
+        except Exception as e:
+            if not request.future.done():
+                request.future.set_exception(e)
+            return
+        if not request.future.done():
+            request.future.set_result(result)
+
+    def _encode_batch(self, batch: List[_BatchRequest]) -> Tuple[List[torch.Tensor], torch.Tensor]:
+        """Return per-item log-mels and the batched encoder output.
+
+        Both are looked up in the feature cache first; only missing items
+        go through the encoder, so re-decoding the same audio with other
+        options skips it entirely.
+        """
+        n_mels = self.model.dims.n_mels
+        cache = self.feature_cache
+        mel_namespace = f"mel{n_mels}-window"
+        encoder_namespace = f"encoder-window-{self.model_name}"
+
+        mels: List[torch.Tensor] = []
+        features: List[Optional[torch.Tensor]] = [None] * len(batch)
+        missing = []
+        for i, request in enumerate(batch):
+            audio_hash = cache.audio_hash(request.audio) if cache is not None else None
+
+            mel = cache.get(cache.key(audio_hash, mel_namespace)) if cache is not None else None
+            if mel is None:
+                # The same 30 second input transcribe builds for a short clip
+                num_frames = len(request.audio) // HOP_LENGTH
+                mel = whisper.log_mel_spectrogram(request.audio, n_mels=n_mels, padding=N_SAMPLES)
+                mel = whisper.pad_or_trim(mel[:, :num_frames], N_FRAMES)
+                if cache is not None:
+                    cache.put(cache.key(audio_hash, mel_namespace), mel.numpy())
+            else:
+                mel = torch.from_numpy(np.array(mel))
+            mels.append(mel)
+
+            if self.cache_encoder:
+                encoded = cache.get(cache.key(audio_hash, encoder_namespace))
+                if encoded is not None:
+                    features[i] = torch.from_numpy(np.array(encoded)).to(self.model.device, self.dtype)
+                    continue
+            missing.append((i, audio_hash))
+
+        if missing:
+            mel_batch = torch.stack([mels[i] for i, _ in missing]).to(self.model.device, self.dtype)
+            with torch.no_grad():
+                encoded = self.model.embed_audio(mel_batch)
+            for row, (i, audio_hash) in enumerate(missing):
+                features[i] = encoded[row]
+                if self.cache_encoder:
+                    cache.put(cache.key(audio_hash, encoder_namespace), encoded[row].cpu().numpy())
+
+        return mels, torch.stack(features)
+
+    def _decode_batch(self, batch: List[_BatchRequest]) -> List[Optional[Dict]]:
+        """Encode and decode a padded batch of windows in one pass.
+
+        Returns a transcribe-style result per window, or None for windows
+        transcribe would need more than one pass for.
+        """
+        language, initial_prompt = batch[0].key
+        mels, audio_features = self._encode_batch(batch)
+        decoded = self._decode_with_fallback(audio_features, language, initial_prompt)
+        return [
+            self._to_result(request, mel, result)
+            for request, mel, result in zip(batch, mels, decoded)
+        ]
+
+    def _decode_with_fallback(
+        self,
+        audio_features: torch.Tensor,
+        language: Optional[str],
+        initial_prompt: Optional[str]
+    ) -> List[DecodingResult]:
+        """Decode, re-decoding windows that fail transcribe's checks at higher temperatures"""
+        results: List[Optional[DecodingResult]] = [None] * len(audio_features)
+        pending = list(range(len(audio_features)))
+        for temperature in TEMPERATURES:
+            options = whisper.DecodingOptions(
+                language=language,
+                temperature=temperature,
+                beam_size=self.beam_size if temperature == 0 else None,
+                prompt=initial_prompt,
+                fp16=self.fp16
+            )
+            # Passing encoder output instead of mels makes decode skip the encoder
+            decoded = whisper.decode(self.model, audio_features[pending], options)
+            pending_next = []
+            for i, result in zip(pending, decoded):
+                results[i] = result
+                if self._needs_fallback(result):
+                    pending_next.append(i)
+            pending = pending_next
+            if not pending:
+                break
+        return results
+
+    @staticmethod
+    def _needs_fallback(result: DecodingResult) -> bool:
+        too_repetitive = result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+        too_unlikely = result.avg_logprob < LOGPROB_THRESHOLD
+        silence = result.no_speech_prob > NO_SPEECH_THRESHOLD and too_unlikely
+        return (too_repetitive or too_unlikely) and not silence
+
+    def _to_result(self, request: _BatchRequest, mel: torch.Tensor, result: DecodingResult) -> Optional[Dict]:
+        """Split a decoded window into timestamped segments the way transcribe does"""
+        tokenizer = get_tokenizer(
+            self.model.is_multilingual,
+            num_languages=self.model.num_languages,
+            language=result.language,
+            task="transcribe"
+        )
+        num_frames = len(request.audio) // HOP_LENGTH
+        no_speech = result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob <= LOGPROB_THRESHOLD
+        if num_frames == 0 or no_speech:
+            return {"text": "", "segments": [], "language": result.language}
+
+        tokens = torch.tensor(result.tokens, dtype=torch.long)
+        timestamp_begin = tokenizer.timestamp_begin
+        timestamp_tokens = tokens.ge(timestamp_begin)
+        single_timestamp_ending = timestamp_tokens[-2:].tolist() == [False, True]
+        consecutive = (torch.where(timestamp_tokens[:-1] & timestamp_tokens[1:])[0] + 1).tolist()
+
+        segments = []
+        seek = num_frames  # how far transcribe's first pass gets, in frames
+        if consecutive:
+            slices = consecutive + ([len(tokens)] if single_timestamp_ending else [])
+            last_slice = 0
+            for current_slice in slices:
+                sliced = tokens[last_slice:current_slice]
+                segments.append(self._segment(
+                    tokenizer,
+                    result,
+                    sliced,
+                    (sliced[0].item() - timestamp_begin) * self.time_precision,
+                    (sliced[-1].item() - timestamp_begin) * self.time_precision
+                ))
+                last_slice = current_slice
+            if not single_timestamp_ending:
+                # The unfinished last segment is left for the next pass
+                last_timestamp = tokens[last_slice - 1].item() - timestamp_begin
+                seek = last_timestamp * self.input_stride
+        else:
+            duration = num_frames * HOP_LENGTH / SAMPLE_RATE
+            timestamps = tokens[timestamp_tokens.nonzero().flatten()]
+            if len(timestamps) > 0 and timestamps[-1].item() != timestamp_begin:
+                duration = (timestamps[-1].item() - timestamp_begin) * self.time_precision
+            segments.append(self._segment(tokenizer, result, tokens, 0.0, duration))
+
+        if self.word_timestamps:
+            self._add_words(segments, mel, num_frames, tokenizer)
+            if not single_timestamp_ending:
+                last_word_end = next(
+                    (w["end"] for s in reversed(segments) for w in reversed(s["words"])),
+                    segments[-1]["end"] if segments else None
+                )
+                if last_word_end is not None and last_word_end > 0:
+                    seek = round(last_word_end * FRAMES_PER_SECOND)
+
+        if seek < num_frames:
+            return None
+
+        all_tokens = []
+        for i, segment in enumerate(segments):
+            segment["id"] = i
+            if segment["start"] == segment["end"] or not segment["text"].strip():
+                segment.update(text="", tokens=[], words=[])
+            all_tokens.extend(segment["tokens"])
+        return {"text": tokenizer.decode(all_tokens), "segments": segments, "language": result.language}
+
+    @staticmethod
+    def _segment(tokenizer, result: DecodingResult, tokens: torch.Tensor, start: float, end: float) -> Dict:
+        tokens = tokens.tolist()
+        return {
+            "seek": 0,
+            "start": start,
+            "end": end,
+            "text": tokenizer.decode([token for token in tokens if token < tokenizer.eot]),
+            "tokens": tokens,
+            "temperature": result.temperature,
+            "avg_logprob": result.avg_logprob,
+            "compression_ratio": result.compression_ratio,
+            "no_speech_prob": result.no_speech_prob
+        }
+
+    def _add_words(self, segments: List[Dict], mel: torch.Tensor, num_frames: int, tokenizer):
+        """Attach word timestamps using Whisper's cross-attention alignment"""
+        add_word_timestamps(
+            segments=segments,
+            model=self.model,
+            tokenizer=tokenizer,
+            mel=mel.to(self.model.device, self.dtype),
+            num_frames=num_frames,
+            last_speech_timestamp=0.0
+        )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self.metrics)
+        batches = metrics["batch_count"]
+        items = metrics["batch_items_total"]
+        metrics["batch_size_avg"] = items / batches if batches else 0.0
+        metrics["batch_latency_seconds_avg"] = metrics["batch_latency_seconds_total"] / items if items else 0.0
+        metrics["batch_pending"] = len(self._pending)
+        metrics["batch_in_flight"] = len(self._batches)
+        if self.feature_cache is not None:
+            metrics.update(self.feature_cache.get_metrics())
+        return metrics
@@ -14,10 +14,82 @@ class Settings(BaseSettings):
     channels: int = 1
     format: str = "int16"
     
+    # Streaming Configuration
+    streaming_mode: bool = False
+    streaming_window_seconds: float = 15.0
+    streaming_min_step_seconds: float = 0.5
+    word_level_alignment: bool = True
+    
+    # Audio Ingest Configuration (per-session queue in front of inference)
+    ingest_window_seconds: float = 5.0
+    ingest_max_delay_seconds: float = 0.5  # flush a partial window after this long without new audio
+    ingest_high_water_seconds: float = 30.0
+    ingest_low_water_seconds: float = 10.0
+    ingest_max_seconds: float = 60.0
+    ingest_drop_policy: str = "block"  # block, drop_oldest
+    ingest_dedup_window: int = 4096  # sequence numbers remembered per session
+    ingest_result_cache_size: int = 32  # processed frames whose results are kept
+    session_idle_release_seconds: float = 30.0  # grace period before a session without connections is released
+    
+    # Segment Write-Behind Buffer (live transcripts to MongoDB)
+    segment_flush_max_batch: int = 200
+    segment_flush_interval_seconds: float = 1.0
+    segment_flush_max_retries: int = 5
+    segment_flush_retry_backoff_seconds: float = 0.5
+    join_history_page_size: int = 200  # segments per session_history message
+    
+    # Broadcast Fan-out
+    broadcast_send_timeout_seconds: float = 2.0
+    
+    # Voice Activity Detection
+    vad_enabled: bool = True
+    vad_aggressiveness: int = 2  # 0 (least) to 3 (most aggressive)
+    vad_frame_ms: int = 30
+    vad_padding_ms: int = 300
+    vad_min_speech_ratio: float = 0.05
+    
+    # Long Audio (uploads split at pauses into windows transcribed in parallel)
+    long_audio_window_seconds: float = 28.0  # <= 30 s lets windows share Whisper batches
+    long_audio_overlap_seconds: float = 1.0
+    long_audio_search_seconds: float = 8.0  # how far back from the window end to look for a pause
+    
+    # Upload Jobs (background transcription of uploaded files)
+    job_concurrency: int = 1
+    job_upload_dir: str = "uploads"
+    job_poll_seconds: float = 5.0
+    job_progress_interval_seconds: float = 2.0
+    job_stale_seconds: float = 120.0  # running jobs without a heartbeat this long are requeued
+    
     # Model Configuration
     whisper_model: str = "base"
     diarization_model: str = "pyannote/speaker-diarization-3.1"
     speaker_embedding_model: str = "pyannote/embedding"
+    speaker_embedding_batch_size: int = 32  # segments embedded per model call
+    
+    # Speaker Index Configuration
+    speaker_index_backend: str = "exact"  # exact, ivf
+    speaker_index_path: Optional[str] = "models/speaker_index.npz"
+    speaker_index_nlist: int = 256
+    speaker_index_nprobe: int = 8
+    speaker_sync_mode: str = "auto"  # auto, change_stream, poll, off
+    speaker_sync_batch_size: int = 1000
+    speaker_sync_poll_seconds: float = 30.0
+    speaker_sync_retry_max_seconds: float = 60.0  # backoff cap for reopening the change stream
+    
+    # Inference Configuration
+    inference_backend: str = "thread"  # thread, process
+    inference_processes: int = 4
+    inference_workers: int = 2
+    inference_intra_op_threads: int = 0  # 0 = cpu_count / inference_workers
+    inference_max_queue: int = 16
+    whisper_batching_enabled: bool = False
+    whisper_batch_max_size: int = 8
+    whisper_batch_max_wait_ms: float = 50.0
+    feature_cache_enabled: bool = False  # applies to the batched path only
+    feature_cache_encoder: bool = True
+    feature_cache_memory_mb: int = 256
+    feature_cache_dir: Optional[str] = None
+    feature_cache_disk_mb: int = 0
     
     # API Configuration
     api_host: str = "0.0.0.0"
@@ -1,5 +1,9 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
 from .config import settings
 from .models import TranscriptSession, SpeakerProfile
 import logging
@@ -47,6 +51,21 @@ async def create_indexes():
         await db.database.transcript_sessions.create_index("session_name")
         await db.database.transcript_sessions.create_index("created_at")
         await db.database.transcript_sessions.create_index("status")
+        await db.database.transcript_sessions.create_index([("created_at", -1), ("_id", -1)])
+        
+        # Transcript segments indexes (time-range lookups and insertion-order reads)
+        await db.database.transcript_segments.create_index([("session_id", 1), ("start_time", 1)])
+        await db.database.transcript_segments.create_index([("session_id", 1), ("_id", 1)])
+        # A job's segments are stored once, however often the job is run
+        await db.database.transcript_segments.create_index(
+            [("job_id", 1), ("job_index", 1)],
+            unique=True,
+            partialFilterExpression={"job_id": {"$exists": True}}
+        )
+        
+        # Transcription jobs indexes (claiming the oldest queued job, finding stale ones)
+        await db.database.transcription_jobs.create_index([("state", 1), ("created_at", 1)])
+        await db.database.transcription_jobs.create_index([("state", 1), ("heartbeat_at", 1)])
         
         # Speaker profiles indexes
         await db.database.speaker_profiles.create_index("name")
@@ -62,21 +81,55 @@ def get_database():
     return db.database
 
 
+EPOCH = datetime(1970, 1, 1)
+
+
+def encode_session_cursor(created_at: datetime, session_id) -> str:
+    """Opaque keyset cursor for a (created_at, _id) position"""
+    # MongoDB stores datetimes with millisecond precision, so this round-trips exactly
+    millis = (created_at.replace(tzinfo=None) - EPOCH) // timedelta(milliseconds=1)
+    return f"{millis}-{session_id}"
+
+
+def decode_session_cursor(cursor: str):
+    """Inverse of encode_session_cursor; raises ValueError on malformed input"""
+    from bson.errors import InvalidId
+    try:
+        millis, session_id = cursor.split("-", 1)
+        created_at = EPOCH + timedelta(milliseconds=int(millis))
+        return created_at, ObjectId(session_id)
+    except (ValueError, InvalidId) as e:
+        raise ValueError(f"Invalid session cursor: {cursor}") from e
+
+
 class TranscriptRepository:
     """Repository for transcript operations"""
     
-    def __init__(self):
-        self.collection = db.database.transcript_sessions
+    @property
+    def collection(self):
+        # Resolved lazily: repositories are created at import time, before connect_to_mongo
+        return db.database.transcript_sessions
+    
+    @property
+    def segments_collection(self):
+        return db.database.transcript_segments
     
     async def create_session(self, session_data: dict) -> str:
         """Create a new transcript session"""
         result = await self.collection.insert_one(session_data)
         return str(result.inserted_id)
     
-    async def get_session(self, session_id: str) -> Optional[dict]:
-        """Get transcript session by ID"""
+    async def get_session(self, session_id: str, include_segments: bool = True) -> Optional[dict]:
+        """Get transcript session by ID, with its segments unless disabled"""
         from bson import ObjectId
-        return await self.collection.find_one({"_id": ObjectId(session_id)})
+        session = await self.collection.find_one({"_id": ObjectId(session_id)})
+        if session is not None and include_segments:
+            # Sessions written before segments moved out keep them embedded
+            segments = session.get("segments") or []
+            async for segment in self.iter_segments(session_id):
+                segments.append(segment)
+            session["segments"] = segments
+        return session
     
     async def update_session(self, session_id: str, update_data: dict):
         """Update transcript session"""
@@ -88,28 +141,132 @@ class TranscriptRepository:
     
     async def add_segment(self, session_id: str, segment: dict):
         """Add a new segment to transcript session"""
-        from bson import ObjectId
-        await self.collection.update_one(
-            {"_id": ObjectId(session_id)},
-            {"$push": {"segments": segment}}
-        )
+        await self.add_segments(session_id, [segment])
+    
+    async def add_segments(self, session_id: str, segments: List[dict]):
+        """Insert segments of a transcript session in one unordered bulk write"""
+        if not segments:
+            return
+        session_oid = ObjectId(session_id)
+        inserted = 0
+        try:
+            await self.segments_collection.insert_many(
+                [{**segment, "session_id": session_oid} for segment in segments],
+                ordered=False
+            )
+            inserted = len(segments)
+        except BulkWriteError as e:
+            inserted = e.details.get("nInserted", 0)
+            raise
+        finally:
+            # Count only what was inserted, so a retried partial write is not counted twice
+            if inserted:
+                await self.collection.update_one({"_id": session_oid}, {"$inc": {"segment_count": inserted}})
+    
+    async def add_job_segments(self, session_id: str, job_id: ObjectId, segments: List[dict]) -> List[ObjectId]:
+        """Store the segments of a transcription job and return their ids in order.
+        
+        Segments are upserted by (job_id, job_index), so a requeued job keeps
+        what an earlier run stored. New segments get ids generated now, which
+        sort after the segments stored live while the job was running.
+        """
+        if not segments:
+            return []
+        session_oid = ObjectId(session_id)
+        result = await self.segments_collection.bulk_write([
+            UpdateOne(
+                {"job_id": job_id, "job_index": index},
+                {"$setOnInsert": {"_id": ObjectId(), **segment, "session_id": session_oid}},
+                upsert=True
+            )
+            for index, segment in enumerate(segments)
+        ], ordered=False)
+        
+        if result.upserted_count:
+            await self.collection.update_one({"_id": session_oid}, {"$inc": {"segment_count": result.upserted_count}})
+        
+        segment_ids = [result.upserted_ids.get(index) for index in range(len(segments))]
+        existing = [index for index, segment_id in enumerate(segment_ids) if segment_id is None]
+        if existing:
+            cursor = self.segments_collection.find(
+                {"job_id": job_id, "job_index": {"$in": existing}},
+                {"job_index": 1}
+            )
+            async for segment in cursor:
+                segment_ids[segment["job_index"]] = segment["_id"]
+        return segment_ids
     
-    async def get_all_sessions(self, limit: int = 100):
-        """Get all transcript sessions"""
-        cursor = self.collection.find().sort("created_at", -1).limit(limit)
-        return await cursor.to_list(length=limit)
+    async def iter_segments(
+        self, 
+        session_id: str, 
+        after: Optional[ObjectId] = None, 
+        batch_size: int = 500
+    ) -> AsyncIterator[dict]:
+        """Stream a session's segments in insertion order, optionally only those after a segment id"""
+        query = {"session_id": ObjectId(session_id)}
+        if after is not None:
+            query["_id"] = {"$gt": after}
+        # Chunk-mode start times are relative to their chunk, so _id gives the transcript order
+        projection = {"session_id": 0, "job_id": 0, "job_index": 0}
+        cursor = self.segments_collection.find(query, projection).sort("_id", 1).batch_size(batch_size)
+        async for segment in cursor:
+            segment["id"] = str(segment.pop("_id"))
+            yield segment
+    
+    async def get_all_sessions(
+        self, 
+        limit: int = 50, 
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Get one page of session summaries, newest first, and the cursor of the next page"""
+        match = {}
+        if cursor:
+            created_at, last_id = decode_session_cursor(cursor)
+            match = {"$or": [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": last_id}}
+            ]}
+        
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"created_at": -1, "_id": -1}},
+            {"$limit": limit},
+            {"$project": {
+                "session_name": 1,
+                "created_at": 1,
+                "updated_at": 1,
+                "status": 1,
+                "language": 1,
+                "total_duration": 1,
+                # Older sessions keep their segments embedded and have no counter
+                "segment_count": {"$add": [
+                    {"$ifNull": ["$segment_count", 0]},
+                    {"$size": {"$ifNull": ["$segments", []]}}
+                ]}
+            }}
+        ]
+        sessions = await self.collection.aggregate(pipeline).to_list(length=limit)
+        
+        next_cursor = None
+        if len(sessions) == limit:
+            next_cursor = encode_session_cursor(sessions[-1]["created_at"], sessions[-1]["_id"])
+        for session in sessions:
+            session["_id"] = str(session["_id"])
+        return sessions, next_cursor
     
     async def delete_session(self, session_id: str):
-        """Delete transcript session"""
+        """Delete transcript session and its segments"""
         from bson import ObjectId
+        await self.segments_collection.delete_many({"session_id": ObjectId(session_id)})
         await self.collection.delete_one({"_id": ObjectId(session_id)})
 
 
 class SpeakerRepository:
     """Repository for speaker operations"""
     
-    def __init__(self):
-        self.collection = db.database.speaker_profiles
+    @property
+    def collection(self):
+        return db.database.speaker_profiles
     
     async def create_speaker(self, speaker_data: dict) -> str:
         """Create a new speaker profile"""
@@ -142,3 +299,70 @@ class SpeakerRepository:
         """Delete speaker profile"""
         from bson import ObjectId
         await self.collection.delete_one({"_id": ObjectId(speaker_id)})
+    
+    async def iter_speaker_names(self, batch_size: int = 1000) -> AsyncIterator[dict]:
+        """Stream speaker ids and names without embeddings"""
+        cursor = self.collection.find({}, {"name": 1}).batch_size(batch_size)
+        async for speaker in cursor:
+            yield speaker
+    
+    async def iter_voice_embeddings(
+        self, 
+        speaker_ids: Optional[Iterable] = None, 
+        batch_size: int = 1000
+    ) -> AsyncIterator[dict]:
+        """Stream speaker names and voice embeddings, optionally for given ids only"""
+        query = {} if speaker_ids is None else {"_id": {"$in": list(speaker_ids)}}
+        cursor = self.collection.find(query, {"name": 1, "voice_embedding": 1}).batch_size(batch_size)
+        async for speaker in cursor:
+            yield speaker
+    
+    def watch(self):
+        """Open a change stream on speaker profiles (requires a replica set)"""
+        return self.collection.watch(full_document="updateLookup")
+
+
+class JobRepository:
+    """Repository for background transcription jobs"""
+    
+    @property
+    def collection(self):
+        return db.database.transcription_jobs
+    
+    async def create_job(self, job_data: dict) -> str:
+        """Create a new job record"""
+        result = await self.collection.insert_one(job_data)
+        return str(result.inserted_id)
+    
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        """Get job record by ID"""
+        from bson.errors import InvalidId
+        try:
+            return await self.collection.find_one({"_id": ObjectId(job_id)})
+        except InvalidId:
+            return None
+    
+    async def update_job(self, job_id: str, update_data: dict):
+        """Update job record"""
+        await self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": update_data}
+        )
+    
+    async def claim_next_job(self, worker_id: str) -> Optional[dict]:
+        """Atomically move the oldest queued job to running and return it"""
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"state": "queued"},
+            {"$set": {"state": "running", "worker_id": worker_id, "started_at": now, "heartbeat_at": now}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+    
+    async def requeue_stale_jobs(self, older_than: datetime) -> int:
+        """Return running jobs whose worker stopped reporting to the queue"""
+        result = await self.collection.update_many(
+            {"state": "running", "heartbeat_at": {"$lt": older_than}},
+            {"$set": {"state": "queued", "worker_id": None}}
+        )
+        return result.modified_count
@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from typing import Dict, Optional, Any
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FeatureCache:
+    """Content-addressed cache for log-mel features and encoder activations.
+
+    Entries are keyed by a hash of the audio samples plus a namespace (e.g.
+    the feature type and model), so a retried chunk or a re-processed
+    upload finds its features regardless of decoding options. The memory
+    tier is an LRU bounded in bytes; entries evicted from it are demoted to
+    an optional on-disk tier of .npy files, read back with mmap and also
+    bounded in bytes.
+    """
+
+    def __init__(self, max_memory_bytes: int, disk_dir: Optional[str] = None, max_disk_bytes: int = 0):
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = disk_dir if max_disk_bytes > 0 else None
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()  # key -> file size
+        self._disk_bytes = 0
+        self.metrics = {
+            "feature_cache_hits": 0,
+            "feature_cache_disk_hits": 0,
+            "feature_cache_misses": 0
+        }
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._scan_disk()
+
+    @staticmethod
+    def audio_hash(audio: np.ndarray) -> str:
+        """Hash audio samples without copying them"""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(memoryview(np.ascontiguousarray(audio, dtype=np.float32)).cast("B"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(audio_hash: str, namespace: str) -> str:
+        """Cache key for one kind of feature of a given audio hash"""
+        return f"{namespace}-{audio_hash}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.npy")
+
+    def _scan_disk(self):
+        files = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".npy"):
+                path = os.path.join(self.disk_dir, name)
+                stat = os.stat(path)
+                files.append((stat.st_atime, name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return cached features or None"""
+        array = self._memory.get(key)
+        if array is not None:
+            self._memory.move_to_end(key)
+            self.metrics["feature_cache_hits"] += 1
+            return array
+
+        if self.disk_dir and key in self._disk:
+            try:
+                array = np.load(self._path(key), mmap_mode="r")
+                self._disk.move_to_end(key)
+                self.metrics["feature_cache_disk_hits"] += 1
+                return array
+            except (OSError, ValueError) as e:
+                logger.warning(f"Dropping unreadable feature cache entry {key}: {e}")
+                self._drop_disk(key)
+
+        self.metrics["feature_cache_misses"] += 1
+        return None
+
+    def put(self, key: str, array: np.ndarray):
+        """Store features in the memory tier, demoting old entries to disk"""
+        if array.nbytes > self.max_memory_bytes:
+            self._write_disk(key, array)
+            return
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key).nbytes
+        self._memory[key] = array
+        self._memory_bytes += array.nbytes
+
+        while self._memory_bytes > self.max_memory_bytes:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+            self._write_disk(evicted_key, evicted)
+
+    def _write_disk(self, key: str, array: np.ndarray):
+        if not self.disk_dir or array.nbytes > self.max_disk_bytes or key in self._disk:
+            return
+        path = self._path(key)
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write feature cache entry {key}: {e}")
+            return
+        size = os.path.getsize(path)
+        self._disk[key] = size
+        self._disk_bytes += size
+        self._evict_disk()
+
+    def _drop_disk(self, key: str):
+        self._disk_bytes -= self._disk.pop(key, 0)
+        try:
+            os.unlink(self._path(key))
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            self._drop_disk(next(iter(self._disk)))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self.metrics)
+        metrics["feature_cache_memory_bytes"] = self._memory_bytes
+        metrics["feature_cache_disk_bytes"] = self._disk_bytes
+        return metrics
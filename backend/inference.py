@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceExecutor:
+    """Bounded thread pool dedicated to model inference.
+
+    At most ``workers`` calls run at once, each with a fixed number of torch
+    intra-op threads so concurrent calls do not oversubscribe cores. At most
+    ``max_queue`` further calls wait for a worker; callers beyond that await
+    a free slot, which pushes back on whoever is feeding audio in.
+    """
+
+    def __init__(self, workers: int = 2, intra_op_threads: int = 0, max_queue: int = 16):
+        self.workers = workers
+        self.intra_op_threads = intra_op_threads or max(1, (os.cpu_count() or 1) // workers)
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="inference",
+            initializer=self._init_worker
+        )
+        self._slots = asyncio.Semaphore(workers + max_queue)
+        self.pending = 0  # admitted calls, queued or running
+        self.running = 0
+        self._running_lock = threading.Lock()
+        self.metrics = {
+            "inference_calls_total": 0,
+            "inference_wait_seconds_total": 0.0,
+            "inference_wait_seconds_max": 0.0,
+            "inference_run_seconds_total": 0.0
+        }
+
+    def _init_worker(self):
+        torch.set_num_threads(self.intra_op_threads)
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls admitted but not yet running"""
+        return self.pending - self.running
+
+    @property
+    def saturated(self) -> bool:
+        """Whether new calls would have to wait for admission"""
+        return self.pending >= self.workers + self.max_queue
+
+    async def run(self, fn: Callable[[], Any]) -> Any:
+        """Run a blocking inference call on the pool"""
+        submitted = time.perf_counter()
+        async with self._slots:
+            self.pending += 1
+            started = {}
+
+            def call():
+                started["at"] = time.perf_counter()
+                with self._running_lock:
+                    self.running += 1
+                try:
+                    return fn()
+                finally:
+                    with self._running_lock:
+                        self.running -= 1
+
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, call)
+            finally:
+                self.pending -= 1
+                finished = time.perf_counter()
+                wait = started.get("at", finished) - submitted
+                self.metrics["inference_calls_total"] += 1
+                self.metrics["inference_wait_seconds_total"] += wait
+                self.metrics["inference_wait_seconds_max"] = max(self.metrics["inference_wait_seconds_max"], wait)
+                self.metrics["inference_run_seconds_total"] += finished - started.get("at", finished)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth and wait-time metrics"""
+        metrics = dict(self.metrics)
+        calls = metrics["inference_calls_total"]
+        metrics["inference_queue_depth"] = self.queue_depth
+        metrics["inference_running"] = self.running
+        metrics["inference_wait_seconds_avg"] = metrics["inference_wait_seconds_total"] / calls if calls else 0.0
+        return metrics
+
+    def shutdown(self):
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,262 @@
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Iterable, NamedTuple, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DROP_LOG_INTERVAL_SECONDS = 10.0
+
+
+class IngestFrame(NamedTuple):
+    samples: np.ndarray
+    sample_rate: int
+    language: Optional[str]
+    streaming: bool
+    sequences: Tuple[Tuple[int, int], ...] = ()  # (epoch, sequence) keys of the frames
+
+    @property
+    def seconds(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    def compatible(self, other: "IngestFrame") -> bool:
+        return (
+            self.samples.dtype == other.samples.dtype
+            and self.sample_rate == other.sample_rate
+            and self.language == other.language
+            and self.streaming == other.streaming
+        )
+
+
+class SequenceTracker:
+    """Remembers which audio frames a session has accepted.
+
+    Frames are keyed by (epoch, sequence): senders number frames from 0 and
+    pick a fresh epoch whenever they start numbering again, e.g. after a
+    page reload. A frame from a new epoch resets the tracker, so the new
+    stream's frames are never mistaken for the old one's. Keys are marked
+    when a frame is queued, so a frame resent while the original is still
+    waiting is caught too. Processed results are kept for the last
+    ``max_results`` frames, each entry pointing at the result of the window
+    the frame was coalesced into, so a resent frame can be answered without
+    running inference again.
+    """
+
+    def __init__(self, window: int = 4096, max_results: int = 32):
+        self.window = window
+        self.max_results = max_results
+        self.epoch: Optional[int] = None
+        self._seen: "OrderedDict[Tuple[int, int], None]" = OrderedDict()
+        self._results: "OrderedDict[Tuple[int, int], Any]" = OrderedDict()
+        self.duplicates = 0
+
+    def mark(self, key: Tuple[int, int]) -> bool:
+        """Record an (epoch, sequence) key, returning False if it was already seen"""
+        if key[0] != self.epoch:
+            # The sender started numbering again; the old stream's keys are done
+            self.epoch = key[0]
+            self._seen.clear()
+            self._results.clear()
+        if key in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen[key] = None
+        while len(self._seen) > self.window:
+            self._seen.popitem(last=False)
+        return True
+
+    def forget(self, keys: Iterable[Tuple[int, int]]):
+        """Unmark frames that were dropped or failed, so a resend is processed"""
+        for key in keys:
+            self._seen.pop(key, None)
+
+    def store_result(self, keys: Iterable[Tuple[int, int]], result: Any):
+        """Cache the result of a processed window under its frames' keys"""
+        for key in keys:
+            # Frames of a replaced epoch can still finish processing
+            if key[0] != self.epoch:
+                continue
+            self._results[key] = result
+            self._results.move_to_end(key)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+
+    def result(self, key: Tuple[int, int]) -> Optional[Any]:
+        """Cached result for a frame, or None if pending or evicted"""
+        return self._results.get(key)
+
+
+class SessionIngest:
+    """Per-session audio queue decoupling WebSocket receive from inference.
+
+    Frames are queued by the receive loop and a consumer task coalesces
+    consecutive compatible frames into model-sized windows before handing
+    them to ``handler``. A window is handed over once it holds
+    ``window_seconds`` of audio; a partial one only when no frame arrived
+    for ``max_delay_seconds`` (the client paused or stopped) or when
+    ``drain`` flushes the queue. ``notify`` is called with "pause" when the queue
+    passes the high-water mark and "resume" once it drains below the
+    low-water mark. Above ``max_seconds`` the drop policy applies:
+    "block" makes the producer wait, "drop_oldest" discards queued audio
+    and reports each discarded frame to ``on_drop``.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        handler: Callable[[IngestFrame], Awaitable[None]],
+        notify: Callable[[str, float], Awaitable[None]],
+        window_seconds: float = 5.0,
+        max_delay_seconds: float = 0.5,
+        high_water_seconds: float = 30.0,
+        low_water_seconds: float = 10.0,
+        max_seconds: float = 60.0,
+        drop_policy: str = "block",
+        on_drop: Optional[Callable[[IngestFrame], None]] = None
+    ):
+        self.session_id = session_id
+        self.handler = handler
+        self.notify = notify
+        self.window_seconds = window_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.high_water_seconds = high_water_seconds
+        self.low_water_seconds = low_water_seconds
+        self.max_seconds = max_seconds
+        self.drop_policy = drop_policy
+        self.on_drop = on_drop
+
+        self.frames: Deque[IngestFrame] = deque()
+        self.queued_seconds = 0.0
+        self.dropped_seconds = 0.0
+        self._unlogged_drops = 0
+        self._last_drop_log: Optional[float] = None
+        self.paused = False
+        self._busy = False
+        self._flushing = 0  # drains in progress
+        self._changed = asyncio.Condition()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._consume())
+
+    async def put(self, frame: IngestFrame):
+        """Queue a frame, applying flow control and the drop policy"""
+        async with self._changed:
+            if self.queued_seconds + frame.seconds > self.max_seconds:
+                if self.drop_policy == "drop_oldest":
+                    while self.frames and self.queued_seconds + frame.seconds > self.max_seconds:
+                        dropped = self.frames.popleft()
+                        self.queued_seconds -= dropped.seconds
+                        self.dropped_seconds += dropped.seconds
+                        self._unlogged_drops += 1
+                        if self.on_drop is not None:
+                            self.on_drop(dropped)
+                    self._log_drops()
+                else:
+                    await self._changed.wait_for(
+                        lambda: not self.frames or self.queued_seconds + frame.seconds <= self.max_seconds
+                    )
+
+            self.frames.append(frame)
+            self.queued_seconds += frame.seconds
+            self._changed.notify_all()
+            pause = not self.paused and self.queued_seconds >= self.high_water_seconds
+            if pause:
+                self.paused = True
+
+        if pause:
+            await self.notify("pause", self.queued_seconds)
+
+    def _log_drops(self):
+        """Report dropped frames at most once per DROP_LOG_INTERVAL_SECONDS"""
+        now = asyncio.get_running_loop().time()
+        if self._last_drop_log is not None and now - self._last_drop_log < DROP_LOG_INTERVAL_SECONDS:
+            return
+        logger.warning(
+            f"Ingest queue full for session {self.session_id}, dropped {self._unlogged_drops} oldest frames since the last report "
+            f"({self.dropped_seconds:.1f}s of audio dropped in total)"
+        )
+        self._unlogged_drops = 0
+        self._last_drop_log = now
+
+    async def _take_window(self) -> IngestFrame:
+        """Wait for audio and coalesce compatible frames up to one window"""
+        async with self._changed:
+            await self._changed.wait_for(lambda: bool(self.frames))
+
+            # Real-time input fills a window at the speed of speech, so the
+            # idle timeout restarts with every frame that arrives
+            while not self._flushing and not self._window_complete():
+                try:
+                    await asyncio.wait_for(self._changed.wait(), self.max_delay_seconds)
+                except asyncio.TimeoutError:
+                    break
+
+            first = self.frames.popleft()
+            parts = [first.samples]
+            sequences = list(first.sequences)
+            seconds = first.seconds
+            while self.frames and seconds < self.window_seconds and self.frames[0].compatible(first):
+                frame = self.frames.popleft()
+                parts.append(frame.samples)
+                sequences.extend(frame.sequences)
+                seconds += frame.seconds
+
+            self.queued_seconds -= seconds
+            self._busy = True
+            self._changed.notify_all()
+
+        samples = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return first._replace(samples=samples, sequences=tuple(sequences))
+
+    def _window_complete(self) -> bool:
+        """Whether the frames at the head of the queue fill a window"""
+        first = self.frames[0]
+        seconds = 0.0
+        for frame in self.frames:
+            if not frame.compatible(first):
+                # The window cannot grow past an incompatible frame
+                return True
+            seconds += frame.seconds
+            if seconds >= self.window_seconds:
+                return True
+        return False
+
+    async def _consume(self):
+        while True:
+            window = await self._take_window()
+            try:
+                await self.handler(window)
+            except Exception as e:
+                logger.error(f"Error processing ingested audio for session {self.session_id}: {e}")
+            finally:
+                async with self._changed:
+                    self._busy = False
+                    resume = self.paused and self.queued_seconds <= self.low_water_seconds
+                    if resume:
+                        self.paused = False
+                    self._changed.notify_all()
+            if resume:
+                await self.notify("resume", self.queued_seconds)
+
+    async def drain(self):
+        """Wait until all queued audio has been processed, flushing partial windows"""
+        async with self._changed:
+            self._flushing += 1
+            self._changed.notify_all()
+            try:
+                await self._changed.wait_for(lambda: not self.frames and not self._busy)
+            finally:
+                self._flushing -= 1
+
+    async def stop(self):
+        """Cancel the consumer task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional, Set
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+from .config import settings
+from .audio_decode import read_audio_file
+from .database import JobRepository, TranscriptRepository
+from .speech_processor import SpeechProcessor
+
+logger = logging.getLogger(__name__)
+
+def job_to_message(job: dict) -> dict:
+    """Public view of a job record, safe to JSON-encode"""
+    return {
+        "job_id": str(job["_id"]),
+        "session_id": job.get("session_id"),
+        "filename": job.get("filename"),
+        "state": job.get("state"),
+        "progress": job.get("progress", 0.0),
+        "audio_seconds_processed": job.get("audio_seconds_processed", 0.0),
+        "audio_seconds_total": job.get("audio_seconds_total"),
+        "eta_seconds": job.get("eta_seconds"),
+        "segments_added": job.get("segments_added"),
+        "error": job.get("error"),
+        "created_at": job["created_at"].isoformat() if job.get("created_at") else None,
+        "updated_at": job["updated_at"].isoformat() if job.get("updated_at") else None
+    }
+
+
+class _JobProgress:
+    """Progress of the job a worker is running, persisted periodically"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.processed = 0.0
+        self.total: Optional[float] = None
+
+    def update(self, processed: float, total: float):
+        self.processed = processed
+        self.total = total
+
+    def fields(self) -> dict:
+        if not self.total:
+            return {"progress": 0.0, "audio_seconds_processed": 0.0, "eta_seconds": None}
+        elapsed = time.perf_counter() - self.started
+        eta = elapsed / self.processed * (self.total - self.processed) if self.processed > 0 else None
+        return {
+            # Diarization and storage still follow the last window
+            "progress": round(min(99.0, 100.0 * self.processed / self.total), 1),
+            "audio_seconds_processed": round(self.processed, 2),
+            "audio_seconds_total": round(self.total, 2),
+            "eta_seconds": round(eta, 1) if eta is not None else None
+        }
+
+
+class TranscriptionJobQueue:
+    """Runs uploaded-file transcriptions in the background.
+
+    Each upload is saved to ``upload_dir`` and recorded in the
+    transcription_jobs collection; ``concurrency`` worker tasks claim queued
+    jobs atomically, so several server processes can share the queue.
+    Running jobs refresh a heartbeat along with their progress; jobs whose
+    heartbeat goes stale (the process died) are queued again, and jobs
+    interrupted by a clean shutdown are requeued immediately. Stored
+    segments are handed to ``publish_segments`` along with their ids, so
+    viewers of the session receive them like live segments.
+    """
+
+    def __init__(
+        self,
+        speech_processor: SpeechProcessor,
+        job_repo: JobRepository,
+        transcript_repo: TranscriptRepository,
+        notify: Callable[[dict], Awaitable[None]],
+        publish_segments: Callable[[str, List[ObjectId], list], Awaitable[None]],
+        upload_dir: str = "uploads",
+        concurrency: int = 1,
+        poll_seconds: float = 5.0,
+        progress_interval_seconds: float = 2.0,
+        stale_seconds: float = 120.0
+    ):
+        self.speech_processor = speech_processor
+        self.job_repo = job_repo
+        self.transcript_repo = transcript_repo
+        self.notify = notify
+        self.publish_segments = publish_segments
+        self.upload_dir = upload_dir
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.progress_interval_seconds = progress_interval_seconds
+        self.stale_seconds = stale_seconds
+        self.worker_id = uuid.uuid4().hex
+        self._wakeup = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._running: Set[str] = set()  # ids of jobs being processed here
+
+    def start(self):
+        if not self._workers:
+            os.makedirs(self.upload_dir, exist_ok=True)
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        """Cancel the workers and put their unfinished jobs back in the queue"""
+        interrupted = list(self._running)
+        for task in self._workers:
+            task.cancel()
+        for task in self._workers:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+
+        for job_id in interrupted:
+            try:
+                await self.job_repo.update_job(job_id, {"state": "queued", "worker_id": None})
+            except PyMongoError as e:
+                logger.error(f"Failed to requeue job {job_id}: {e}")
+
+    async def submit(self, session_id: str, file_path: str, filename: str, language: Optional[str]) -> str:
+        """Record a job for a saved upload and wake a worker"""
+        now = datetime.utcnow()
+        job_id = await self.job_repo.create_job({
+            "session_id": session_id,
+            "file_path": file_path,
+            "filename": filename,
+            "language": language,
+            "state": "queued",
+            "progress": 0.0,
+            "audio_seconds_processed": 0.0,
+            "audio_seconds_total": None,
+            "eta_seconds": None,
+            "created_at": now,
+            "updated_at": now
+        })
+        self._wakeup.set()
+        return job_id
+
+    async def _worker(self):
+        while True:
+            try:
+                stale = datetime.utcnow() - timedelta(seconds=self.stale_seconds)
+                requeued = await self.job_repo.requeue_stale_jobs(stale)
+                if requeued:
+                    logger.warning(f"Requeued {requeued} stale transcription jobs")
+
+                job = await self.job_repo.claim_next_job(self.worker_id)
+            except PyMongoError as e:
+                logger.error(f"Error claiming transcription job: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id = str(job["_id"])
+            self._running.add(job_id)
+            try:
+                await self._run_job(job)
+            except PyMongoError as e:
+                # Left running; the stale-heartbeat check hands it out again
+                logger.error(f"Error recording result of job {job_id}: {e}")
+            finally:
+                self._running.discard(job_id)
+
+    async def _publish(self, job_id: str, update: dict):
+        """Persist a job update and push it to subscribers"""
+        update["updated_at"] = datetime.utcnow()
+        await self.job_repo.update_job(job_id, update)
+        job = await self.job_repo.get_job(job_id)
+        if job is not None:
+            await self.notify(job_to_message(job))
+
+    async def _report_progress(self, job_id: str, progress: _JobProgress):
+        while True:
+            await asyncio.sleep(self.progress_interval_seconds)
+            try:
+                await self._publish(job_id, {**progress.fields(), "heartbeat_at": datetime.utcnow()})
+            except PyMongoError as e:
+                logger.error(f"Failed to record progress of job {job_id}: {e}")
+
+    async def _run_job(self, job: dict):
+        job_id = str(job["_id"])
+        session_id = job["session_id"]
+        progress = _JobProgress()
+        reporter = asyncio.create_task(self._report_progress(job_id, progress))
+        logger.info(f"Running transcription job {job_id} for session {session_id}")
+
+        try:
+            # Decode block by block off the event loop; the encoded file is never held whole
+            sample_rate = self.speech_processor.sample_rate
+            with open(job["file_path"], "rb") as f:
+                audio = await asyncio.to_thread(read_audio_file, f, sample_rate, settings.sample_rate)
+
+            segments = await self.speech_processor.process_long_audio(
+                audio,
+                sample_rate,
+                job.get("language"),
+                progress=progress.update
+            )
+
+            now = datetime.utcnow()
+            segment_ids = await self.transcript_repo.add_job_segments(session_id, job["_id"], [
+                {
+                    "speaker_id": segment.speaker_id,
+                    "start_time": segment.start_time,
+                    "end_time": segment.end_time,
+                    "text": segment.text,
+                    "confidence": segment.confidence,
+                    "timestamp": now
+                }
+                for segment in segments
+            ])
+            await self.transcript_repo.update_session(session_id, {
+                "audio_file_path": job.get("filename"),
+                "updated_at": now
+            })
+            await self.publish_segments(session_id, segment_ids, segments)
+        except asyncio.CancelledError:
+            reporter.cancel()
+            raise
+        except Exception as e:
+            reporter.cancel()
+            logger.error(f"Transcription job {job_id} failed: {e}")
+            await self._publish(job_id, {"state": "failed", "error": str(e), "eta_seconds": None})
+            self._remove_upload(job)
+            return
+
+        reporter.cancel()
+        await self._publish(job_id, {
+            **progress.fields(),
+            "state": "completed",
+            "progress": 100.0,
+            "eta_seconds": 0.0,
+            "segments_added": len(segments)
+        })
+        self._remove_upload(job)
+
+    def _remove_upload(self, job: dict):
+        """Delete a finished or failed job's uploaded file"""
+        try:
+            os.remove(job["file_path"])
+        except OSError as e:
+            logger.warning(f"Failed to remove upload {job['file_path']}: {e}")
@@ -0,0 +1,146 @@
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+
+class AudioWindow(NamedTuple):
+    """A slice of a long recording, in samples.
+
+    ``start``/``end`` is the audio sent to the model; ``keep_start``/``keep_end``
+    is the part of it whose words are kept when stitching. The two differ by
+    the overlap around each cut.
+    """
+    start: int
+    end: int
+    keep_start: int
+    keep_end: int
+
+
+def frame_energy(audio: np.ndarray, frame_samples: int) -> np.ndarray:
+    """RMS energy per full frame, used to find pauses when no VAD is available"""
+    n_frames = len(audio) // frame_samples
+    frames = audio[:n_frames * frame_samples].reshape(n_frames, frame_samples)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+
+def _quietest_point(frame_scores: np.ndarray, frame_samples: int, lo: int, hi: int, smooth_frames: int) -> int:
+    """Sample position of the quietest stretch in [lo, hi), preferring later ones"""
+    first, last = lo // frame_samples, min(hi // frame_samples, len(frame_scores))
+    if last <= first:
+        return hi
+    scores = frame_scores[first:last]
+    if smooth_frames > 1 and len(scores) >= smooth_frames:
+        scores = np.convolve(scores, np.ones(smooth_frames) / smooth_frames, mode="same")
+    # Latest minimum keeps windows as long as possible
+    best = len(scores) - 1 - int(np.argmin(scores[::-1]))
+    return (first + best) * frame_samples + frame_samples // 2
+
+
+def plan_windows(
+    n_samples: int,
+    sample_rate: int,
+    frame_scores: np.ndarray,
+    frame_samples: int,
+    window_seconds: float = 28.0,
+    overlap_seconds: float = 1.0,
+    search_seconds: float = 8.0
+) -> List[AudioWindow]:
+    """Split a recording into overlapping windows cut at pauses.
+
+    ``frame_scores`` rates each frame of ``frame_samples`` samples by how much
+    speech it holds (a VAD mask or frame energy). Each cut is placed at the
+    quietest point in the last ``search_seconds`` before the window would
+    exceed ``window_seconds``, and neighbouring windows overlap by
+    ``overlap_seconds`` around it.
+    """
+    window = int(window_seconds * sample_rate)
+    half_overlap = int(overlap_seconds * sample_rate) // 2
+    search = int(search_seconds * sample_rate)
+    smooth_frames = max(1, int(0.3 * sample_rate) // frame_samples)
+
+    windows = []
+    keep_start = 0
+    while True:
+        start = max(0, keep_start - half_overlap)
+        if n_samples - start <= window:
+            windows.append(AudioWindow(start, n_samples, keep_start, n_samples))
+            return windows
+
+        # The cut plus its overlap must fit in the window and leave progress
+        hi = start + window - half_overlap
+        lo = max(keep_start + 1, hi - search)
+        cut = _quietest_point(frame_scores, frame_samples, lo, hi, smooth_frames)
+        windows.append(AudioWindow(start, cut + half_overlap, keep_start, cut))
+        keep_start = cut
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def _repeated_prefix(previous: List[Dict], words: List[Dict], max_words: int = 8) -> int:
+    """Number of leading words repeating the end of the previous window"""
+    for k in range(min(max_words, len(previous), len(words)), 0, -1):
+        tail = [_normalize(w["word"]) for w in previous[-k:]]
+        head = [_normalize(w["word"]) for w in words[:k]]
+        if tail == head and any(tail) and words[0]["start"] < previous[-1]["end"] + 1.0:
+            return k
+    return 0
+
+
+def stitch_transcriptions(results: List[Tuple[AudioWindow, Dict]], sample_rate: int) -> Dict:
+    """Merge per-window Whisper results into one transcription of the recording.
+
+    Times are shifted to the recording, and only words whose midpoint lies
+    in a window's keep range survive, so each overlap is transcribed once.
+    Words a window repeats from the end of the previous one, when timestamps
+    drift across the cut, are dropped as well.
+    """
+    segments = []
+    language: Optional[str] = None
+    previous_words: List[Dict] = []
+
+    for window, result in results:
+        language = language or result.get("language")
+        offset = window.start / sample_rate
+        keep_start = window.keep_start / sample_rate
+        keep_end = window.keep_end / sample_rate
+        first_segment = True
+
+        for segment in result.get("segments", []):
+            start = segment.get("start", 0.0) + offset
+            end = segment.get("end", 0.0) + offset
+            words = segment.get("words")
+
+            if not words:
+                if keep_start <= (start + end) / 2 < keep_end and segment.get("text", "").strip():
+                    segments.append({**segment, "start": start, "end": end})
+                continue
+
+            kept = []
+            for word in words:
+                word = {**word, "start": word["start"] + offset, "end": word["end"] + offset}
+                if keep_start <= (word["start"] + word["end"]) / 2 < keep_end:
+                    kept.append(word)
+            if kept and first_segment:
+                kept = kept[_repeated_prefix(previous_words, kept):]
+            if not kept:
+                continue
+            first_segment = False
+
+            segments.append({
+                **segment,
+                "start": kept[0]["start"],
+                "end": kept[-1]["end"],
+                "text": "".join(word["word"] for word in kept),
+                "words": kept
+            })
+            previous_words = kept
+
+    for i, segment in enumerate(segments):
+        segment["id"] = i
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": language
+    }
@@ -3,8 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
+import asyncio
 import logging
 import json
+import shutil
 import uuid
 from typing import List, Optional
 from datetime import datetime
@@ -13,6 +15,8 @@ import os
 from .config import settings
 from .database import connect_to_mongo, close_mongo_connection, TranscriptRepository, SpeakerRepository
 from .websocket_manager import manager
+from .jobs import job_to_message
+from .audio_decode import read_audio_file
 from .export_service import exporter
 from .models import TranscriptSession, SpeakerProfile, SpeakerSegment
 
@@ -23,6 +27,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+UPLOAD_BLOCK_SIZE = 1 << 20
+
 # Create FastAPI app
 app = FastAPI(
     title="Real-Time Speech Recognition & Speaker Identification System",
@@ -69,6 +75,7 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on application shutdown"""
     logger.info("Shutting down application...")
+    await manager.shutdown()
     await close_mongo_connection()
     logger.info("Application shutdown complete")
 
@@ -80,9 +87,16 @@ async def websocket_endpoint(websocket: WebSocket, connection_id: str):
     await manager.connect(websocket, connection_id)
     try:
         while True:
-            # Receive message from client
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            # Receive message from client: binary frames carry audio, text frames carry JSON control messages
+            data = await websocket.receive()
+            if data["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(data.get("code", 1000))
+            
+            if data.get("bytes") is not None:
+                await manager.handle_binary_audio(connection_id, data["bytes"])
+                continue
+            
+            message = json.loads(data["text"])
             
             # Handle the message
             await manager.handle_message(websocket, connection_id, message)
@@ -111,12 +125,21 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow()}
 
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Speech processing and segment persistence metrics"""
+    return manager.get_metrics()
+
+
 @app.get("/api/sessions")
-async def get_sessions(limit: int = 100):
-    """Get all transcription sessions"""
+async def get_sessions(limit: int = 50, cursor: Optional[str] = None):
+    """List transcription session summaries, newest first, one page at a time"""
     try:
-        sessions = await transcript_repo.get_all_sessions(limit)
-        return {"sessions": sessions}
+        limit = max(1, min(limit, 200))
+        sessions, next_cursor = await transcript_repo.get_all_sessions(limit, cursor)
+        return {"sessions": sessions, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching sessions: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch sessions")
@@ -141,7 +164,7 @@ async def get_session(session_id: str):
 async def delete_session(session_id: str):
     """Delete a transcription session"""
     try:
-        session = await transcript_repo.get_session(session_id)
+        session = await transcript_repo.get_session(session_id, include_segments=False)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
@@ -158,7 +181,8 @@ async def delete_session(session_id: str):
 async def export_session(session_id: str, format_type: str = "txt"):
     """Export a transcription session"""
     try:
-        # Get session data
+        # Get session data, including live segments not yet written
+        await manager.segment_writer.flush()
         session = await transcript_repo.get_session(session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -222,11 +246,12 @@ async def create_speaker(
 ):
     """Create a new speaker profile from audio file"""
     try:
-        # Read audio file
-        audio_content = await audio_file.read()
+        # Decode the uploaded container (WAV, FLAC, ...) block by block
+        audio_array = await asyncio.to_thread(
+            read_audio_file, audio_file.file, settings.sample_rate, settings.sample_rate
+        )
         
         # Process audio to extract embedding
-        audio_array = manager.speech_processor.preprocess_audio(audio_content)
         embedding = await manager.speech_processor.get_speaker_embedding(
             audio_array, 0, len(audio_array) / settings.sample_rate
         )
@@ -284,8 +309,7 @@ async def delete_speaker(speaker_id: str):
             raise HTTPException(status_code=404, detail="Speaker not found")
         
         # Remove from speech processor
-        if speaker["name"] in manager.speech_processor.known_speakers:
-            del manager.speech_processor.known_speakers[speaker["name"]]
+        manager.speech_processor.remove_known_speaker(speaker["name"])
         
         await speaker_repo.delete_speaker(speaker_id)
         return {"message": "Speaker deleted successfully"}
@@ -296,59 +320,62 @@ async def delete_speaker(speaker_id: str):
         raise HTTPException(status_code=500, detail="Failed to delete speaker")
 
 
-@app.post("/api/upload-audio")
+@app.post("/api/upload-audio", status_code=202)
 async def upload_audio_file(
     session_id: str = Form(...),
     audio_file: UploadFile = File(...),
     language: Optional[str] = Form(None)
 ):
-    """Upload and process audio file for batch transcription"""
+    """Upload an audio file and queue it for background batch transcription"""
     try:
         # Verify session exists
-        session = await transcript_repo.get_session(session_id)
+        session = await transcript_repo.get_session(session_id, include_segments=False)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        # Read audio file
-        audio_content = await audio_file.read()
-        
-        # Process audio
-        segments = await manager.speech_processor.process_audio_chunk(
-            audio_content, 
-            settings.sample_rate,
-            language
-        )
-        
-        # Store segments in database
-        for segment in segments:
-            segment_dict = {
-                "speaker_id": segment.speaker_id,
-                "start_time": segment.start_time,
-                "end_time": segment.end_time,
-                "text": segment.text,
-                "confidence": segment.confidence,
-                "timestamp": datetime.utcnow()
-            }
+        # Save the upload so the job survives restarts, without buffering it whole
+        filename = os.path.basename(audio_file.filename or "audio")
+        file_path = os.path.join(settings.job_upload_dir, f"{uuid.uuid4().hex}_{filename}")
+        try:
+            # Copy off the event loop; the spooled upload may already be on disk
+            with open(file_path, "wb") as f:
+                await asyncio.to_thread(shutil.copyfileobj, audio_file.file, f, UPLOAD_BLOCK_SIZE)
             
-            await transcript_repo.add_segment(session_id, segment_dict)
-        
-        # Update session
-        await transcript_repo.update_session(session_id, {
-            "audio_file_path": audio_file.filename,
-            "updated_at": datetime.utcnow()
-        })
+            job_id = await manager.job_queue.submit(session_id, file_path, audio_file.filename, language)
+        except BaseException:
+            # No job will ever pick the file up
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+            raise
         
         return {
-            "message": "Audio file processed successfully",
-            "segments_added": len(segments),
+            "message": "Audio file queued for transcription",
+            "job_id": job_id,
             "session_id": session_id
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error processing audio file: {e}")
-        raise HTTPException(status_code=500, detail="Failed to process audio file")
+        logger.error(f"Error queueing audio file: {e}")
+        raise HTTPException(status_code=500, detail="Failed to queue audio file")
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get state, progress and ETA of an upload transcription job"""
+    try:
+        job = await manager.job_repo.get_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job_to_message(job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching job {job_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch job")
 
 
 if __name__ == "__main__":
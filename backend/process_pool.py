@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Any, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Per-process model, loaded once by the pool initializer
+_worker_model = None
+
+
+def _init_worker(model_name: str, intra_op_threads: int):
+    """Load Whisper once in each worker process"""
+    global _worker_model
+    import torch
+    import whisper
+
+    if intra_op_threads:
+        torch.set_num_threads(intra_op_threads)
+    _worker_model = whisper.load_model(model_name)
+
+
+def _attach(name: str) -> SharedMemory:
+    """Attach to a block owned by the parent without tracking it here"""
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: stop this process's tracker from unlinking the block
+        shm = SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _transcribe_worker(shm_name: str, shape: Tuple[int, ...], options: Dict[str, Any]) -> Dict:
+    """Transcribe audio read from shared memory"""
+    shm = _attach(shm_name)
+    try:
+        view = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        try:
+            # A private copy keeps the model's tensors, and the frames of a
+            # failed call, from pinning the buffer, so it always closes
+            audio = view.copy()
+        finally:
+            del view
+    finally:
+        shm.close()
+    return _worker_model.transcribe(audio, **options)
+
+
+class ProcessInferencePool:
+    """Whisper transcription on worker processes.
+
+    Whisper's Python-side decoding loop holds the GIL, so threads stop
+    scaling past a few workers. Each process loads the model once; audio is
+    handed over through ``multiprocessing.shared_memory`` instead of being
+    pickled, and only the (small) result dict travels back.
+    """
+
+    def __init__(self, model_name: str, processes: int = 4, intra_op_threads: int = 1, max_queue: int = 16):
+        self.processes = processes
+        self.max_queue = max_queue
+        self._executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, intra_op_threads)
+        )
+        self._slots = asyncio.Semaphore(processes + max_queue)
+        self.pending = 0
+        self.metrics = {
+            "process_pool_calls_total": 0,
+            "process_pool_seconds_total": 0.0
+        }
+
+    @property
+    def saturated(self) -> bool:
+        return self.pending >= self.processes + self.max_queue
+
+    async def transcribe(self, audio: np.ndarray, **options) -> Dict:
+        """Transcribe on a worker process, passing audio via shared memory"""
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        async with self._slots:
+            self.pending += 1
+            started = time.perf_counter()
+            shm = SharedMemory(create=True, size=max(audio.nbytes, 1))
+            try:
+                view = np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)
+                try:
+                    view[:] = audio
+                finally:
+                    # Views into the buffer must be gone before it can be closed
+                    del view
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._executor,
+                    partial(_transcribe_worker, shm.name, audio.shape, options)
+                )
+            finally:
+                try:
+                    shm.close()
+                finally:
+                    shm.unlink()
+                    self.pending -= 1
+                    self.metrics["process_pool_calls_total"] += 1
+                    self.metrics["process_pool_seconds_total"] += time.perf_counter() - started
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self.metrics)
+        metrics["process_pool_pending"] = self.pending
+        return metrics
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        self._executor.shutdown(wait=False)
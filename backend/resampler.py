@@ -0,0 +1,106 @@
+from functools import lru_cache
+from math import gcd
+from typing import Tuple
+import numpy as np
+from scipy.signal import firwin, upfirdn
+
+
+@lru_cache(maxsize=32)
+def design_filter(up: int, down: int) -> Tuple[np.ndarray, int]:
+    """Anti-aliasing FIR for an up/down ratio, cached per ratio.
+
+    This is the filter ``scipy.signal.resample_poly`` designs (Kaiser window,
+    beta 5, 10 zero crossings per side), so streaming output matches
+    resampling the whole signal at once. Returns the taps and the filter's
+    half length, its delay in upsampled samples.
+    """
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    h = firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0)) * up
+    return h.astype(np.float32), half_len
+
+
+class StreamingResampler:
+    """Polyphase FIR resampler that carries filter state across chunks.
+
+    Feeding a signal chunk by chunk through ``process`` and then ``flush``
+    yields the same samples as resampling it in one piece, so chunk borders
+    leave no edge artifacts. Each output sample is only emitted once the
+    input it depends on has arrived, which delays output by half the filter
+    length (about 10 output samples).
+    """
+
+    def __init__(self, orig_rate: int, target_rate: int):
+        divisor = gcd(orig_rate, target_rate)
+        self.orig_rate = orig_rate
+        self.target_rate = target_rate
+        self.up = target_rate // divisor
+        self.down = orig_rate // divisor
+        if self.up == self.down:
+            # Same rate: chunks pass through untouched
+            self.filter, self.delay = np.ones(1, dtype=np.float32), 0
+        else:
+            self.filter, self.delay = design_filter(self.up, self.down)
+        self.history = -(-len(self.filter) // self.up)  # input samples one output depends on
+        self.reset()
+
+    def reset(self):
+        """Forget the signal seen so far"""
+        # History starts as zeros, as if the signal were preceded by silence
+        self._buffer = np.zeros(self.history, dtype=np.float32)
+        self._base = -self.history  # input index of _buffer[0]
+        self._next_out = 0
+        self._n_in = 0
+
+    def _emit(self, last_out: int) -> np.ndarray:
+        """Compute outputs up to (excluding) ``last_out`` from the buffered input"""
+        count = last_out - self._next_out
+        if count <= 0:
+            return np.zeros(0, dtype=np.float32)
+
+        # Output n is the upsampled convolution at n * down + delay; relative to
+        # the buffer that is t below. Delaying the filter by `shift` lines t up
+        # with upfirdn's decimation grid.
+        t = self._next_out * self.down + self.delay - self._base * self.up
+        shift = -t % self.down
+        h = np.concatenate([np.zeros(shift, dtype=np.float32), self.filter]) if shift else self.filter
+        first = (t + shift) // self.down
+        out = upfirdn(h, self._buffer, self.up, self.down)[first:first + count]
+
+        self._next_out = last_out
+        # Keep only the history the next output needs
+        newest = (self._next_out * self.down + self.delay) // self.up
+        keep_from = newest - self.history - self._base
+        if keep_from > 0:
+            self._buffer = self._buffer[keep_from:]
+            self._base += keep_from
+        return out.astype(np.float32, copy=False)
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """Resample the next chunk of float32 audio"""
+        if self.up == self.down:
+            return chunk
+        self._buffer = np.concatenate([self._buffer, chunk.astype(np.float32, copy=False)])
+        self._n_in += len(chunk)
+        available = self._base + len(self._buffer)  # input samples received
+        # Output n needs input up to (n * down + delay) // up
+        last_out = (available * self.up - 1 - self.delay) // self.down + 1
+        return self._emit(max(last_out, self._next_out))
+
+    def flush(self) -> np.ndarray:
+        """Emit the outputs still waiting on lookahead, padding with silence"""
+        if self.up == self.down:
+            return np.zeros(0, dtype=np.float32)
+        total_out = -(-self._n_in * self.up // self.down)
+        pad = self.delay // self.up + 2
+        self._buffer = np.concatenate([self._buffer, np.zeros(pad, dtype=np.float32)])
+        out = self._emit(total_out)
+        self.reset()
+        return out
+
+
+def resample(audio: np.ndarray, orig_rate: int, target_rate: int) -> np.ndarray:
+    """Resample a complete signal with the cached polyphase filters"""
+    resampler = StreamingResampler(orig_rate, target_rate)
+    out = resampler.process(audio)
+    return np.concatenate([out, resampler.flush()])
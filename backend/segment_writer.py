@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, PyMongoError
+from .database import TranscriptRepository
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class SegmentWriteBuffer:
+    """Write-behind buffer between live transcription and transcript_segments.
+
+    Segments are queued in memory and returned to the caller at once, so
+    broadcasting does not wait on MongoDB. A background task flushes the
+    queue once ``max_batch`` segments are waiting or every
+    ``flush_interval_seconds``, retrying failed writes with exponential
+    backoff. Each segment gets its ObjectId when queued, which keeps
+    insertion order and makes a retried partial insert idempotent.
+    """
+
+    def __init__(
+        self,
+        transcript_repo: TranscriptRepository,
+        max_batch: int = 200,
+        flush_interval_seconds: float = 1.0,
+        max_retries: int = 5,
+        retry_backoff_seconds: float = 0.5
+    ):
+        self.transcript_repo = transcript_repo
+        self.max_batch = max_batch
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._pending: Deque[Tuple[str, dict]] = deque()
+        self._full = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = {
+            "segment_flush_count": 0,
+            "segment_flush_failures": 0,
+            "segment_write_retries": 0,
+            "segments_written": 0,
+            "segment_flush_latency_seconds_total": 0.0,
+            "segment_flush_latency_seconds_max": 0.0
+        }
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush task and write out everything still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def add(self, session_id: str, segments: List[dict]) -> List[ObjectId]:
+        """Queue segments of a session for writing and return their ids"""
+        ids = []
+        for segment in segments:
+            segment_id = ObjectId()
+            self._pending.append((session_id, {"_id": segment_id, **segment}))
+            ids.append(segment_id)
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        return ids
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write all queued segments, leaving them queued if retries run out"""
+        async with self._lock:
+            while self._pending:
+                count = min(len(self._pending), self.max_batch)
+                batch = [self._pending.popleft() for _ in range(count)]
+
+                start = time.perf_counter()
+                try:
+                    failed = await self._write_batch(batch)
+                except asyncio.CancelledError:
+                    # Rewriting already inserted segments is harmless, losing them is not
+                    self._pending.extendleft(reversed(batch))
+                    raise
+                elapsed = time.perf_counter() - start
+
+                self.metrics["segment_flush_count"] += 1
+                self.metrics["segment_flush_latency_seconds_total"] += elapsed
+                self.metrics["segment_flush_latency_seconds_max"] = max(
+                    self.metrics["segment_flush_latency_seconds_max"], elapsed
+                )
+                self.metrics["segments_written"] += count - len(failed)
+
+                if failed:
+                    # Keep them first in line and try again on the next flush
+                    self.metrics["segment_flush_failures"] += 1
+                    self._pending.extendleft(reversed(failed))
+                    break
+
+    async def _write_batch(self, batch: List[Tuple[str, dict]]) -> List[Tuple[str, dict]]:
+        """Write a batch grouped by session; return the entries that could not be written"""
+        by_session: Dict[str, List[dict]] = {}
+        for session_id, segment in batch:
+            by_session.setdefault(session_id, []).append(segment)
+
+        sessions = list(by_session)
+        written = await asyncio.gather(
+            *(self._write_session(session_id, by_session[session_id]) for session_id in sessions)
+        )
+        failed = {session_id for session_id, ok in zip(sessions, written) if not ok}
+        return [entry for entry in batch if entry[0] in failed]
+
+    async def _write_session(self, session_id: str, segments: List[dict]) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.transcript_repo.add_segments(session_id, segments)
+                return True
+            except BulkWriteError as e:
+                # Segments inserted by an earlier attempt come back as duplicate keys;
+                # anything else, including a write concern failure, is retried
+                errors = e.details.get("writeErrors", [])
+                if (
+                    errors
+                    and not e.details.get("writeConcernErrors")
+                    and all(write_error.get("code") == DUPLICATE_KEY_ERROR for write_error in errors)
+                ):
+                    return True
+                error = e
+            except PyMongoError as e:
+                error = e
+
+            if attempt < self.max_retries:
+                self.metrics["segment_write_retries"] += 1
+                await asyncio.sleep(self.retry_backoff_seconds * (2 ** attempt))
+
+        logger.error(f"Failed to write {len(segments)} segments for session {session_id}: {error}")
+        return False
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self.metrics)
+        flushes = metrics["segment_flush_count"]
+        metrics["segment_queue_depth"] = len(self._pending)
+        metrics["segment_flush_latency_seconds_avg"] = (
+            metrics["segment_flush_latency_seconds_total"] / flushes if flushes else 0.0
+        )
+        return metrics
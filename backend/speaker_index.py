@@ -0,0 +1,311 @@
+import numpy as np
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import List, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """L2-normalize embeddings row-wise as contiguous float32"""
+    embeddings = np.ascontiguousarray(np.atleast_2d(embeddings), dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k highest scores per row, best first"""
+    k = min(k, scores.shape[1])
+    if k == 1:
+        return scores.argmax(axis=1)[:, None]
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+class SpeakerIndex(ABC):
+    """Base class for known speaker embedding indexes.
+
+    Embeddings are L2-normalized and stored in a contiguous float32 slot
+    matrix that grows geometrically, so adds and removes are incremental.
+    Removed slots are zeroed and reused. Subclasses implement ``add``,
+    ``remove`` and ``search`` on top of ``_store`` and ``_release``.
+    """
+
+    backend = "base"
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim
+        self._vectors = np.zeros((0, dim or 0), dtype=np.float32)
+        self._slot_names: List[Optional[str]] = []  # slot -> speaker_name, None if free
+        self._slots: Dict[str, int] = {}  # speaker_name -> slot
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._slots
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._slots)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._vectors[self._slots[name]]
+
+    def __delitem__(self, name: str):
+        self.remove(name)
+
+    def items(self):
+        return ((name, self._vectors[slot]) for name, slot in self._slots.items())
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        slot = len(self._slot_names)
+        if slot >= len(self._vectors):
+            capacity = max(64, len(self._vectors) * 2)
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            grown[:len(self._vectors)] = self._vectors
+            self._vectors = grown
+        self._slot_names.append(None)
+        return slot
+
+    @abstractmethod
+    def add(self, name: str, embedding: np.ndarray):
+        """Add or replace a speaker embedding"""
+
+    @abstractmethod
+    def remove(self, name: str):
+        """Remove a speaker embedding"""
+
+    @abstractmethod
+    def search(self, embeddings: np.ndarray, k: int = 1) -> List[List[Tuple[str, float]]]:
+        """Return the top-k (speaker_name, cosine similarity) candidates per query row"""
+
+    def _store(self, name: str, embedding: np.ndarray) -> int:
+        """Normalize and store an embedding, replacing the speaker's previous one; returns its slot"""
+        vector = normalize_embeddings(embedding)[0]
+        if self.dim is None:
+            self.dim = len(vector)
+            self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        elif len(vector) != self.dim:
+            raise ValueError(f"Embedding dimension {len(vector)} does not match index dimension {self.dim}")
+
+        if name in self._slots:
+            self.remove(name)
+        slot = self._allocate()
+        self._vectors[slot] = vector
+        self._slot_names[slot] = name
+        self._slots[name] = slot
+        return slot
+
+    def _release(self, name: str) -> int:
+        """Free a speaker's slot for reuse; returns the slot"""
+        slot = self._slots.pop(name)
+        self._vectors[slot] = 0.0
+        self._slot_names[slot] = None
+        self._free.append(slot)
+        return slot
+
+    def _score_slots(self, query: np.ndarray, slots: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """Rank candidate slots for a single query"""
+        if len(slots) == 0:
+            return []
+        scores = self._vectors[slots] @ query
+        top = top_k_rows(scores[None, :], k)[0]
+        return [(self._slot_names[slots[j]], float(scores[j])) for j in top]
+
+    def _state(self) -> Dict[str, np.ndarray]:
+        size = len(self._slot_names)
+        return {
+            "vectors": self._vectors[:size],
+            "names": np.array([name or "" for name in self._slot_names], dtype=str),
+            "occupied": np.array([name is not None for name in self._slot_names], dtype=bool),
+        }
+
+    def _load_state(self, state: Dict[str, np.ndarray]):
+        vectors = state["vectors"]
+        self.dim = vectors.shape[1] if vectors.size else self.dim
+        self._vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self._slot_names = [
+            str(name) if occupied else None
+            for name, occupied in zip(state["names"], state["occupied"])
+        ]
+        self._slots = {name: slot for slot, name in enumerate(self._slot_names) if name is not None}
+        self._free = [slot for slot, name in enumerate(self._slot_names) if name is None]
+
+    def save(self, path: str):
+        """Persist the index atomically to an .npz file"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp.npz"
+        np.savez(temp_path, backend=np.array(self.backend), **self._state())
+        os.replace(temp_path, path)
+        logger.info(f"Saved {self.backend} speaker index with {len(self)} speakers to {path}")
+
+    def load(self, path: str) -> bool:
+        """Load a persisted index; returns False if none exists or backends differ"""
+        if not os.path.exists(path):
+            return False
+        with np.load(path, allow_pickle=False) as data:
+            if str(data["backend"]) != self.backend:
+                logger.warning(f"Ignoring persisted {data['backend']} speaker index, expected {self.backend}")
+                return False
+            self._load_state({key: data[key] for key in data.files})
+        logger.info(f"Loaded {self.backend} speaker index with {len(self)} speakers from {path}")
+        return True
+
+
+class ExactSpeakerIndex(SpeakerIndex):
+    """Brute-force index: one matrix product against every enrolled speaker"""
+
+    backend = "exact"
+
+    def add(self, name: str, embedding: np.ndarray):
+        self._store(name, embedding)
+
+    def remove(self, name: str):
+        self._release(name)
+
+    def search(self, embeddings: np.ndarray, k: int = 1) -> List[List[Tuple[str, float]]]:
+        queries = normalize_embeddings(embeddings)
+        if not self._slots:
+            return [[] for _ in range(len(queries))]
+
+        size = len(self._slot_names)
+        scores = queries @ self._vectors[:size].T  # (Q, slots) cosine similarities
+        if self._free:
+            scores[:, self._free] = -np.inf
+        top = top_k_rows(scores, min(k, len(self._slots)))
+
+        return [
+            [(self._slot_names[j], float(scores[i, j])) for j in row]
+            for i, row in enumerate(top)
+        ]
+
+
+class IVFSpeakerIndex(SpeakerIndex):
+    """Inverted-file approximate index built with spherical k-means.
+
+    Speakers are bucketed by their nearest centroid and a query only scores
+    the ``nprobe`` closest buckets. Until enough speakers are enrolled to
+    train the centroids (``nlist * 8``, checked on add and on load), search
+    falls back to scoring every speaker.
+    """
+
+    backend = "ivf"
+
+    def __init__(self, dim: Optional[int] = None, nlist: int = 256, nprobe: int = 8, train_iterations: int = 10):
+        super().__init__(dim)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_iterations = train_iterations
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._assignment: Dict[int, int] = {}  # slot -> list id
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self):
+        """Fit centroids on the enrolled speakers and rebuild the inverted lists"""
+        slots = np.array(sorted(self._slots.values()), dtype=np.int64)
+        nlist = min(self.nlist, len(slots))
+        if nlist == 0:
+            return
+
+        data = self._vectors[slots]
+        rng = np.random.default_rng(0)
+        centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+        for _ in range(self.train_iterations):
+            assignment = (data @ centroids.T).argmax(axis=1)
+            for c in range(nlist):
+                members = data[assignment == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = normalize_embeddings(centroids)
+
+        self.centroids = centroids
+        self._lists = [[] for _ in range(nlist)]
+        self._assignment = {}
+        for slot in slots:
+            self._assign(int(slot))
+        logger.info(f"Trained IVF speaker index: {nlist} lists over {len(slots)} speakers")
+
+    def _train_if_ready(self):
+        if not self.trained and len(self._slots) >= self.nlist * 8:
+            self.train()
+
+    def _assign(self, slot: int):
+        list_id = int((self.centroids @ self._vectors[slot]).argmax())
+        self._lists[list_id].append(slot)
+        self._assignment[slot] = list_id
+
+    def add(self, name: str, embedding: np.ndarray):
+        slot = self._store(name, embedding)
+        if self.trained:
+            self._assign(slot)
+        else:
+            self._train_if_ready()
+
+    def remove(self, name: str):
+        slot = self._release(name)
+        list_id = self._assignment.pop(slot, None)
+        if list_id is not None:
+            self._lists[list_id].remove(slot)
+
+    def search(self, embeddings: np.ndarray, k: int = 1) -> List[List[Tuple[str, float]]]:
+        queries = normalize_embeddings(embeddings)
+        if not self._slots:
+            return [[] for _ in range(len(queries))]
+
+        if not self.trained:
+            candidates = np.array(sorted(self._slots.values()), dtype=np.int64)
+            return [self._score_slots(query, candidates, k) for query in queries]
+
+        probes = top_k_rows(queries @ self.centroids.T, self.nprobe)
+        results = []
+        for query, lists in zip(queries, probes):
+            candidates = [slot for list_id in lists for slot in self._lists[list_id]]
+            results.append(self._score_slots(query, np.array(candidates, dtype=np.int64), k))
+        return results
+
+    def _state(self) -> Dict[str, np.ndarray]:
+        state = super()._state()
+        if self.trained:
+            state["centroids"] = self.centroids
+            state["assignment"] = np.array(
+                [self._assignment.get(slot, -1) for slot in range(len(self._slot_names))],
+                dtype=np.int64
+            )
+        return state
+
+    def _load_state(self, state: Dict[str, np.ndarray]):
+        super()._load_state(state)
+        if "centroids" not in state:
+            self.centroids = None
+            self._lists, self._assignment = [], {}
+            # Saved before the index was large enough to train, or with a smaller nlist
+            self._train_if_ready()
+            return
+        self.centroids = np.ascontiguousarray(state["centroids"], dtype=np.float32)
+        self._lists = [[] for _ in range(len(self.centroids))]
+        self._assignment = {}
+        for slot, list_id in enumerate(state["assignment"]):
+            if list_id >= 0 and self._slot_names[slot] is not None:
+                self._lists[list_id].append(slot)
+                self._assignment[slot] = int(list_id)
+
+
+def create_speaker_index(backend: str = "exact", **kwargs) -> SpeakerIndex:
+    """Create a speaker index for the configured backend"""
+    if backend == "exact":
+        return ExactSpeakerIndex()
+    if backend == "ivf":
+        return IVFSpeakerIndex(**kwargs)
+    raise ValueError(f"Unknown speaker index backend: {backend}")
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+import numpy as np
+from pymongo.errors import OperationFailure, PyMongoError
+from .config import settings
+from .database import SpeakerRepository
+from .speech_processor import SpeechProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class SpeakerSync:
+    """Keeps SpeechProcessor.known_speakers in sync with speaker_profiles.
+
+    At startup the index is reconciled against MongoDB, fetching embeddings
+    only for speakers the (possibly persisted) index does not hold yet.
+    Afterwards a change stream, or a polling loop when change streams are
+    unavailable, applies adds and deletes incrementally. Each time the change
+    stream opens the index is resynced, so changes made before it opened,
+    after ``load`` or while a failed stream was down, are not missed. A
+    failed stream is reopened with exponential backoff.
+    """
+
+    def __init__(self, speech_processor: SpeechProcessor, speaker_repo: SpeakerRepository):
+        self.speech_processor = speech_processor
+        self.speaker_repo = speaker_repo
+        self.speaker_names: Dict[str, str] = {}  # speaker _id -> name
+        self._task: Optional[asyncio.Task] = None
+        self._stream_opened = False
+
+    def _apply(self, speaker: dict):
+        """Add or replace one speaker profile in the index"""
+        embedding = speaker.get("voice_embedding")
+        if not embedding:
+            return
+        speaker_id = str(speaker["_id"])
+        previous = self.speaker_names.get(speaker_id)
+        if previous and previous != speaker["name"] and previous in self.speech_processor.known_speakers:
+            self.speech_processor.known_speakers.remove(previous)
+        self.speech_processor.known_speakers.add(speaker["name"], np.asarray(embedding, dtype=np.float32))
+        self.speaker_names[speaker_id] = speaker["name"]
+
+    def _drop(self, speaker_id: str):
+        """Remove one speaker profile from the index"""
+        name = self.speaker_names.pop(speaker_id, None)
+        if name and name in self.speech_processor.known_speakers:
+            self.speech_processor.known_speakers.remove(name)
+
+    async def load(self):
+        """Reconcile the in-memory index with all stored speaker profiles"""
+        batch_size = settings.speaker_sync_batch_size
+        index = self.speech_processor.known_speakers
+        stored_names = set()
+        missing_ids = []
+
+        async for speaker in self.speaker_repo.iter_speaker_names(batch_size):
+            self.speaker_names[str(speaker["_id"])] = speaker["name"]
+            stored_names.add(speaker["name"])
+            if speaker["name"] not in index:
+                missing_ids.append(speaker["_id"])
+
+        # Drop speakers persisted in the index but deleted from the database
+        for name in [name for name in index if name not in stored_names]:
+            index.remove(name)
+
+        for start in range(0, len(missing_ids), batch_size):
+            async for speaker in self.speaker_repo.iter_voice_embeddings(
+                missing_ids[start:start + batch_size], batch_size
+            ):
+                self._apply(speaker)
+
+        logger.info(f"Loaded {len(index)} known speakers ({len(missing_ids)} fetched from database)")
+
+    def start(self):
+        """Start watching speaker_profiles for changes"""
+        if self._task is None and settings.speaker_sync_mode != "off":
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the watcher"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        if settings.speaker_sync_mode in ("auto", "change_stream"):
+            if await self._follow_change_stream():
+                return
+        await self._poll()
+
+    async def _follow_change_stream(self) -> bool:
+        """Apply changes from the change stream, reopening it after errors.
+
+        Returns False if change streams are unavailable, so the caller falls
+        back to polling; otherwise runs until cancelled.
+        """
+        delay = 1.0
+        while True:
+            self._stream_opened = False
+            try:
+                await self._watch_change_stream()
+                problem = "closed"
+            except OperationFailure as e:
+                if not self._stream_opened:
+                    # Standalone servers do not support change streams
+                    logger.info(f"Speaker change stream unavailable, falling back to polling: {e}")
+                    return False
+                problem = f"failed: {e}"
+            except PyMongoError as e:
+                problem = f"failed: {e}"
+
+            # Back off further only while the stream cannot be opened
+            if self._stream_opened:
+                delay = 1.0
+            logger.error(f"Speaker change stream {problem}, reopening in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.speaker_sync_retry_max_seconds)
+
+    async def _watch_change_stream(self):
+        async with self.speaker_repo.watch() as stream:
+            self._stream_opened = True
+            # Changes before the stream opened are not replayed; later ones
+            # are buffered by the stream while this runs
+            await self.resync()
+            async for change in stream:
+                operation = change["operationType"]
+                if operation in ("insert", "update", "replace") and change.get("fullDocument"):
+                    self._apply(change["fullDocument"])
+                elif operation == "delete":
+                    self._drop(str(change["documentKey"]["_id"]))
+
+    async def resync(self):
+        """Apply speaker profiles added or deleted since the last sync"""
+        batch_size = settings.speaker_sync_batch_size
+        current = {}
+        async for speaker in self.speaker_repo.iter_speaker_names(batch_size):
+            current[str(speaker["_id"])] = speaker["_id"]
+
+        for speaker_id in set(self.speaker_names) - set(current):
+            self._drop(speaker_id)
+
+        added = [current[speaker_id] for speaker_id in set(current) - set(self.speaker_names)]
+        for start in range(0, len(added), batch_size):
+            async for speaker in self.speaker_repo.iter_voice_embeddings(
+                added[start:start + batch_size], batch_size
+            ):
+                self._apply(speaker)
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(settings.speaker_sync_poll_seconds)
+            try:
+                await self.resync()
+            except PyMongoError as e:
+                logger.error(f"Error polling speaker profiles: {e}")
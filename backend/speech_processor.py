@@ -1,18 +1,25 @@
 import whisper
 import torch
-import torchaudio
 import numpy as np
-import librosa
 from pyannote.audio import Pipeline
 from pyannote.audio.pipelines.speaker_verification import PretrainedSpeakerEmbedding
-from sklearn.metrics.pairwise import cosine_similarity
 import asyncio
 import logging
-from typing import List, Tuple, Dict, Optional
-import tempfile
-import os
+from itertools import islice
+from typing import Callable, List, Tuple, Dict, Optional, Union
 from .config import settings
 from .models import SpeakerSegment
+from .streaming import StreamDecodeError, StreamingSession
+from .speaker_index import create_speaker_index
+from .alignment import SpeakerTimeline, split_words_by_speaker
+from .vad import VoiceActivityDetector
+from .inference import InferenceExecutor
+from .process_pool import ProcessInferencePool
+from .batching import WhisperBatchScheduler
+from .feature_cache import FeatureCache
+from .long_audio import AudioWindow, frame_energy, plan_windows, stitch_transcriptions
+from .resampler import StreamingResampler, resample
+from .audio_decode import PcmWorkspace, pcm16_to_float32
 import io
 import wave
 
@@ -28,15 +35,123 @@ class SpeechProcessor:
         self.embedding_model = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.sample_rate = settings.sample_rate
-        self.known_speakers = {}  # speaker_name -> embedding
+        self.known_speakers = self._create_speaker_index()  # speaker_name -> normalized embedding
+        self.streams: Dict[str, StreamingSession] = {}  # stream_id -> streaming state
+        self.resamplers: Dict[str, StreamingResampler] = {}  # stream_id -> resampler state
+        self.workspaces: Dict[str, PcmWorkspace] = {}  # stream_id -> int16 conversion buffer
+        self.vad = None
+        self.executor: Optional[InferenceExecutor] = None
+        self.process_pool: Optional[ProcessInferencePool] = None
+        self.batch_scheduler: Optional[WhisperBatchScheduler] = None
+        self.metrics = {
+            "vad_chunks_total": 0,
+            "vad_chunks_dropped": 0,
+            "vad_audio_seconds": 0.0,
+            "vad_speech_seconds": 0.0,
+            "long_audio_windows": 0
+        }
         
+    def _create_speaker_index(self):
+        """Create the configured known speaker index"""
+        if settings.speaker_index_backend == "ivf":
+            return create_speaker_index(
+                "ivf",
+                nlist=settings.speaker_index_nlist,
+                nprobe=settings.speaker_index_nprobe
+            )
+        return create_speaker_index(settings.speaker_index_backend)
+    
+    def load_speaker_index(self) -> bool:
+        """Restore known speakers from the persisted index, if any"""
+        if not settings.speaker_index_path:
+            return False
+        try:
+            return self.known_speakers.load(settings.speaker_index_path)
+        except Exception as e:
+            logger.error(f"Failed to load speaker index: {e}")
+            return False
+    
+    def shutdown(self):
+        """Release inference resources"""
+        if self.batch_scheduler is not None:
+            self.batch_scheduler.stop()
+        if self.executor is not None:
+            self.executor.shutdown()
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+    
+    def save_speaker_index(self):
+        """Persist known speakers so restarts skip re-embedding and retraining"""
+        if not settings.speaker_index_path:
+            return
+        try:
+            self.known_speakers.save(settings.speaker_index_path)
+        except Exception as e:
+            logger.error(f"Failed to save speaker index: {e}")
+    
     async def initialize(self):
         """Initialize all models"""
         logger.info("Initializing speech processing models...")
         
-        # Load Whisper model
-        logger.info(f"Loading Whisper model: {settings.whisper_model}")
-        self.whisper_model = whisper.load_model(settings.whisper_model)
+        # Dedicated inference pool
+        self.executor = InferenceExecutor(
+            settings.inference_workers,
+            settings.inference_intra_op_threads,
+            settings.inference_max_queue
+        )
+        
+        # Restore persisted speaker index
+        self.load_speaker_index()
+        
+        # Voice activity detection gate
+        if settings.vad_enabled:
+            try:
+                self.vad = VoiceActivityDetector(
+                    self.sample_rate,
+                    settings.vad_aggressiveness,
+                    settings.vad_frame_ms,
+                    settings.vad_padding_ms
+                )
+            except Exception as e:
+                logger.error(f"Failed to initialize VAD: {e}")
+                self.vad = None
+        
+        # Load Whisper model, either here or once per worker process
+        if settings.inference_backend == "process":
+            logger.info(
+                f"Starting {settings.inference_processes} Whisper worker processes: {settings.whisper_model}"
+            )
+            self.process_pool = ProcessInferencePool(
+                settings.whisper_model,
+                settings.inference_processes,
+                settings.inference_intra_op_threads or 1,
+                settings.inference_max_queue
+            )
+        else:
+            logger.info(f"Loading Whisper model: {settings.whisper_model}")
+            self.whisper_model = whisper.load_model(settings.whisper_model)
+            
+            # Micro-batch short windows from all sessions; the feature cache
+            # lives on the batched path since it needs mel/encoder access
+            if settings.whisper_batching_enabled:
+                feature_cache = None
+                if settings.feature_cache_enabled:
+                    feature_cache = FeatureCache(
+                        settings.feature_cache_memory_mb * 1024 * 1024,
+                        settings.feature_cache_dir,
+                        settings.feature_cache_disk_mb * 1024 * 1024
+                    )
+                self.batch_scheduler = WhisperBatchScheduler(
+                    self.whisper_model,
+                    self.executor,
+                    settings.whisper_batch_max_size,
+                    settings.whisper_batch_max_wait_ms,
+                    feature_cache=feature_cache,
+                    cache_encoder=settings.feature_cache_encoder,
+                    model_name=settings.whisper_model
+                )
+            elif settings.feature_cache_enabled:
+                logger.warning("FEATURE_CACHE_ENABLED has no effect without WHISPER_BATCHING_ENABLED")
         
         # Load diarization pipeline
         logger.info(f"Loading diarization pipeline: {settings.diarization_model}")
@@ -65,24 +180,43 @@ class SpeechProcessor:
         
         logger.info("Speech processing models initialized successfully")
     
-    def preprocess_audio(self, audio_data: bytes, original_sample_rate: int = None) -> np.ndarray:
-        """Preprocess audio data for processing"""
+    def preprocess_audio(
+        self, 
+        audio_data: Union[bytes, np.ndarray], 
+        original_sample_rate: int = None,
+        stream_id: str = None
+    ) -> np.ndarray:
+        """Preprocess audio data for processing.
+        
+        With a ``stream_id`` the chunk is resampled by that session's
+        streaming resampler, which continues the filter across chunks, and
+        int16 audio is converted in the session's workspace: the result may
+        then be a view that is only valid until the session's next chunk.
+        """
         try:
             # Convert bytes to numpy array
-            if isinstance(audio_data, bytes):
+            if isinstance(audio_data, (bytes, bytearray, memoryview)):
                 # Assume 16-bit PCM audio
-                audio_array = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32)
-                audio_array = audio_array / 32768.0  # Normalize to [-1, 1]
+                audio_data = np.frombuffer(audio_data, dtype=np.int16)
+            
+            if audio_data.dtype == np.int16:
+                # Normalize to [-1, 1] in a single pass
+                if stream_id is not None:
+                    workspace = self.workspaces.get(stream_id)
+                    if workspace is None:
+                        workspace = self.workspaces[stream_id] = PcmWorkspace()
+                    audio_array = workspace.convert(audio_data)
+                else:
+                    audio_array = pcm16_to_float32(audio_data)
             else:
                 audio_array = audio_data
             
             # Resample if necessary
             if original_sample_rate and original_sample_rate != self.sample_rate:
-                audio_array = librosa.resample(
-                    audio_array, 
-                    orig_sr=original_sample_rate, 
-                    target_sr=self.sample_rate
-                )
+                if stream_id is not None:
+                    audio_array = self._get_resampler(stream_id, original_sample_rate).process(audio_array)
+                else:
+                    audio_array = resample(audio_array, original_sample_rate, self.sample_rate)
             
             return audio_array
             
@@ -90,73 +224,137 @@ class SpeechProcessor:
             logger.error(f"Error preprocessing audio: {e}")
             return np.array([])
     
-    async def transcribe_audio(self, audio_data: np.ndarray, language: str = None) -> Dict:
+    def _get_resampler(self, stream_id: str, original_sample_rate: int) -> StreamingResampler:
+        """Return the session's resampler, starting a new one if the client rate changed"""
+        resampler = self.resamplers.get(stream_id)
+        if resampler is None or resampler.orig_rate != original_sample_rate:
+            resampler = StreamingResampler(original_sample_rate, self.sample_rate)
+            self.resamplers[stream_id] = resampler
+        return resampler
+    
+    def apply_vad(self, audio_array: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Trim silence with the VAD and record speech metrics.
+        
+        Returns the trimmed audio (empty if the chunk should be dropped) and
+        its offset in seconds within the original chunk.
+        """
+        if self.vad is None or len(audio_array) == 0:
+            return audio_array, 0.0
+        
+        trimmed, offset, speech_ratio = self.vad.trim(audio_array)
+        duration = len(audio_array) / self.sample_rate
+        self.metrics["vad_chunks_total"] += 1
+        self.metrics["vad_audio_seconds"] += duration
+        self.metrics["vad_speech_seconds"] += speech_ratio * duration
+        
+        if speech_ratio < settings.vad_min_speech_ratio:
+            self.metrics["vad_chunks_dropped"] += 1
+            return audio_array[:0], 0.0
+        return trimmed, offset
+    
+    def get_metrics(self) -> Dict:
+        """Return processing metrics"""
+        metrics = dict(self.metrics)
+        if self.executor is not None:
+            metrics.update(self.executor.get_metrics())
+        if self.process_pool is not None:
+            metrics.update(self.process_pool.get_metrics())
+        if self.batch_scheduler is not None:
+            metrics.update(self.batch_scheduler.get_metrics())
+        audio_seconds = metrics["vad_audio_seconds"]
+        metrics["vad_speech_ratio"] = metrics["vad_speech_seconds"] / audio_seconds if audio_seconds else 0.0
+        return metrics
+    
+    def _as_tensor(self, audio_data: np.ndarray) -> torch.Tensor:
+        """Wrap a float32 array as a tensor sharing its memory"""
+        return torch.from_numpy(np.ascontiguousarray(audio_data, dtype=np.float32))
+    
+    async def transcribe_audio(
+        self, 
+        audio_data: np.ndarray, 
+        language: str = None,
+        initial_prompt: str = None
+    ) -> Dict:
         """Transcribe audio using Whisper"""
-        if self.whisper_model is None:
+        if self.whisper_model is None and self.process_pool is None:
             raise RuntimeError("Whisper model not initialized")
         
         try:
-            # Run transcription in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: self.whisper_model.transcribe(
-                    audio_data,
-                    language=language,
-                    word_timestamps=True,
-                    verbose=False
-                )
-            )
-            return result
-            
+            return await self._transcribe(audio_data, language, initial_prompt)
         except Exception as e:
             logger.error(f"Error transcribing audio: {e}")
             return {"text": "", "segments": []}
     
+    async def _transcribe(
+        self, 
+        audio_data: np.ndarray, 
+        language: str = None,
+        initial_prompt: str = None
+    ) -> Dict:
+        """Transcribe audio using Whisper, raising on failure"""
+        if self.whisper_model is None and self.process_pool is None:
+            raise RuntimeError("Whisper model not initialized")
+        
+        if self.process_pool is not None:
+            return await self.process_pool.transcribe(
+                audio_data,
+                language=language,
+                initial_prompt=initial_prompt,
+                word_timestamps=True,
+                verbose=False
+            )
+        
+        if self.batch_scheduler is not None and self.batch_scheduler.accepts(audio_data):
+            return await self.batch_scheduler.submit(audio_data, language, initial_prompt)
+        
+        # Run transcription on the inference pool to avoid blocking
+        result = await self.executor.run(
+            lambda: self.whisper_model.transcribe(
+                audio_data,
+                language=language,
+                initial_prompt=initial_prompt,
+                word_timestamps=True,
+                verbose=False
+            )
+        )
+        return result
+    
     async def diarize_audio(self, audio_data: np.ndarray) -> Optional[Dict]:
         """Perform speaker diarization using pyannote"""
-        if self.diarization_pipeline is None:
-            logger.warning("Diarization pipeline not available")
-            return None
-        
         try:
-            # Save audio to temporary file for pyannote
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                # Convert numpy array to audio file
-                torchaudio.save(
-                    temp_file.name,
-                    torch.tensor(audio_data).unsqueeze(0),
-                    self.sample_rate
-                )
-                temp_path = temp_file.name
-            
-            try:
-                # Run diarization in thread pool
-                loop = asyncio.get_event_loop()
-                diarization = await loop.run_in_executor(
-                    None,
-                    lambda: self.diarization_pipeline(temp_path)
-                )
-                
-                # Convert to dictionary format
-                segments = []
-                for turn, _, speaker in diarization.itertracks(yield_label=True):
-                    segments.append({
-                        "start": turn.start,
-                        "end": turn.end,
-                        "speaker": speaker
-                    })
-                
-                return {"segments": segments}
-                
-            finally:
-                # Clean up temporary file
-                os.unlink(temp_path)
-                
+            return await self._diarize(audio_data)
         except Exception as e:
             logger.error(f"Error in speaker diarization: {e}")
             return None
     
+    async def _diarize(self, audio_data: np.ndarray) -> Optional[Dict]:
+        """Perform speaker diarization using pyannote, raising on failure"""
+        if self.diarization_pipeline is None:
+            logger.warning("Diarization pipeline not available")
+            return None
+        
+        # pyannote accepts an in-memory waveform, so skip the WAV round-trip
+        audio_input = {
+            "waveform": self._as_tensor(audio_data).unsqueeze(0),
+            "sample_rate": self.sample_rate
+        }
+        
+        # Run diarization on the inference pool
+        diarization = await self.executor.run(
+            lambda: self.diarization_pipeline(audio_input)
+        )
+        
+        # Convert to dictionary format
+        segments = []
+        for turn, _, speaker in diarization.itertracks(yield_label=True):
+            segments.append({
+                "start": turn.start,
+                "end": turn.end,
+                "speaker": speaker
+            })
+        
+        return {"segments": segments}
+    
     def align_transcription_with_diarization(
         self, 
         transcription: Dict, 
@@ -176,37 +374,51 @@ class SpeechProcessor:
                 ))
             return segments
         
-        aligned_segments = []
-        transcription_segments = transcription["segments"]
-        diarization_segments = diarization["segments"]
+        timeline = SpeakerTimeline(diarization["segments"])
+        
+        # Split at speaker changes using word timestamps when available
+        queries = []
+        for trans_seg in transcription["segments"]:
+            if not trans_seg["text"].strip():
+                continue
+            words = trans_seg.get("words") if settings.word_level_alignment else None
+            queries.append((trans_seg, words or None))
         
-        for trans_seg in transcription_segments:
+        # Look up every word, or whole segments without words, in one sweep
+        intervals = []
+        for trans_seg, words in queries:
+            if words:
+                intervals.extend((word["start"], word["end"]) for word in words)
+            else:
+                intervals.append((trans_seg["start"], trans_seg["end"]))
+        matches = iter(timeline.best_speakers(intervals))
+        
+        aligned_segments = []
+        for trans_seg, words in queries:
             trans_start = trans_seg["start"]
             trans_end = trans_seg["end"]
             trans_text = trans_seg["text"].strip()
             
-            if not trans_text:
+            if words:
+                word_matches = list(islice(matches, len(words)))
+                for speaker, run, overlapped in split_words_by_speaker(words, word_matches, timeline):
+                    text = "".join(word["word"] for word in run).strip()
+                    if not text:
+                        continue
+                    aligned_segments.append(SpeakerSegment(
+                        speaker_id=speaker,
+                        start_time=run[0]["start"],
+                        end_time=run[-1]["end"],
+                        text=text,
+                        confidence=0.8 if overlapped else 0.3
+                    ))
                 continue
             
-            # Find overlapping speaker segment
-            best_speaker = "Unknown"
-            best_overlap = 0
-            
-            for diar_seg in diarization_segments:
-                diar_start = diar_seg["start"]
-                diar_end = diar_seg["end"]
-                
-                # Calculate overlap
-                overlap_start = max(trans_start, diar_start)
-                overlap_end = min(trans_end, diar_end)
-                overlap_duration = max(0, overlap_end - overlap_start)
-                
-                if overlap_duration > best_overlap:
-                    best_overlap = overlap_duration
-                    best_speaker = diar_seg["speaker"]
+            # The speaker turn overlapping the segment the most
+            best_speaker, best_overlap = next(matches)
             
             aligned_segments.append(SpeakerSegment(
-                speaker_id=best_speaker,
+                speaker_id=best_speaker or "Unknown",
                 start_time=trans_start,
                 end_time=trans_end,
                 text=trans_text,
@@ -229,98 +441,365 @@ class SpeechProcessor:
             if len(segment_audio) < self.sample_rate * 0.5:  # Less than 0.5 seconds
                 return None
             
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                torchaudio.save(
-                    temp_file.name,
-                    torch.tensor(segment_audio).unsqueeze(0),
-                    self.sample_rate
-                )
-                temp_path = temp_file.name
+            # Shape (batch, channel, samples) as expected by the embedding model
+            waveform = self._as_tensor(segment_audio)[None, None]
             
-            try:
-                # Get embedding
-                loop = asyncio.get_event_loop()
-                embedding = await loop.run_in_executor(
-                    None,
-                    lambda: self.embedding_model(temp_path)
-                )
-                return embedding.cpu().numpy()
-                
-            finally:
-                os.unlink(temp_path)
+            embedding = await self.executor.run(
+                lambda: self.embedding_model(waveform)
+            )
+            if isinstance(embedding, torch.Tensor):
+                embedding = embedding.cpu().numpy()
+            return np.asarray(embedding).reshape(-1)
                 
         except Exception as e:
             logger.error(f"Error extracting speaker embedding: {e}")
             return None
     
-    def identify_speaker(self, embedding: np.ndarray, threshold: float = 0.8) -> Optional[str]:
-        """Identify speaker using known speaker embeddings"""
-        if not self.known_speakers or embedding is None:
+    async def get_speaker_embeddings_batch(
+        self, 
+        audio_data: np.ndarray, 
+        spans: List[Tuple[float, float]]
+    ) -> Optional[np.ndarray]:
+        """Extract embeddings for many segments with a single model call.
+        
+        Returns an (N, D) matrix aligned with ``spans``; rows for segments
+        shorter than 0.5 seconds are NaN.
+        """
+        if self.embedding_model is None or not spans:
             return None
         
         try:
-            best_match = None
-            best_similarity = threshold
+            min_samples = int(self.sample_rate * 0.5)
+            crops = []
+            valid = []
+            for i, (start_time, end_time) in enumerate(spans):
+                start_sample = int(start_time * self.sample_rate)
+                end_sample = int(end_time * self.sample_rate)
+                segment_audio = audio_data[start_sample:end_sample]
+                if len(segment_audio) >= min_samples:
+                    crops.append(segment_audio)
+                    valid.append(i)
             
-            for speaker_name, known_embedding in self.known_speakers.items():
-                similarity = cosine_similarity(
-                    embedding.reshape(1, -1),
-                    known_embedding.reshape(1, -1)
-                )[0][0]
-                
-                if similarity > best_similarity:
-                    best_similarity = similarity
-                    best_match = speaker_name
+            if not crops:
+                return None
             
-            return best_match
+            # Batch crops of similar length together so padding stays small, and
+            # cap the batch size so a whole upload never becomes one huge tensor
+            order = sorted(range(len(crops)), key=lambda row: len(crops[row]))
+            batch_size = settings.speaker_embedding_batch_size
+            result = None
+            for start in range(0, len(order), batch_size):
+                rows = order[start:start + batch_size]
+                embeddings = await self._embed_crops([crops[row] for row in rows])
+                if result is None:
+                    result = np.full((len(spans), embeddings.shape[-1]), np.nan, dtype=np.float32)
+                result[[valid[row] for row in rows]] = embeddings
+            return result
             
         except Exception as e:
-            logger.error(f"Error identifying speaker: {e}")
+            logger.error(f"Error extracting batched speaker embeddings: {e}")
             return None
     
+    async def _embed_crops(self, crops: List[np.ndarray]) -> np.ndarray:
+        """Embed one batch of audio crops, returning an (N, D) matrix"""
+        # Zero-pad into one (batch, channel, samples) tensor; masks hide the padding
+        max_len = max(len(crop) for crop in crops)
+        waveforms = torch.zeros((len(crops), 1, max_len), dtype=torch.float32)
+        masks = torch.zeros((len(crops), max_len), dtype=torch.float32)
+        for row, crop in enumerate(crops):
+            waveforms[row, 0, :len(crop)] = self._as_tensor(crop)
+            masks[row, :len(crop)] = 1.0
+        
+        embeddings = await self.executor.run(
+            lambda: self.embedding_model(waveforms, masks=masks)
+        )
+        if isinstance(embeddings, torch.Tensor):
+            embeddings = embeddings.cpu().numpy()
+        return np.asarray(embeddings, dtype=np.float32)
+    
+    def identify_speakers(
+        self, 
+        embeddings: np.ndarray, 
+        threshold: float = 0.8, 
+        top_k: int = 1
+    ) -> List[List[Tuple[str, float]]]:
+        """Score a batch of embeddings against all known speakers.
+        
+        Returns, per embedding, up to ``top_k`` (speaker_name, similarity)
+        candidates above ``threshold``, best first.
+        """
+        if not self.known_speakers or embeddings is None or len(embeddings) == 0:
+            return [[] for _ in range(0 if embeddings is None else len(embeddings))]
+        
+        try:
+            candidates = self.known_speakers.search(embeddings, top_k)
+            return [
+                [(name, score) for name, score in row if score > threshold]
+                for row in candidates
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error identifying speakers: {e}")
+            return [[] for _ in range(len(embeddings))]
+    
+    def identify_speaker(self, embedding: np.ndarray, threshold: float = 0.8) -> Optional[str]:
+        """Identify speaker using known speaker embeddings"""
+        if not self.known_speakers or embedding is None:
+            return None
+        
+        matches = self.identify_speakers(embedding.reshape(1, -1), threshold)[0]
+        return matches[0][0] if matches else None
+    
     def add_known_speaker(self, name: str, embedding: np.ndarray):
         """Add a known speaker embedding"""
-        self.known_speakers[name] = embedding
+        self.known_speakers.add(name, embedding)
         logger.info(f"Added known speaker: {name}")
     
+    def remove_known_speaker(self, name: str):
+        """Remove a known speaker embedding"""
+        if name in self.known_speakers:
+            self.known_speakers.remove(name)
+            logger.info(f"Removed known speaker: {name}")
+    
     async def process_audio_chunk(
         self, 
-        audio_data: bytes, 
+        audio_data: Union[bytes, np.ndarray], 
         original_sample_rate: int = None,
-        language: str = None
+        language: str = None,
+        stream_id: str = None
+    ) -> List[SpeakerSegment]:
+        """Process a single audio chunk and return speaker segments.
+        
+        Errors propagate, so a failed chunk is not mistaken for one without
+        speech and the client can resend it.
+        """
+        # Preprocess audio
+        audio_array = self.preprocess_audio(audio_data, original_sample_rate, stream_id)
+        
+        # Drop silent chunks and trim silence before any model runs
+        audio_array, offset = self.apply_vad(audio_array)
+        
+        if len(audio_array) == 0:
+            return []
+        
+        # Transcribe audio
+        transcription = await self._transcribe(audio_array, language)
+        
+        # Perform diarization
+        diarization = await self._diarize(audio_array)
+        
+        # Align transcription with diarization
+        segments = self.align_transcription_with_diarization(transcription, diarization)
+        
+        # Try to identify known speakers
+        await self.identify_segment_speakers(audio_array, segments)
+        
+        # Report times relative to the untrimmed chunk
+        if offset:
+            for segment in segments:
+                segment.start_time += offset
+                segment.end_time += offset
+        
+        return segments
+
+    async def identify_segment_speakers(self, audio_array: np.ndarray, segments: List[SpeakerSegment]):
+        """Label segments with known speakers, embedding all segments in one batch"""
+        if not self.known_speakers or not segments:
+            return
+        embeddings = await self.get_speaker_embeddings_batch(
+            audio_array,
+            [(segment.start_time, segment.end_time) for segment in segments]
+        )
+        if embeddings is not None:
+            valid = ~np.isnan(embeddings).any(axis=1)
+            matches = self.identify_speakers(embeddings[valid])
+            valid_segments = [seg for seg, ok in zip(segments, valid) if ok]
+            for segment, match in zip(valid_segments, matches):
+                if match:
+                    segment.speaker_id = match[0][0]
+    
+    def plan_audio_windows(self, audio_array: np.ndarray) -> List[AudioWindow]:
+        """Split long audio into overlapping windows cut at pauses, skipping silent ones.
+        
+        Blocking; meant to run in a worker thread, so it uses its own VAD
+        instance rather than the one shared with the event loop.
+        """
+        if self.vad is not None:
+            vad = VoiceActivityDetector(
+                self.sample_rate,
+                settings.vad_aggressiveness,
+                settings.vad_frame_ms,
+                settings.vad_padding_ms
+            )
+            frame_samples = vad.frame_samples
+            frame_scores = vad.speech_mask(audio_array).astype(np.float32)
+        else:
+            frame_samples = self.sample_rate * 30 // 1000
+            frame_scores = frame_energy(audio_array, frame_samples)
+        
+        windows = plan_windows(
+            len(audio_array),
+            self.sample_rate,
+            frame_scores,
+            frame_samples,
+            settings.long_audio_window_seconds,
+            settings.long_audio_overlap_seconds,
+            settings.long_audio_search_seconds
+        )
+        if self.vad is None:
+            return windows
+        
+        speech_windows = []
+        for window in windows:
+            mask = frame_scores[window.keep_start // frame_samples:window.keep_end // frame_samples]
+            if len(mask) and mask.mean() >= settings.vad_min_speech_ratio:
+                speech_windows.append(window)
+        return speech_windows
+    
+    async def process_long_audio(
+        self, 
+        audio_data: Union[bytes, np.ndarray], 
+        original_sample_rate: int = None,
+        language: str = None,
+        progress: Optional[Callable[[float, float], None]] = None
     ) -> List[SpeakerSegment]:
-        """Process a single audio chunk and return speaker segments"""
+        """Process a long recording as parallel windows and return speaker segments.
+        
+        Windows are transcribed concurrently, about one per inference worker
+        at a time, while diarization runs once over the whole recording, so
+        speaker labels stay consistent across windows; the window transcripts
+        are then stitched and aligned with it. ``progress`` is called with
+        (audio seconds transcribed, total audio seconds) as windows finish.
+        Transcription and diarization errors propagate, so a caller running
+        this as a job can report it as failed.
+        """
+        audio_array = self.preprocess_audio(audio_data, original_sample_rate)
+        if len(audio_array) == 0:
+            return []
+        if self.whisper_model is None and self.process_pool is None:
+            raise RuntimeError("Whisper model not initialized")
+        
+        # The VAD pass over a whole recording takes seconds; keep it off the event loop
+        windows = await asyncio.to_thread(self.plan_audio_windows, audio_array)
+        
+        # Silence skipped by the window planner counts as done
+        total_seconds = len(audio_array) / self.sample_rate
+        done_seconds = total_seconds - sum(w.keep_end - w.keep_start for w in windows) / self.sample_rate
+        if progress is not None:
+            progress(done_seconds, total_seconds)
+        if not windows:
+            return []
+        
+        # Keep about one window per worker in flight, so live sessions'
+        # chunks interleave with the job instead of queueing behind it
+        workers = self.process_pool.processes if self.process_pool is not None else self.executor.workers
+        in_flight = asyncio.Semaphore(workers)
+        
+        async def transcribe_window(window: AudioWindow) -> Dict:
+            nonlocal done_seconds
+            async with in_flight:
+                result = await self._transcribe(audio_array[window.start:window.end], language)
+            done_seconds += (window.keep_end - window.keep_start) / self.sample_rate
+            if progress is not None:
+                progress(done_seconds, total_seconds)
+            return result
+        
+        tasks = [asyncio.ensure_future(transcribe_window(window)) for window in windows]
+        tasks.append(asyncio.ensure_future(self._diarize(audio_array)))
         try:
-            # Preprocess audio
-            audio_array = self.preprocess_audio(audio_data, original_sample_rate)
-            
-            if len(audio_array) == 0:
-                return []
-            
-            # Transcribe audio
-            transcription = await self.transcribe_audio(audio_array, language)
+            *transcriptions, diarization = await asyncio.gather(*tasks)
+        except BaseException:
+            # Do not leave the remaining windows running for a failed job
+            for task in tasks:
+                task.cancel()
+            raise
+        transcription = stitch_transcriptions(list(zip(windows, transcriptions)), self.sample_rate)
+        self.metrics["long_audio_windows"] += len(windows)
+        
+        segments = self.align_transcription_with_diarization(transcription, diarization)
+        await self.identify_segment_speakers(audio_array, segments)
+        return segments
+    
+    def _words_to_segment(self, words: List[Dict], speaker_id: str = "Speaker_1") -> SpeakerSegment:
+        """Build a speaker segment from a run of timestamped words"""
+        return SpeakerSegment(
+            speaker_id=speaker_id,
+            start_time=words[0]["start"],
+            end_time=words[-1]["end"],
+            text="".join(w["word"] for w in words).strip(),
+            confidence=float(np.mean([w["probability"] for w in words]))
+        )
+    
+    async def process_stream_chunk(
+        self,
+        stream_id: str,
+        audio_data: Union[bytes, np.ndarray],
+        original_sample_rate: int = None,
+        language: str = None
+    ) -> Tuple[List[SpeakerSegment], List[SpeakerSegment]]:
+        """Feed a chunk into a live stream and return (final, partial) segments.
+        
+        Errors before the chunk joins the stream propagate, so the client can
+        resend it. Once it has joined, a failed decode raises
+        StreamDecodeError instead: the audio stays in the uncommitted window
+        and is decoded with the next chunk, so it must not be resent.
+        """
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            stream = StreamingSession(
+                self.sample_rate,
+                settings.streaming_window_seconds,
+                settings.streaming_min_step_seconds
+            )
+            self.streams[stream_id] = stream
+        
+        audio_array = self.preprocess_audio(audio_data, original_sample_rate, stream_id)
+        stream.insert_audio(audio_array)
+        
+        try:
+            # Skip decoding silence unless earlier audio still needs decoding
+            if self.vad is not None and len(audio_array) and len(self.apply_vad(audio_array)[0]) == 0:
+                if stream.skip_silence(len(audio_array)):
+                    return [], []
             
-            # Perform diarization
-            diarization = await self.diarize_audio(audio_array)
+            if not stream.ready():
+                return [], []
             
-            # Align transcription with diarization
-            segments = self.align_transcription_with_diarization(transcription, diarization)
+            # Re-decode only the uncommitted window, conditioned on committed text
+            window_audio, offset = stream.window()
+            transcription = await self._transcribe(
+                window_audio, 
+                language, 
+                initial_prompt=stream.prompt() or None
+            )
+            committed, partial = stream.update(stream.extract_words(transcription, offset))
             
-            # Try to identify known speakers
-            for segment in segments:
+            final_segments = []
+            if committed:
+                segment = self._words_to_segment(committed)
                 embedding = await self.get_speaker_embedding(
-                    audio_array, 
-                    segment.start_time, 
-                    segment.end_time
+                    window_audio,
+                    segment.start_time - offset,
+                    segment.end_time - offset
                 )
                 if embedding is not None:
                     known_speaker = self.identify_speaker(embedding)
                     if known_speaker:
                         segment.speaker_id = known_speaker
+                final_segments.append(segment)
             
-            return segments
+            partial_segments = [self._words_to_segment(partial)] if partial else []
+            return final_segments, partial_segments
             
         except Exception as e:
-            logger.error(f"Error processing audio chunk: {e}")
+            raise StreamDecodeError(f"Error decoding stream {stream_id}: {e}") from e
+    
+    def finish_stream(self, stream_id: str) -> List[SpeakerSegment]:
+        """Close a live stream and return any pending words as a final segment"""
+        self.resamplers.pop(stream_id, None)
+        self.workspaces.pop(stream_id, None)
+        stream = self.streams.pop(stream_id, None)
+        if stream is None:
             return []
+        pending = stream.flush()
+        return [self._words_to_segment(pending)] if pending else []
@@ -0,0 +1,156 @@
+import numpy as np
+import logging
+from typing import List, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StreamDecodeError(RuntimeError):
+    """Decoding a live stream failed after the chunk's audio joined the stream"""
+
+
+class AudioRingBuffer:
+    """Fixed-capacity float32 ring buffer addressed by absolute sample index"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=np.float32)
+        self.total_written = 0  # absolute index one past the newest sample
+
+    @property
+    def oldest_index(self) -> int:
+        """Absolute index of the oldest sample still held"""
+        return max(0, self.total_written - self.capacity)
+
+    def append(self, audio: np.ndarray):
+        """Append samples, overwriting the oldest ones when full"""
+        if len(audio) == 0:
+            return
+        if len(audio) > self.capacity:
+            skipped = len(audio) - self.capacity
+            self.total_written += skipped
+            audio = audio[skipped:]
+
+        pos = self.total_written % self.capacity
+        first = min(len(audio), self.capacity - pos)
+        self.buffer[pos:pos + first] = audio[:first]
+        if first < len(audio):
+            self.buffer[:len(audio) - first] = audio[first:]
+        self.total_written += len(audio)
+
+    def read_from(self, start_index: int) -> np.ndarray:
+        """Return a contiguous copy of all samples from an absolute index"""
+        start_index = max(start_index, self.oldest_index)
+        count = self.total_written - start_index
+        if count <= 0:
+            return np.zeros(0, dtype=np.float32)
+
+        pos = start_index % self.capacity
+        if pos + count <= self.capacity:
+            return self.buffer[pos:pos + count].copy()
+        return np.concatenate((self.buffer[pos:], self.buffer[:pos + count - self.capacity]))
+
+
+class StreamingSession:
+    """Incremental transcription state for one live audio stream.
+
+    Audio is kept in a ring buffer and only the window after the last
+    committed word is re-decoded. Words are committed once two consecutive
+    hypotheses agree on them (LocalAgreement-2); the rest is reported as a
+    partial result.
+    """
+
+    def __init__(self, sample_rate: int, window_seconds: float, min_step_seconds: float):
+        self.sample_rate = sample_rate
+        self.window_samples = int(window_seconds * sample_rate)
+        self.min_step_samples = int(min_step_seconds * sample_rate)
+        # Leave headroom so audio arriving during a decode is never overwritten
+        self.ring = AudioRingBuffer(self.window_samples * 2)
+        self.window_start = 0  # absolute sample index of the uncommitted window
+        self.last_decoded = 0  # total_written at the previous decode
+        self.previous_words: List[Dict] = []
+        self.committed_text = ""  # tail of committed text, used as decoder prompt
+
+    def insert_audio(self, audio: np.ndarray):
+        """Append preprocessed audio to the stream"""
+        self.ring.append(audio)
+        if self.window_start < self.ring.oldest_index:
+            logger.warning("Streaming window overrun, dropping uncommitted audio")
+            self.window_start = self.ring.oldest_index
+            self.previous_words = []
+
+    def skip_silence(self, n_samples: int) -> bool:
+        """Move the window past a trailing silent chunk of ``n_samples``.
+
+        Only possible when everything before the chunk was already decoded
+        without leaving pending words; returns whether the window moved.
+        """
+        if self.previous_words or self.last_decoded < self.ring.total_written - n_samples:
+            return False
+        self.window_start = self.ring.total_written
+        self.last_decoded = self.ring.total_written
+        return True
+
+    def ready(self) -> bool:
+        """Whether enough new audio arrived to justify another decode"""
+        return self.ring.total_written - self.last_decoded >= self.min_step_samples
+
+    def window(self) -> Tuple[np.ndarray, float]:
+        """Return the uncommitted audio window and its start time in seconds"""
+        self.last_decoded = self.ring.total_written
+        return self.ring.read_from(self.window_start), self.window_start / self.sample_rate
+
+    def prompt(self) -> str:
+        """Committed text used as decoder context for the next window"""
+        return self.committed_text
+
+    @staticmethod
+    def extract_words(transcription: Dict, offset: float) -> List[Dict]:
+        """Flatten Whisper word timestamps into absolute-time words"""
+        words = []
+        for segment in transcription.get("segments", []):
+            for word in segment.get("words", []):
+                words.append({
+                    "word": word["word"],
+                    "start": word["start"] + offset,
+                    "end": word["end"] + offset,
+                    "probability": word.get("probability", 0.0)
+                })
+        return words
+
+    def update(self, words: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Apply a new hypothesis and return (newly committed, partial) words"""
+        agreed = 0
+        for prev, curr in zip(self.previous_words, words):
+            if prev["word"].strip().lower() != curr["word"].strip().lower():
+                break
+            agreed += 1
+
+        committed = words[:agreed]
+        partial = words[agreed:]
+        self.previous_words = partial
+
+        if committed:
+            self._commit(committed)
+        elif self.ring.total_written - self.window_start >= self.window_samples:
+            # No agreement within a full window: force a commit to bound decode cost
+            committed, partial = words, []
+            self.previous_words = []
+            if committed:
+                self._commit(committed)
+            else:
+                self.window_start = self.ring.total_written - self.window_samples // 2
+
+        return committed, partial
+
+    def flush(self) -> List[Dict]:
+        """Commit whatever is still pending, e.g. when the stream ends"""
+        pending = self.previous_words
+        self.previous_words = []
+        if pending:
+            self._commit(pending)
+        return pending
+
+    def _commit(self, words: List[Dict], max_prompt_chars: int = 200):
+        self.committed_text = (self.committed_text + "".join(w["word"] for w in words))[-max_prompt_chars:]
+        self.window_start = max(self.window_start, int(words[-1]["end"] * self.sample_rate))
@@ -0,0 +1,58 @@
+import numpy as np
+import webrtcvad
+import logging
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceActivityDetector:
+    """WebRTC VAD gate that drops silent chunks and trims silence.
+
+    Works on float32 audio in [-1, 1] at 8, 16, 32 or 48 kHz, classified in
+    10, 20 or 30 ms frames.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        aggressiveness: int = 2,
+        frame_ms: int = 30,
+        padding_ms: int = 300
+    ):
+        self.vad = webrtcvad.Vad(aggressiveness)
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.padding_frames = max(1, padding_ms // frame_ms)
+
+    def speech_mask(self, audio: np.ndarray) -> np.ndarray:
+        """Classify each full frame of the audio as speech or not"""
+        n_frames = len(audio) // self.frame_samples
+        if n_frames == 0:
+            return np.zeros(0, dtype=bool)
+        pcm = (np.clip(audio[:n_frames * self.frame_samples], -1.0, 1.0) * 32767).astype(np.int16)
+        frames = pcm.reshape(n_frames, self.frame_samples)
+        return np.fromiter(
+            (self.vad.is_speech(frame.tobytes(), self.sample_rate) for frame in frames),
+            dtype=bool,
+            count=n_frames
+        )
+
+    def trim(self, audio: np.ndarray) -> Tuple[np.ndarray, float, float]:
+        """Trim leading and trailing silence.
+
+        Returns (trimmed audio, offset of the trimmed audio in seconds,
+        speech ratio). The audio is empty when no speech was detected.
+        """
+        mask = self.speech_mask(audio)
+        if not mask.any():
+            return audio[:0], 0.0, 0.0
+
+        speech_ratio = float(mask.mean())
+        speech_frames = np.flatnonzero(mask)
+        first = max(0, speech_frames[0] - self.padding_frames)
+        last = min(len(mask), speech_frames[-1] + 1 + self.padding_frames)
+        start = first * self.frame_samples
+        # Keep the partial frame at the end if speech runs up to it
+        end = len(audio) if last == len(mask) else last * self.frame_samples
+        return audio[start:end], start / self.sample_rate, speech_ratio
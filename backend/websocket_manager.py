@@ -1,31 +1,111 @@
 import asyncio
 import json
 import logging
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 from fastapi import WebSocket, WebSocketDisconnect
 from .speech_processor import SpeechProcessor
-from .database import TranscriptRepository, SpeakerRepository
+from .speaker_sync import SpeakerSync
+from .segment_writer import SegmentWriteBuffer
+from .database import TranscriptRepository, SpeakerRepository, JobRepository
+from .jobs import TranscriptionJobQueue, job_to_message
 from .models import TranscriptSession, SpeakerSegment
+from .config import settings
+from .audio_protocol import parse_audio_frame
+from .ingest import IngestFrame, SequenceTracker, SessionIngest
+from .streaming import StreamDecodeError
 from datetime import datetime
+from bson import ObjectId
 import base64
 import numpy as np
 
+try:
+    import orjson
+except ImportError:  # optional faster encoder
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def encode_message(message: dict) -> str:
+    """Serialize a WebSocket message, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(message)
+
+
 class ConnectionManager:
     """Manages WebSocket connections for real-time transcription"""
     
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
         self.session_connections: Dict[str, Set[str]] = {}  # session_id -> set of connection_ids
+        self.session_languages: Dict[str, str] = {}  # session_id -> language chosen at start
+        self.session_ingest: Dict[str, SessionIngest] = {}  # session_id -> audio ingest queue
+        self.ingest_connections: Dict[str, str] = {}  # session_id -> connection sending audio
+        self.session_sequences: Dict[str, SequenceTracker] = {}  # session_id -> seen frame sequences
+        self.job_subscribers: Dict[str, Set[str]] = {}  # job_id -> subscribed connection_ids
+        self.idle_releases: Dict[str, asyncio.Task] = {}  # session_id -> pending release of its live state
         self.speech_processor = SpeechProcessor()
         self.transcript_repo = TranscriptRepository()
         self.speaker_repo = SpeakerRepository()
+        self.speaker_sync = SpeakerSync(self.speech_processor, self.speaker_repo)
+        self.job_repo = JobRepository()
+        self.job_queue = TranscriptionJobQueue(
+            self.speech_processor,
+            self.job_repo,
+            self.transcript_repo,
+            notify=self.publish_job_update,
+            publish_segments=self.broadcast_segments,
+            upload_dir=settings.job_upload_dir,
+            concurrency=settings.job_concurrency,
+            poll_seconds=settings.job_poll_seconds,
+            progress_interval_seconds=settings.job_progress_interval_seconds,
+            stale_seconds=settings.job_stale_seconds
+        )
+        self.metrics = {
+            "broadcast_count": 0,
+            "broadcast_evictions": 0
+        }
+        self.segment_writer = SegmentWriteBuffer(
+            self.transcript_repo,
+            max_batch=settings.segment_flush_max_batch,
+            flush_interval_seconds=settings.segment_flush_interval_seconds,
+            max_retries=settings.segment_flush_max_retries,
+            retry_backoff_seconds=settings.segment_flush_retry_backoff_seconds
+        )
     
     async def initialize(self):
-        """Initialize the speech processor"""
+        """Initialize the speech processor and load known speakers"""
         await self.speech_processor.initialize()
+        
+        try:
+            await self.speaker_sync.load()
+        except Exception as e:
+            logger.error(f"Failed to load known speakers: {e}")
+        self.speaker_sync.start()
+        self.segment_writer.start()
+        self.job_queue.start()
+    
+    async def shutdown(self):
+        """Stop background tasks, flush buffered segments and persist the speaker index"""
+        await self.speaker_sync.stop()
+        await self.job_queue.stop()
+        for task in list(self.idle_releases.values()):
+            task.cancel()
+        self.idle_releases.clear()
+        for ingest in list(self.session_ingest.values()):
+            await ingest.stop()
+        self.session_ingest.clear()
+        await self.segment_writer.stop()
+        self.speech_processor.save_speaker_index()
+        self.speech_processor.shutdown()
+    
+    def get_metrics(self) -> dict:
+        """Speech processing and segment persistence metrics"""
+        metrics = self.speech_processor.get_metrics()
+        metrics.update(self.segment_writer.get_metrics())
+        metrics.update(self.metrics)
+        return metrics
     
     async def connect(self, websocket: WebSocket, connection_id: str):
         """Accept a new WebSocket connection"""
@@ -40,6 +120,15 @@ class ConnectionManager:
         
         # Remove from session connections
         for session_id, connections in self.session_connections.items():
+            if connection_id in connections:
+                connections.discard(connection_id)
+                if not connections:
+                    self.schedule_idle_release(session_id)
+        # Audio can be sent to a session without joining it
+        for session_id, ingest_connection in self.ingest_connections.items():
+            if ingest_connection == connection_id and not self.session_connections.get(session_id):
+                self.schedule_idle_release(session_id)
+        for connections in self.job_subscribers.values():
             connections.discard(connection_id)
         
         logger.info(f"WebSocket connection closed: {connection_id}")
@@ -49,27 +138,107 @@ class ConnectionManager:
         if connection_id in self.active_connections:
             websocket = self.active_connections[connection_id]
             try:
-                await websocket.send_text(json.dumps(message))
+                await websocket.send_text(encode_message(message))
             except Exception as e:
                 logger.error(f"Error sending message to {connection_id}: {e}")
                 self.disconnect(connection_id)
     
     async def broadcast_to_session(self, message: dict, session_id: str):
-        """Broadcast a message to all connections in a session"""
-        if session_id in self.session_connections:
-            for connection_id in self.session_connections[session_id].copy():
-                await self.send_personal_message(message, connection_id)
+        """Broadcast a message to all connections in a session.
+        
+        The message is encoded once and sent to every connection concurrently,
+        each with its own timeout. A connection that times out is evicted: the
+        cancelled send may have left a partial frame on the socket, so nothing
+        more can safely be written to it.
+        """
+        connection_ids = self.session_connections.get(session_id)
+        if not connection_ids:
+            return
+        
+        text = encode_message(message)
+        self.metrics["broadcast_count"] += 1
+        await asyncio.gather(*(
+            self.send_broadcast_text(connection_id, text)
+            for connection_id in list(connection_ids)
+        ))
+    
+    async def send_broadcast_text(self, connection_id: str, text: str):
+        """Send one encoded broadcast to one connection, evicting it on timeout"""
+        websocket = self.active_connections.get(connection_id)
+        if websocket is None:
+            return
+        
+        try:
+            await asyncio.wait_for(websocket.send_text(text), settings.broadcast_send_timeout_seconds)
+        except asyncio.TimeoutError:
+            await self.evict_connection(connection_id, websocket)
+        except Exception as e:
+            logger.error(f"Error sending message to {connection_id}: {e}")
+            self.disconnect(connection_id)
+    
+    async def evict_connection(self, connection_id: str, websocket: WebSocket):
+        """Close a connection whose send timed out so it cannot hold up its session"""
+        logger.warning(f"Evicting slow consumer {connection_id}")
+        self.metrics["broadcast_evictions"] += 1
+        self.disconnect(connection_id)
+        try:
+            # 1013: try again later
+            await asyncio.wait_for(websocket.close(code=1013), settings.broadcast_send_timeout_seconds)
+        except Exception:
+            pass
     
     def add_connection_to_session(self, connection_id: str, session_id: str):
         """Add a connection to a transcription session"""
         if session_id not in self.session_connections:
             self.session_connections[session_id] = set()
         self.session_connections[session_id].add(connection_id)
+        
+        # A client reconnecting within the grace period keeps the session's live state
+        task = self.idle_releases.pop(session_id, None)
+        if task is not None:
+            task.cancel()
     
     def remove_connection_from_session(self, connection_id: str, session_id: str):
         """Remove a connection from a transcription session"""
         if session_id in self.session_connections:
             self.session_connections[session_id].discard(connection_id)
+            if not self.session_connections[session_id]:
+                self.schedule_idle_release(session_id)
+    
+    def schedule_idle_release(self, session_id: str):
+        """Release a session's live state once it has had no connections for the grace period"""
+        if session_id in self.idle_releases:
+            return
+        self.idle_releases[session_id] = asyncio.create_task(self.release_idle_session(session_id))
+    
+    async def release_idle_session(self, session_id: str):
+        await asyncio.sleep(settings.session_idle_release_seconds)
+        self.idle_releases.pop(session_id, None)
+        if self.session_connections.get(session_id):
+            return
+        try:
+            await self.release_session(session_id)
+            if not self.session_connections.get(session_id):
+                self.session_connections.pop(session_id, None)
+                self.session_languages.pop(session_id, None)
+            logger.info(f"Released live state of abandoned session {session_id}")
+        except Exception as e:
+            logger.error(f"Error releasing session {session_id}: {e}")
+    
+    async def release_session(self, session_id: str):
+        """Process queued audio, then free the session's ingest queue and stream state"""
+        ingest = self.session_ingest.pop(session_id, None)
+        if ingest is not None:
+            await ingest.drain()
+            await ingest.stop()
+        self.ingest_connections.pop(session_id, None)
+        self.session_sequences.pop(session_id, None)
+        
+        # Emit whatever the live stream had not committed yet
+        await self.store_and_broadcast_segments(
+            session_id,
+            self.speech_processor.finish_stream(session_id)
+        )
     
     async def handle_message(self, websocket: WebSocket, connection_id: str, message: dict):
         """Handle incoming WebSocket messages"""
@@ -94,6 +263,9 @@ class ConnectionManager:
             elif message_type == "export_transcript":
                 await self.handle_export_transcript(connection_id, message)
             
+            elif message_type == "subscribe_job":
+                await self.handle_subscribe_job(connection_id, message)
+            
             else:
                 await self.send_personal_message({
                     "type": "error",
@@ -122,10 +294,13 @@ class ConnectionManager:
                 "speakers": {},
                 "language": language,
                 "status": "active",
-                "total_duration": 0.0
+                "total_duration": 0.0,
+                "segment_count": 0
             }
             
             session_id = await self.transcript_repo.create_session(session_data)
+            if language:
+                self.session_languages[session_id] = language
             
             # Add connection to session
             self.add_connection_to_session(connection_id, session_id)
@@ -153,21 +328,26 @@ class ConnectionManager:
             if not session_id:
                 raise ValueError("Session ID is required")
             
-            # Verify session exists
-            session = await self.transcript_repo.get_session(session_id)
+            since = self.parse_history_cursor(message.get("since"))
+            
+            # Verify session exists; history is streamed below rather than loaded whole
+            session = await self.transcript_repo.get_session(session_id, include_segments=False)
             if not session:
                 raise ValueError("Session not found")
             
-            # Add connection to session
+            # Add connection to session; live segments may overlap history, clients dedupe by id
             self.add_connection_to_session(connection_id, session_id)
+            if session.get("language"):
+                self.session_languages[session_id] = session["language"]
             
             await self.send_personal_message({
                 "type": "session_joined",
                 "session_id": session_id,
-                "session_name": session["session_name"],
-                "segments": session.get("segments", [])
+                "session_name": session["session_name"]
             }, connection_id)
             
+            await self.send_session_history(connection_id, session_id, session, since)
+            
             logger.info(f"Connection {connection_id} joined session: {session_id}")
         
         except Exception as e:
@@ -177,8 +357,67 @@ class ConnectionManager:
                 "message": str(e)
             }, connection_id)
     
+    def parse_history_cursor(self, since):
+        """Turn a join cursor (segment id, ISO timestamp or epoch seconds) into a segment id bound"""
+        if since is None or since == "":
+            return None
+        if isinstance(since, (int, float)):
+            return ObjectId.from_datetime(datetime.utcfromtimestamp(since))
+        if ObjectId.is_valid(since):
+            return ObjectId(since)
+        try:
+            return ObjectId.from_datetime(datetime.fromisoformat(since))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid since cursor: {since}")
+    
+    async def send_session_history(self, connection_id: str, session_id: str, session: dict, since=None):
+        """Send a session's segments after ``since`` in bounded session_history pages"""
+        # Segments still in the write buffer would otherwise be missing from history
+        await self.segment_writer.flush()
+        
+        page_size = settings.join_history_page_size
+        page = []
+        cursor = str(since) if since is not None else None
+        
+        async def send_page(done: bool):
+            await self.send_personal_message({
+                "type": "session_history",
+                "session_id": session_id,
+                "segments": page,
+                "cursor": cursor,
+                "done": done
+            }, connection_id)
+        
+        # Sessions written before segments moved out keep them embedded and have no ids
+        if since is None:
+            for segment in session.get("segments") or []:
+                page.append(self.history_segment_to_message(segment))
+                if len(page) >= page_size:
+                    await send_page(False)
+                    page = []
+        
+        async for segment in self.transcript_repo.iter_segments(session_id, after=since, batch_size=page_size):
+            page.append(self.history_segment_to_message(segment))
+            cursor = segment["id"]
+            if len(page) >= page_size:
+                await send_page(False)
+                page = []
+        
+        await send_page(True)
+    
+    def history_segment_to_message(self, segment: dict) -> dict:
+        """Convert a stored segment document to its WebSocket representation"""
+        return {
+            "id": segment.get("id"),
+            "speaker_id": segment.get("speaker_id"),
+            "start_time": segment.get("start_time"),
+            "end_time": segment.get("end_time"),
+            "text": segment.get("text"),
+            "confidence": segment.get("confidence", 0.0)
+        }
+    
     async def handle_audio_data(self, connection_id: str, message: dict):
-        """Handle incoming audio data for transcription"""
+        """Handle incoming base64 audio data for transcription"""
         try:
             session_id = message.get("session_id")
             if not session_id:
@@ -191,44 +430,18 @@ class ConnectionManager:
             
             audio_bytes = base64.b64decode(audio_base64)
             sample_rate = message.get("sample_rate", 16000)
-            language = message.get("language")
-            
-            # Process audio
-            segments = await self.speech_processor.process_audio_chunk(
-                audio_bytes, 
-                sample_rate, 
-                language
+            language = message.get("language", self.session_languages.get(session_id))
+            
+            await self.enqueue_audio(
+                connection_id,
+                session_id,
+                np.frombuffer(audio_bytes, dtype=np.int16),
+                sample_rate,
+                language,
+                message.get("streaming", settings.streaming_mode),
+                message.get("sequence"),
+                message.get("epoch", 0)
             )
-            
-            # Store segments in database
-            for segment in segments:
-                segment_dict = {
-                    "speaker_id": segment.speaker_id,
-                    "start_time": segment.start_time,
-                    "end_time": segment.end_time,
-                    "text": segment.text,
-                    "confidence": segment.confidence,
-                    "timestamp": datetime.utcnow()
-                }
-                
-                await self.transcript_repo.add_segment(session_id, segment_dict)
-            
-            # Broadcast new segments to all session participants
-            if segments:
-                await self.broadcast_to_session({
-                    "type": "new_segments",
-                    "session_id": session_id,
-                    "segments": [
-                        {
-                            "speaker_id": seg.speaker_id,
-                            "start_time": seg.start_time,
-                            "end_time": seg.end_time,
-                            "text": seg.text,
-                            "confidence": seg.confidence
-                        }
-                        for seg in segments
-                    ]
-                }, session_id)
         
         except Exception as e:
             logger.error(f"Error processing audio data: {e}")
@@ -237,6 +450,208 @@ class ConnectionManager:
                 "message": "Failed to process audio"
             }, connection_id)
     
+    async def handle_binary_audio(self, connection_id: str, data: bytes):
+        """Handle a binary audio frame (header + raw PCM) for transcription"""
+        try:
+            frame = parse_audio_frame(data)
+            
+            await self.enqueue_audio(
+                connection_id,
+                frame.session_id,
+                frame.samples,
+                frame.sample_rate,
+                self.session_languages.get(frame.session_id),
+                frame.streaming or settings.streaming_mode,
+                frame.sequence,
+                frame.epoch
+            )
+        
+        except Exception as e:
+            logger.error(f"Error processing binary audio frame: {e}")
+            await self.send_personal_message({
+                "type": "error",
+                "message": "Failed to process audio"
+            }, connection_id)
+    
+    async def enqueue_audio(
+        self,
+        connection_id: str,
+        session_id: str,
+        samples: np.ndarray,
+        sample_rate: int,
+        language: str = None,
+        streaming: bool = False,
+        sequence: Optional[int] = None,
+        epoch: int = 0
+    ):
+        """Queue audio on the session's ingest queue, starting its consumer if needed"""
+        # Resent frames are acknowledged instead of being transcribed again
+        key = (epoch, sequence)
+        if sequence is not None:
+            tracker = self.session_sequences.get(session_id)
+            if tracker is None:
+                tracker = SequenceTracker(settings.ingest_dedup_window, settings.ingest_result_cache_size)
+                self.session_sequences[session_id] = tracker
+            if not tracker.mark(key):
+                await self.send_personal_message({
+                    "type": "audio_ack",
+                    "session_id": session_id,
+                    "sequence": sequence,
+                    "epoch": epoch,
+                    "duplicate": True,
+                    "segments": tracker.result(key)
+                }, connection_id)
+                return
+        
+        ingest = self.session_ingest.get(session_id)
+        if ingest is None:
+            ingest = SessionIngest(
+                session_id,
+                handler=lambda frame: self.process_ingested(session_id, frame),
+                notify=lambda action, queued: self.send_flow_control(session_id, action, queued),
+                window_seconds=(
+                    settings.streaming_min_step_seconds if streaming else settings.ingest_window_seconds
+                ),
+                max_delay_seconds=settings.ingest_max_delay_seconds,
+                high_water_seconds=settings.ingest_high_water_seconds,
+                low_water_seconds=settings.ingest_low_water_seconds,
+                max_seconds=settings.ingest_max_seconds,
+                drop_policy=settings.ingest_drop_policy,
+                on_drop=lambda frame: self.forget_sequences(session_id, frame.sequences)
+            )
+            self.session_ingest[session_id] = ingest
+            ingest.start()
+        
+        self.ingest_connections[session_id] = connection_id
+        sequences = (key,) if sequence is not None else ()
+        await ingest.put(IngestFrame(samples, sample_rate, language, streaming, sequences))
+    
+    def forget_sequences(self, session_id: str, sequences):
+        """Unmark frames that were never processed, so their resend is not treated as a duplicate"""
+        tracker = self.session_sequences.get(session_id)
+        if tracker is not None and sequences:
+            tracker.forget(sequences)
+    
+    async def process_ingested(self, session_id: str, frame: IngestFrame):
+        """Process a coalesced ingest window and remember its result by sequence"""
+        tracker = self.session_sequences.get(session_id)
+        try:
+            segments = await self.process_audio(
+                self.ingest_connections.get(session_id),
+                session_id,
+                frame.samples,
+                frame.sample_rate,
+                frame.language,
+                frame.streaming
+            )
+        except StreamDecodeError:
+            # The audio is in the stream and decoded with the next window; a resend would repeat it
+            raise
+        except Exception:
+            # Let the client's resend be processed instead of acknowledged
+            self.forget_sequences(session_id, frame.sequences)
+            raise
+        
+        if tracker is not None and frame.sequences:
+            tracker.store_result(frame.sequences, [self.segment_to_message(seg) for seg in segments])
+    
+    async def send_flow_control(self, session_id: str, action: str, queued_seconds: float):
+        """Ask the client feeding a session to pause or resume sending audio"""
+        connection_id = self.ingest_connections.get(session_id)
+        if connection_id:
+            await self.send_personal_message({
+                "type": "flow_control",
+                "session_id": session_id,
+                "action": action,
+                "queued_seconds": queued_seconds
+            }, connection_id)
+    
+    async def process_audio(
+        self,
+        connection_id: str,
+        session_id: str,
+        audio_data,
+        sample_rate: int,
+        language: str = None,
+        streaming: bool = False
+    ):
+        """Transcribe decoded audio, publish the resulting segments and return them"""
+        # Tell the client to slow down; processing below waits for a free slot
+        executor = self.speech_processor.executor
+        process_pool = self.speech_processor.process_pool
+        if (executor is not None and executor.saturated) or (process_pool is not None and process_pool.saturated):
+            await self.send_personal_message({
+                "type": "backpressure",
+                "session_id": session_id,
+                "queue_depth": executor.queue_depth if executor is not None else 0
+            }, connection_id)
+        
+        # Process audio
+        if streaming:
+            segments, partial_segments = await self.speech_processor.process_stream_chunk(
+                session_id,
+                audio_data,
+                sample_rate,
+                language
+            )
+            
+            # Partial hypotheses are broadcast but never stored
+            if partial_segments:
+                await self.broadcast_to_session({
+                    "type": "partial_segments",
+                    "session_id": session_id,
+                    "segments": [self.segment_to_message(seg) for seg in partial_segments]
+                }, session_id)
+        else:
+            segments = await self.speech_processor.process_audio_chunk(
+                audio_data, 
+                sample_rate, 
+                language,
+                stream_id=session_id
+            )
+        
+        await self.store_and_broadcast_segments(session_id, segments)
+        return segments
+    
+    def segment_to_message(self, segment: SpeakerSegment) -> dict:
+        """Convert a speaker segment to its WebSocket representation"""
+        return {
+            "speaker_id": segment.speaker_id,
+            "start_time": segment.start_time,
+            "end_time": segment.end_time,
+            "text": segment.text,
+            "confidence": segment.confidence
+        }
+    
+    async def store_and_broadcast_segments(self, session_id: str, segments: list):
+        """Queue final segments for storage and broadcast them to the session"""
+        # Written to the database in the background by the write-behind buffer
+        now = datetime.utcnow()
+        segment_ids = self.segment_writer.add(session_id, [
+            {
+                "speaker_id": segment.speaker_id,
+                "start_time": segment.start_time,
+                "end_time": segment.end_time,
+                "text": segment.text,
+                "confidence": segment.confidence,
+                "timestamp": now
+            }
+            for segment in segments
+        ])
+        await self.broadcast_segments(session_id, segment_ids, segments)
+    
+    async def broadcast_segments(self, session_id: str, segment_ids: list, segments: list):
+        """Broadcast stored segments, with their ids, to all session participants"""
+        if segments:
+            await self.broadcast_to_session({
+                "type": "new_segments",
+                "session_id": session_id,
+                "segments": [
+                    {"id": str(segment_id), **self.segment_to_message(seg)}
+                    for segment_id, seg in zip(segment_ids, segments)
+                ]
+            }, session_id)
+    
     async def handle_stop_session(self, connection_id: str, message: dict):
         """Handle stopping a transcription session"""
         try:
@@ -244,6 +659,10 @@ class ConnectionManager:
             if not session_id:
                 raise ValueError("Session ID is required")
             
+            # Finish queued audio before closing the stream
+            await self.release_session(session_id)
+            await self.segment_writer.flush()
+            
             # Update session status
             await self.transcript_repo.update_session(session_id, {
                 "status": "completed",
@@ -259,6 +678,10 @@ class ConnectionManager:
             # Remove all connections from session
             if session_id in self.session_connections:
                 del self.session_connections[session_id]
+            self.session_languages.pop(session_id, None)
+            task = self.idle_releases.pop(session_id, None)
+            if task is not None:
+                task.cancel()
             
             logger.info(f"Session stopped: {session_id}")
         
@@ -320,6 +743,41 @@ class ConnectionManager:
                 "message": str(e)
             }, connection_id)
     
+    async def handle_subscribe_job(self, connection_id: str, message: dict):
+        """Subscribe a connection to progress updates of an upload job"""
+        try:
+            job_id = message.get("job_id")
+            if not job_id:
+                raise ValueError("Job ID is required")
+            
+            job = await self.job_repo.get_job(job_id)
+            if not job:
+                raise ValueError("Job not found")
+            
+            if job["state"] not in ("completed", "failed"):
+                self.job_subscribers.setdefault(job_id, set()).add(connection_id)
+            await self.send_personal_message({"type": "job_progress", **job_to_message(job)}, connection_id)
+        
+        except Exception as e:
+            logger.error(f"Error subscribing to job: {e}")
+            await self.send_personal_message({
+                "type": "error",
+                "message": str(e)
+            }, connection_id)
+    
+    async def publish_job_update(self, job: dict):
+        """Push a job progress update to its subscribers"""
+        job_id = job["job_id"]
+        connection_ids = self.job_subscribers.get(job_id)
+        if connection_ids:
+            text = encode_message({"type": "job_progress", **job})
+            await asyncio.gather(*(
+                self.send_broadcast_text(connection_id, text)
+                for connection_id in list(connection_ids)
+            ))
+        if job["state"] in ("completed", "failed"):
+            self.job_subscribers.pop(job_id, None)
+    
     async def handle_export_transcript(self, connection_id: str, message: dict):
         """Handle transcript export request"""
         try:
@@ -330,7 +788,7 @@ class ConnectionManager:
                 raise ValueError("Session ID is required")
             
             # Get session data
-            session = await self.transcript_repo.get_session(session_id)
+            session = await self.transcript_repo.get_session(session_id, include_segments=False)
             if not session:
                 raise ValueError("Session not found")
             
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: int16 PCM to float32 conversion, allocations per audio-second
+
+Feeds 16-bit PCM chunks, as they arrive over the WebSocket, through:
+  - the previous preprocess_audio path: astype(float32), then / 32768.0,
+    then torch.tensor() for the models
+  - pcm16_to_float32 without a workspace: one np.multiply into a fresh array
+  - a per-session PcmWorkspace: np.multiply into a reused buffer, handed to
+    torch with torch.from_numpy
+Host allocations are counted with tracemalloc (numpy reports its buffers to
+it); torch's allocator is not traced, so tensor copies are counted from
+whether the tensor shares the array's memory.
+
+Usage:
+    python benchmarks/bench_pcm_decode.py --chunk-ms 100 250 1000 --seconds 60
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from backend.audio_decode import PcmWorkspace, pcm16_to_float32  # noqa: E402
+
+
+def old_path(data: bytes, workspace: PcmWorkspace):
+    audio = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+    audio = audio / 32768.0
+    return audio, torch.tensor(audio)
+
+
+def fresh_path(data: bytes, workspace: PcmWorkspace):
+    audio = pcm16_to_float32(np.frombuffer(data, dtype=np.int16))
+    return audio, torch.from_numpy(audio)
+
+
+def workspace_path(data: bytes, workspace: PcmWorkspace):
+    audio = workspace.convert(np.frombuffer(data, dtype=np.int16))
+    return audio, torch.from_numpy(audio)
+
+
+METHODS = [("astype+divide", old_path), ("multiply", fresh_path), ("workspace", workspace_path)]
+
+
+def measure_allocations(method, chunks):
+    """Bytes numpy allocated and bytes torch copied over all chunks"""
+    workspace = PcmWorkspace()
+    allocated = copied = 0
+    tracemalloc.start()
+    try:
+        for data in chunks:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            audio, tensor = method(data, workspace)
+            allocated += tracemalloc.get_traced_memory()[1] - baseline
+            if tensor.data_ptr() != audio.ctypes.data:
+                copied += tensor.numel() * tensor.element_size()
+            del audio, tensor
+    finally:
+        tracemalloc.stop()
+    return allocated, copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PCM conversion allocation benchmark")
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--chunk-ms", type=float, nargs="+", default=[100.0, 250.0, 1000.0])
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pcm = rng.integers(-32768, 32768, int(args.seconds * args.sample_rate), dtype=np.int16)
+
+    print(f"{'chunk ms':>8} {'method':>14} {'numpy B/audio-s':>16} {'torch copy B/audio-s':>21} {'audio s/s':>10}")
+    for chunk_ms in args.chunk_ms:
+        chunk = int(args.sample_rate * chunk_ms / 1000)
+        chunks = [pcm[i:i + chunk].tobytes() for i in range(0, len(pcm), chunk)]
+
+        for name, method in METHODS:
+            allocated, copied = measure_allocations(method, chunks)
+
+            best = float("inf")
+            for _ in range(args.repeat):
+                workspace = PcmWorkspace()
+                start = time.perf_counter()
+                for data in chunks:
+                    method(data, workspace)
+                best = min(best, time.perf_counter() - start)
+
+            print(
+                f"{chunk_ms:>8.0f} {name:>14} {allocated / args.seconds:>16.0f} "
+                f"{copied / args.seconds:>21.0f} {args.seconds / best:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Whisper throughput vs. number of worker processes
+
+Runs a fixed number of concurrent transcriptions through
+ProcessInferencePool for each worker count and reports audio seconds
+transcribed per wall-clock second, plus scaling efficiency relative to a
+single worker.
+
+Usage:
+    python benchmarks/bench_process_pool.py --model tiny --workers 1 2 4 8
+    python benchmarks/bench_process_pool.py --audio sample.wav --requests 32
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from backend.process_pool import ProcessInferencePool  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def load_audio(path: str, seconds: float) -> np.ndarray:
+    """Load a 16 kHz mono clip, or synthesize a voiced-like signal"""
+    if path:
+        import librosa
+        audio, _ = librosa.load(path, sr=SAMPLE_RATE, mono=True, duration=seconds)
+        return audio.astype(np.float32)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 3 * t))
+    return (0.1 * envelope * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+async def run(pool: ProcessInferencePool, audio: np.ndarray, requests: int) -> float:
+    # Warm-up: workers start lazily and load the model on first use
+    await asyncio.gather(*(pool.transcribe(audio, language="en", fp16=False) for _ in range(pool.processes)))
+    start = time.perf_counter()
+    await asyncio.gather(*(pool.transcribe(audio, language="en", fp16=False) for _ in range(requests)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process-pool inference scaling benchmark")
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--audio", default=None, help="Optional audio file to transcribe")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    audio = load_audio(args.audio, args.seconds)
+    audio_seconds = len(audio) / SAMPLE_RATE * args.requests
+    baseline = None
+
+    print(f"model={args.model} clip={len(audio) / SAMPLE_RATE:.1f}s requests={args.requests}")
+    print(f"{'workers':>8} {'wall s':>8} {'audio s/s':>10} {'speedup':>8} {'efficiency':>10}")
+    for workers in args.workers:
+        pool = ProcessInferencePool(args.model, processes=workers, intra_op_threads=1, max_queue=args.requests)
+        try:
+            elapsed = asyncio.run(run(pool, audio, args.requests))
+        finally:
+            pool.shutdown()
+        throughput = audio_seconds / elapsed
+        baseline = baseline or throughput
+        speedup = throughput / baseline
+        print(f"{workers:>8} {elapsed:>8.2f} {throughput:>10.1f} {speedup:>8.2f} {speedup / workers * args.workers[0]:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-chunk resampling, librosa vs. the streaming polyphase resampler
+
+Resamples a band-limited test signal (a sum of tones below 5 kHz) to 16 kHz
+in fixed-size chunks, the way WebSocket audio arrives, and reports
+throughput and quality for:
+  - librosa.resample on each chunk (the previous preprocess_audio path)
+  - scipy.signal.resample_poly on each chunk (stateless polyphase)
+  - StreamingResampler, which carries filter state across chunks
+Quality is the SNR against the tones synthesized directly at 16 kHz, over
+the whole signal and over the 5 ms around each chunk border.
+
+Usage:
+    python benchmarks/bench_resampler.py --rates 44100 48000 --chunk-ms 100 250
+"""
+
+import argparse
+import os
+import sys
+import time
+from math import gcd
+
+import librosa
+import numpy as np
+from scipy.signal import resample_poly
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from backend.resampler import StreamingResampler  # noqa: E402
+
+TARGET_RATE = 16000
+TONES = [(220.0, 0.3), (1000.0, 0.2), (3150.0, 0.1), (4800.0, 0.05)]
+
+
+def tones(n_samples: int, sample_rate: int) -> np.ndarray:
+    t = np.arange(n_samples) / sample_rate
+    return sum(amp * np.sin(2 * np.pi * freq * t) for freq, amp in TONES).astype(np.float32)
+
+
+def snr_db(signal: np.ndarray, reference: np.ndarray) -> float:
+    noise = np.sum((signal - reference) ** 2)
+    return float(10 * np.log10(np.sum(reference ** 2) / noise)) if noise > 0 else float("inf")
+
+
+def run_librosa(chunks, orig_rate):
+    return [librosa.resample(c, orig_sr=orig_rate, target_sr=TARGET_RATE) for c in chunks]
+
+
+def run_resample_poly(chunks, orig_rate):
+    divisor = gcd(orig_rate, TARGET_RATE)
+    return [resample_poly(c, TARGET_RATE // divisor, orig_rate // divisor) for c in chunks]
+
+
+def run_streaming(chunks, orig_rate):
+    resampler = StreamingResampler(orig_rate, TARGET_RATE)
+    return [resampler.process(c) for c in chunks] + [resampler.flush()]
+
+
+METHODS = [("librosa", run_librosa), ("resample_poly", run_resample_poly), ("streaming", run_streaming)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming resampler benchmark")
+    parser.add_argument("--rates", type=int, nargs="+", default=[44100, 48000])
+    parser.add_argument("--chunk-ms", type=float, nargs="+", default=[100.0, 250.0, 1000.0])
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rate':>6} {'chunk ms':>8} {'method':>14} {'audio s/s':>10} {'SNR dB':>8} {'border SNR dB':>14}")
+    for orig_rate in args.rates:
+        signal = tones(int(args.seconds * orig_rate), orig_rate)
+        reference = tones(int(np.ceil(len(signal) * TARGET_RATE / orig_rate)), TARGET_RATE)
+        # Ignore the start and end of the whole signal, where every method sees silence
+        edge = TARGET_RATE // 20
+
+        for chunk_ms in args.chunk_ms:
+            chunk = int(orig_rate * chunk_ms / 1000)
+            chunks = [signal[i:i + chunk] for i in range(0, len(signal), chunk)]
+            out_chunk = chunk * TARGET_RATE / orig_rate
+            borders = np.arange(1, len(chunks)) * out_chunk
+            border_mask = np.zeros(len(reference), dtype=bool)
+            for border in borders.astype(int):
+                border_mask[max(0, border - 40):border + 40] = True
+            border_mask[:edge] = border_mask[-edge:] = False
+
+            for name, method in METHODS:
+                best = float("inf")
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    output = np.concatenate(method(chunks, orig_rate))
+                    best = min(best, time.perf_counter() - start)
+
+                n = min(len(output), len(reference))
+                output, ref = output[:n], reference[:n]
+                mask = border_mask[:n]
+                print(
+                    f"{orig_rate:>6} {chunk_ms:>8.0f} {name:>14} {args.seconds / best:>10.0f} "
+                    f"{snr_db(output[edge:n - edge], ref[edge:n - edge]):>8.1f} "
+                    f"{snr_db(output[mask], ref[mask]):>14.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: temporary WAV round-trip vs. in-memory waveform hand-off
+
+Measures the per-call cost of the old diarization/embedding input path
+(torchaudio.save to a NamedTemporaryFile, read back from disk) against
+wrapping the array with torch.from_numpy. Model time is excluded so only
+the input overhead is compared.
+
+Usage:
+    python benchmarks/bench_waveform_io.py --seconds 5 --iterations 200
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import torch
+import torchaudio
+
+
+def temp_wav_roundtrip(audio: np.ndarray, sample_rate: int):
+    """Old path: serialize to a temporary WAV and load it back"""
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+        torchaudio.save(temp_file.name, torch.tensor(audio).unsqueeze(0), sample_rate)
+        temp_path = temp_file.name
+    try:
+        waveform, _ = torchaudio.load(temp_path)
+        return waveform
+    finally:
+        os.unlink(temp_path)
+
+
+def in_memory(audio: np.ndarray, sample_rate: int):
+    """New path: zero-copy tensor view passed as a pyannote audio dict"""
+    return {"waveform": torch.from_numpy(audio).unsqueeze(0), "sample_rate": sample_rate}
+
+
+def bench(fn, audio: np.ndarray, sample_rate: int, iterations: int) -> float:
+    fn(audio, sample_rate)  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(audio, sample_rate)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Waveform hand-off benchmark")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Clip length in seconds")
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    audio = rng.uniform(-0.5, 0.5, int(args.seconds * args.sample_rate)).astype(np.float32)
+
+    old = bench(temp_wav_roundtrip, audio, args.sample_rate, args.iterations)
+    new = bench(in_memory, audio, args.sample_rate, args.iterations)
+
+    print(f"clip: {args.seconds:.1f}s @ {args.sample_rate} Hz, tmpdir: {tempfile.gettempdir()}")
+    print(f"temp WAV round-trip: {old * 1e3:8.3f} ms/call")
+    print(f"in-memory tensor:    {new * 1e3:8.3f} ms/call")
+    print(f"saved per call:      {(old - new) * 1e3:8.3f} ms ({old / max(new, 1e-9):.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cross-session Whisper micro-batching, throughput vs. p95 latency
+
+Simulates concurrent sessions that each submit short windows at a steady
+rate, and runs them through WhisperBatchScheduler for every combination of
+max batch size and max wait. Batch size 1 is the unbatched baseline.
+
+Usage:
+    python benchmarks/bench_whisper_batching.py --model tiny --sessions 16
+    python benchmarks/bench_whisper_batching.py --batch-sizes 1 4 8 16 --waits 10 50 100
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+import whisper
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from backend.batching import WhisperBatchScheduler  # noqa: E402
+from backend.inference import InferenceExecutor  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def synth_window(seconds: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    tone = np.sin(2 * np.pi * rng.uniform(120, 300) * t)
+    return (0.1 * tone + 0.01 * rng.normal(size=len(t))).astype(np.float32)
+
+
+async def session(scheduler, windows, interval, latencies):
+    for audio in windows:
+        start = time.perf_counter()
+        await scheduler.submit(audio, language="en")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def run_setting(model, args, max_batch, max_wait_ms):
+    executor = InferenceExecutor(workers=args.workers, max_queue=args.sessions)
+    # Word timestamps on, as in the server: alignment is part of the cost per window
+    scheduler = WhisperBatchScheduler(model, executor, max_batch, max_wait_ms, word_timestamps=True)
+    windows = [
+        [synth_window(args.window_seconds, s * 1000 + i) for i in range(args.windows)]
+        for s in range(args.sessions)
+    ]
+
+    warm = await scheduler.submit(windows[0][0], language="en")
+    assert all("words" in segment for segment in warm["segments"]), "batched results lack word timestamps"
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(session(scheduler, w, args.interval, latencies) for w in windows))
+    elapsed = time.perf_counter() - start
+    scheduler.stop()
+    executor.shutdown()
+
+    audio_seconds = args.sessions * args.windows * args.window_seconds
+    return audio_seconds / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 95), scheduler.get_metrics()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper micro-batching benchmark")
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--windows", type=int, default=4, help="Windows submitted per session")
+    parser.add_argument("--window-seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=1, help="Inference workers (batches in flight)")
+    parser.add_argument("--interval", type=float, default=0.0, help="Pause between windows per session")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--waits", type=float, nargs="+", default=[10.0, 50.0, 100.0], help="Max wait in ms")
+    args = parser.parse_args()
+
+    model = whisper.load_model(args.model)
+    print(
+        f"model={args.model} sessions={args.sessions} windows={args.windows}x{args.window_seconds:.1f}s "
+        f"workers={args.workers}"
+    )
+    print(f"{'batch':>6} {'wait ms':>8} {'audio s/s':>10} {'p50 s':>7} {'p95 s':>7} {'avg batch':>10}")
+    for max_batch in args.batch_sizes:
+        for max_wait in (args.waits if max_batch > 1 else [0.0]):
+            throughput, p50, p95, metrics = asyncio.run(run_setting(model, args, max_batch, max_wait))
+            print(f"{max_batch:>6} {max_wait:>8.0f} {throughput:>10.1f} {p50:>7.2f} {p95:>7.2f} {metrics['batch_size_avg']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
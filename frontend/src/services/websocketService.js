@@ -1,3 +1,10 @@
+// Binary audio frame header (must match backend/audio_protocol.py)
+const AUDIO_MAGIC = new Uint8Array([0x53, 0x52, 0x41, 0x31]); // "SRA1"
+const AUDIO_HEADER_SIZE = 28;
+const AUDIO_FORMAT_INT16 = 1;
+const AUDIO_FORMAT_FLOAT32 = 2;
+const AUDIO_FLAG_STREAMING = 0x01;
+
 class WebSocketService {
   constructor() {
     this.ws = null;
@@ -7,6 +14,14 @@ class WebSocketService {
     this.maxReconnectAttempts = 5;
     this.reconnectDelay = 1000;
     this.isReconnecting = false;
+    this.resetAudioSequence();
+  }
+
+  resetAudioSequence() {
+    // Frames are deduplicated by (epoch, sequence); a fresh epoch keeps the
+    // server from taking a restarted count for resent frames
+    this.audioSequence = 0;
+    this.audioEpoch = 1 + Math.floor(Math.random() * 0xffff);
   }
 
   connect() {
@@ -138,6 +153,7 @@ class WebSocketService {
 
   // Transcription session methods
   startSession(sessionName, language = null) {
+    this.resetAudioSequence();
     this.send({
       type: 'start_session',
       session_name: sessionName,
@@ -145,10 +161,12 @@ class WebSocketService {
     });
   }
 
-  joinSession(sessionId) {
+  joinSession(sessionId, since = null) {
+    // since: last segment id seen (or a timestamp) to receive only newer history
     this.send({
       type: 'join_session',
-      session_id: sessionId
+      session_id: sessionId,
+      since: since
     });
   }
 
@@ -159,26 +177,43 @@ class WebSocketService {
     });
   }
 
-  sendAudioData(sessionId, audioData, sampleRate = 16000, language = null) {
-    // Convert audio data to base64
-    let audioBase64;
-    if (audioData instanceof ArrayBuffer) {
-      const uint8Array = new Uint8Array(audioData);
-      audioBase64 = btoa(String.fromCharCode.apply(null, uint8Array));
-    } else if (audioData instanceof Uint8Array) {
-      audioBase64 = btoa(String.fromCharCode.apply(null, audioData));
+  sendAudioData(sessionId, audioData, sampleRate = 16000, streaming = false) {
+    // Binary frame: fixed header followed by raw PCM (see backend/audio_protocol.py)
+    let pcm;
+    let format;
+    if (audioData instanceof Float32Array) {
+      pcm = audioData;
+      format = AUDIO_FORMAT_FLOAT32;
+    } else if (audioData instanceof Int16Array) {
+      pcm = audioData;
+      format = AUDIO_FORMAT_INT16;
+    } else if (audioData instanceof ArrayBuffer || audioData instanceof Uint8Array) {
+      pcm = new Uint8Array(audioData instanceof ArrayBuffer ? audioData : audioData.buffer,
+                           audioData.byteOffset || 0, audioData.byteLength);
+      format = AUDIO_FORMAT_INT16;
     } else {
       console.error('Unsupported audio data format');
       return;
     }
 
-    this.send({
-      type: 'audio_data',
-      session_id: sessionId,
-      audio_data: audioBase64,
-      sample_rate: sampleRate,
-      language: language
-    });
+    const frame = new Uint8Array(AUDIO_HEADER_SIZE + pcm.byteLength);
+    const header = new DataView(frame.buffer, 0, AUDIO_HEADER_SIZE);
+    frame.set(AUDIO_MAGIC, 0);
+    for (let i = 0; i < 12; i++) {
+      header.setUint8(4 + i, parseInt(sessionId.substr(i * 2, 2), 16));
+    }
+    header.setUint32(16, this.audioSequence++, true);
+    header.setUint32(20, sampleRate, true);
+    header.setUint8(24, format);
+    header.setUint8(25, streaming ? AUDIO_FLAG_STREAMING : 0);
+    header.setUint16(26, this.audioEpoch, true);
+    frame.set(new Uint8Array(pcm.buffer, pcm.byteOffset, pcm.byteLength), AUDIO_HEADER_SIZE);
+
+    if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+      this.ws.send(frame.buffer);
+    } else {
+      console.warn('WebSocket not connected. Cannot send audio frame');
+    }
   }
 
   addSpeaker(speakerName, audioSample, sampleRate = 16000) {
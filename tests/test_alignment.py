@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from backend.alignment import SpeakerTimeline, split_words_by_speaker
+
+
+class CountingTurn(dict):
+    """Turn dict counting how often the sweep reads it"""
+
+    reads = 0
+
+    def __getitem__(self, key):
+        CountingTurn.reads += 1
+        return super().__getitem__(key)
+
+
+def brute_force(turns, start, end):
+    best_speaker, best_overlap = None, 0.0
+    for turn in sorted(turns, key=lambda turn: turn["start"]):
+        overlap = min(end, turn["end"]) - max(start, turn["start"])
+        if overlap > best_overlap:
+            best_speaker, best_overlap = turn["speaker"], overlap
+    return best_speaker, best_overlap
+
+
+def random_turns(rng: random.Random, count: int):
+    turns = []
+    for i in range(count):
+        start = rng.uniform(0, 100)
+        turns.append({"start": start, "end": start + rng.uniform(0.1, 5), "speaker": f"S{i % 4}"})
+    return turns
+
+
+def test_best_speakers_matches_brute_force():
+    rng = random.Random(0)
+    turns = random_turns(rng, 200) + [{"start": 3.0, "end": 90.0, "speaker": "long"}]
+    intervals = []
+    for _ in range(500):
+        start = rng.uniform(-5, 105)
+        intervals.append((start, start + rng.uniform(0.05, 3)))
+
+    results = SpeakerTimeline(turns).best_speakers(intervals)
+
+    for (start, end), (speaker, overlap) in zip(intervals, results):
+        expected_speaker, expected_overlap = brute_force(turns, start, end)
+        assert overlap == pytest.approx(expected_overlap)
+        if expected_overlap > 0:
+            assert speaker == expected_speaker
+        else:
+            assert speaker is None
+
+
+def test_results_keep_the_query_order():
+    timeline = SpeakerTimeline([
+        {"start": 0.0, "end": 5.0, "speaker": "A"},
+        {"start": 5.0, "end": 10.0, "speaker": "B"},
+    ])
+    assert timeline.best_speakers([(6.0, 7.0), (1.0, 2.0), (20.0, 21.0)]) == [("B", 1.0), ("A", 1.0), (None, 0.0)]
+
+
+def test_ties_go_to_the_earlier_turn():
+    timeline = SpeakerTimeline([
+        {"start": 2.0, "end": 4.0, "speaker": "B"},
+        {"start": 0.0, "end": 3.0, "speaker": "A"},
+    ])
+    assert timeline.best_speakers([(2.0, 3.0)]) == [("A", 1.0)]
+
+
+def test_one_long_turn_does_not_make_every_query_scan_all_turns():
+    turns = [CountingTurn(start=0.0, end=10000.0, speaker="long")]
+    turns += [CountingTurn(start=float(i), end=i + 0.5, speaker=f"S{i % 3}") for i in range(1, 5000)]
+    intervals = [(i + 0.1, i + 0.4) for i in range(1, 5000)]
+    timeline = SpeakerTimeline(turns)
+
+    CountingTurn.reads = 0
+    results = timeline.best_speakers(intervals)
+
+    # Equal overlaps go to the long turn, which starts first
+    assert all(speaker == "long" and overlap == pytest.approx(0.3) for speaker, overlap in results)
+    # A scan from the long turn onwards would read about 12.5M turns
+    assert CountingTurn.reads < 20 * (len(turns) + len(intervals))
+
+
+def test_nearest_speaker_prefers_an_earlier_longer_turn():
+    timeline = SpeakerTimeline([
+        {"start": 0.0, "end": 10.0, "speaker": "long"},
+        {"start": 1.0, "end": 2.0, "speaker": "short"},
+        {"start": 12.0, "end": 13.0, "speaker": "later"},
+    ])
+    assert timeline.nearest_speaker(5.0) == "long"
+    assert timeline.nearest_speaker(11.5) == "later"
+    assert timeline.nearest_speaker(10.5) == "long"
+    assert timeline.nearest_speaker(-1.0) == "long"
+    assert timeline.nearest_speaker(20.0) == "later"
+    assert SpeakerTimeline([]).nearest_speaker(1.0) is None
+
+
+def test_split_words_by_speaker_groups_runs_and_falls_back_to_the_nearest_turn():
+    timeline = SpeakerTimeline([
+        {"start": 0.0, "end": 2.0, "speaker": "A"},
+        {"start": 3.0, "end": 5.0, "speaker": "B"},
+    ])
+    words = [
+        {"word": " one", "start": 0.0, "end": 0.5},
+        {"word": " two", "start": 0.6, "end": 1.0},
+        {"word": " gap", "start": 2.1, "end": 2.3},
+        {"word": " three", "start": 3.2, "end": 3.6},
+    ]
+    matches = timeline.best_speakers([(word["start"], word["end"]) for word in words])
+
+    runs = split_words_by_speaker(words, matches, timeline)
+
+    assert [(speaker, [w["word"] for w in run], overlapped) for speaker, run, overlapped in runs] == [
+        ("A", [" one", " two", " gap"], False),
+        ("B", [" three"], True),
+    ]
@@ -0,0 +1,115 @@
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from backend.audio_decode import PcmWorkspace, iter_audio_blocks, pcm16_to_float32, read_audio_file
+from backend.resampler import resample
+
+SAMPLE_RATE = 16000
+
+
+def tone(seconds: float, rate: int, frequency: float = 440.0) -> np.ndarray:
+    t = np.arange(int(seconds * rate)) / rate
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def wav_file(audio: np.ndarray, rate: int, subtype: str = "FLOAT") -> io.BytesIO:
+    file = io.BytesIO()
+    sf.write(file, audio, rate, format="WAV", subtype=subtype)
+    file.seek(0)
+    return file
+
+
+def pcm16(audio: np.ndarray) -> np.ndarray:
+    return (audio * 32767).astype(np.int16)
+
+
+def test_pcm16_to_float32_scales_to_unit_range():
+    pcm = np.array([-32768, -16384, 0, 16384, 32767], dtype=np.int16)
+    out = pcm16_to_float32(pcm)
+    assert out.dtype == np.float32
+    np.testing.assert_array_equal(out, pcm.astype(np.float32) / 32768.0)
+
+
+def test_workspace_reuses_its_buffer_and_grows():
+    workspace = PcmWorkspace(4)
+    first = workspace.convert(np.full(3, 16384, dtype=np.int16))
+    second = workspace.convert(np.full(2, -16384, dtype=np.int16))
+    # Views into the same buffer: the second call overwrote the first
+    assert np.shares_memory(first, second)
+    np.testing.assert_array_equal(first[:2], [-0.5, -0.5])
+
+    grown = workspace.convert(np.zeros(10, dtype=np.int16))
+    assert len(grown) == 10
+    assert not np.shares_memory(grown, first)
+
+
+def test_wav_at_the_target_rate_is_read_unchanged():
+    audio = tone(1.5, SAMPLE_RATE)
+    decoded = read_audio_file(wav_file(audio, SAMPLE_RATE), SAMPLE_RATE)
+    np.testing.assert_allclose(decoded, audio, atol=1e-6)
+
+
+def test_wav_is_resampled_in_one_pass_across_blocks():
+    audio = tone(3.0, 44100)
+    # Blocks of a quarter second must give the same result as resampling the whole file
+    blocks = list(iter_audio_blocks(wav_file(audio, 44100), SAMPLE_RATE, block_seconds=0.25))
+    decoded = np.concatenate(blocks)
+    np.testing.assert_allclose(decoded, resample(audio, 44100, SAMPLE_RATE), atol=1e-5)
+
+
+def test_read_audio_file_matches_the_block_iterator():
+    audio = tone(2.0, 22050)
+    whole = read_audio_file(wav_file(audio, 22050), SAMPLE_RATE)
+    blocks = np.concatenate(list(iter_audio_blocks(wav_file(audio, 22050), SAMPLE_RATE)))
+    np.testing.assert_array_equal(whole, blocks)
+    assert abs(len(whole) - 2.0 * SAMPLE_RATE) <= 1
+
+
+def test_stereo_is_mixed_down_to_mono():
+    left = tone(1.0, SAMPLE_RATE, 440.0)
+    right = tone(1.0, SAMPLE_RATE, 660.0)
+    decoded = read_audio_file(wav_file(np.stack([left, right], axis=1), SAMPLE_RATE), SAMPLE_RATE)
+    np.testing.assert_allclose(decoded, (left + right) / 2, atol=1e-6)
+
+
+def test_pcm16_wav_is_scaled_to_float():
+    audio = tone(1.0, SAMPLE_RATE)
+    decoded = read_audio_file(wav_file(audio, SAMPLE_RATE, subtype="PCM_16"), SAMPLE_RATE)
+    np.testing.assert_allclose(decoded, audio, atol=1e-4)
+
+
+def test_headerless_data_is_read_as_raw_pcm():
+    audio = tone(1.0, SAMPLE_RATE)
+    decoded = read_audio_file(io.BytesIO(pcm16(audio).tobytes()), SAMPLE_RATE)
+    np.testing.assert_array_equal(decoded, pcm16_to_float32(pcm16(audio)))
+
+
+def test_raw_pcm_is_resampled_from_its_declared_rate():
+    audio = tone(1.0, 8000)
+    decoded = read_audio_file(io.BytesIO(pcm16(audio).tobytes()), SAMPLE_RATE, raw_sample_rate=8000)
+    assert abs(len(decoded) - SAMPLE_RATE) <= 1
+
+
+@pytest.mark.parametrize("filename", ["upload.raw", "upload.pcm"])
+def test_raw_pcm_files_are_read_whatever_their_name(tmp_path, filename):
+    audio = tone(1.0, SAMPLE_RATE)
+    path = tmp_path / filename
+    path.write_bytes(pcm16(audio).tobytes())
+    with open(path, "rb") as f:
+        decoded = read_audio_file(f, SAMPLE_RATE)
+    np.testing.assert_array_equal(decoded, pcm16_to_float32(pcm16(audio)))
+
+
+def test_odd_trailing_byte_is_ignored():
+    data = pcm16(tone(0.1, SAMPLE_RATE)).tobytes() + b"\x01"
+    decoded = read_audio_file(io.BytesIO(data), SAMPLE_RATE)
+    assert len(decoded) == int(0.1 * SAMPLE_RATE)
+
+
+def test_empty_file_decodes_to_no_samples():
+    decoded = read_audio_file(io.BytesIO(b""), SAMPLE_RATE)
+    assert decoded.dtype == np.float32
+    assert len(decoded) == 0
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from backend.audio_protocol import HEADER_SIZE, build_audio_frame, parse_audio_frame
+
+SESSION_ID = "65a1f0c2e4b0a1b2c3d4e5f6"
+
+
+@pytest.mark.parametrize("dtype", [np.int16, np.float32])
+def test_round_trip(dtype):
+    samples = (np.arange(-100, 100) * 50).astype(dtype)
+    frame = parse_audio_frame(build_audio_frame(SESSION_ID, 42, 48000, samples, streaming=True, epoch=513))
+
+    assert frame.session_id == SESSION_ID
+    assert frame.sequence == 42
+    assert frame.epoch == 513
+    assert frame.sample_rate == 48000
+    assert frame.streaming
+    assert frame.samples.dtype == dtype
+    np.testing.assert_array_equal(frame.samples, samples)
+
+
+def test_payload_is_a_read_only_view():
+    data = build_audio_frame(SESSION_ID, 0, 16000, np.zeros(10, dtype=np.int16))
+    frame = parse_audio_frame(data)
+    assert not frame.streaming
+    assert frame.epoch == 0
+    assert not frame.samples.flags.writeable
+    assert np.shares_memory(frame.samples, np.frombuffer(data, dtype=np.uint8))
+
+
+def test_other_dtypes_are_sent_as_int16():
+    frame = parse_audio_frame(build_audio_frame(SESSION_ID, 0, 16000, np.array([1, -2, 3], dtype=np.int64)))
+    assert frame.samples.dtype == np.int16
+    np.testing.assert_array_equal(frame.samples, [1, -2, 3])
+
+
+def test_trailing_partial_sample_is_ignored():
+    data = build_audio_frame(SESSION_ID, 0, 16000, np.arange(4, dtype=np.int16)) + b"\x01"
+    assert len(parse_audio_frame(data).samples) == 4
+
+
+def test_short_frame_is_rejected():
+    with pytest.raises(ValueError, match="shorter than header"):
+        parse_audio_frame(b"SRA1")
+
+
+def test_bad_magic_is_rejected():
+    data = build_audio_frame(SESSION_ID, 0, 16000, np.zeros(4, dtype=np.int16))
+    with pytest.raises(ValueError, match="magic"):
+        parse_audio_frame(b"XXXX" + data[4:])
+
+
+def test_unknown_format_is_rejected():
+    data = bytearray(build_audio_frame(SESSION_ID, 0, 16000, np.zeros(4, dtype=np.int16)))
+    data[HEADER_SIZE - 4] = 9
+    with pytest.raises(ValueError, match="Unsupported audio format"):
+        parse_audio_frame(bytes(data))
@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+from backend.database import decode_session_cursor, encode_session_cursor
+
+
+def test_session_cursor_round_trip():
+    session_id = ObjectId()
+    created_at = datetime(2024, 3, 1, 12, 30, 15, 123000)
+    cursor = encode_session_cursor(created_at, session_id)
+    assert decode_session_cursor(cursor) == (created_at, session_id)
+
+
+def test_session_cursor_truncates_to_mongodb_precision():
+    session_id = ObjectId()
+    cursor = encode_session_cursor(datetime(2024, 3, 1, 12, 30, 15, 123999), session_id)
+    assert decode_session_cursor(cursor) == (datetime(2024, 3, 1, 12, 30, 15, 123000), session_id)
+
+
+def test_session_cursor_accepts_aware_datetimes():
+    session_id = ObjectId()
+    created_at = datetime(2024, 3, 1, 12, 30, 15, 123000)
+    cursor = encode_session_cursor(created_at.replace(tzinfo=timezone.utc), session_id)
+    assert decode_session_cursor(cursor) == (created_at, session_id)
+
+
+def test_session_cursors_order_like_their_positions():
+    first = encode_session_cursor(datetime(2024, 3, 1), ObjectId())
+    second = encode_session_cursor(datetime(2024, 3, 2), ObjectId())
+    assert decode_session_cursor(first) < decode_session_cursor(second)
+
+
+@pytest.mark.parametrize("cursor", ["", "abc", "123", "123-notanobjectid", "x-65a1f0c2e4b0a1b2c3d4e5f6"])
+def test_malformed_session_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_session_cursor(cursor)
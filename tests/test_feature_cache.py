@@ -0,0 +1,135 @@
+import os
+
+import numpy as np
+import pytest
+
+from backend.feature_cache import FeatureCache
+
+ENTRY = np.zeros(256, dtype=np.float32)  # 1 KiB
+KIB = ENTRY.nbytes
+
+
+def entry(value: float) -> np.ndarray:
+    return np.full(256, value, dtype=np.float32)
+
+
+def disk_files(path) -> set:
+    return {name for name in os.listdir(path) if name.endswith(".npy")}
+
+
+def test_audio_hash_depends_only_on_the_samples():
+    audio = np.random.default_rng(0).uniform(-1, 1, 1000).astype(np.float32)
+    strided = np.repeat(audio, 2)[::2]
+
+    assert not strided.flags["C_CONTIGUOUS"]
+    assert FeatureCache.audio_hash(strided) == FeatureCache.audio_hash(audio)
+    assert FeatureCache.audio_hash(audio.astype(np.float64)) == FeatureCache.audio_hash(audio)
+    assert FeatureCache.audio_hash(audio[:-1]) != FeatureCache.audio_hash(audio)
+
+
+def test_keys_are_namespaced():
+    audio_hash = FeatureCache.audio_hash(np.zeros(10, dtype=np.float32))
+    assert FeatureCache.key(audio_hash, "mel") != FeatureCache.key(audio_hash, "encoder")
+
+
+def test_memory_tier_hits_and_misses():
+    cache = FeatureCache(max_memory_bytes=4 * KIB)
+
+    assert cache.get("a") is None
+    cache.put("a", entry(1.0))
+    np.testing.assert_array_equal(cache.get("a"), entry(1.0))
+
+    metrics = cache.get_metrics()
+    assert metrics["feature_cache_hits"] == 1
+    assert metrics["feature_cache_misses"] == 1
+    assert metrics["feature_cache_memory_bytes"] == KIB
+
+
+def test_memory_tier_evicts_least_recently_used_by_bytes():
+    cache = FeatureCache(max_memory_bytes=3 * KIB)
+    for key in "abc":
+        cache.put(key, entry(1.0))
+    cache.get("a")
+    cache.put("d", entry(1.0))
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in "acd")
+    assert cache.get_metrics()["feature_cache_memory_bytes"] == 3 * KIB
+
+
+def test_replacing_an_entry_does_not_count_it_twice():
+    cache = FeatureCache(max_memory_bytes=4 * KIB)
+    cache.put("a", entry(1.0))
+    cache.put("a", entry(2.0))
+
+    np.testing.assert_array_equal(cache.get("a"), entry(2.0))
+    assert cache.get_metrics()["feature_cache_memory_bytes"] == KIB
+
+
+def test_evicted_entries_are_demoted_to_disk(tmp_path):
+    cache = FeatureCache(max_memory_bytes=2 * KIB, disk_dir=str(tmp_path), max_disk_bytes=16 * KIB)
+    for i, key in enumerate("abc"):
+        cache.put(key, entry(float(i)))
+
+    assert disk_files(tmp_path) == {"a.npy"}
+    demoted = cache.get("a")
+    assert isinstance(demoted, np.memmap)
+    np.testing.assert_array_equal(demoted, entry(0.0))
+    assert cache.get_metrics()["feature_cache_disk_hits"] == 1
+
+
+def test_entries_too_large_for_memory_go_straight_to_disk(tmp_path):
+    cache = FeatureCache(max_memory_bytes=KIB // 2, disk_dir=str(tmp_path), max_disk_bytes=16 * KIB)
+    cache.put("a", entry(1.0))
+
+    assert cache.get_metrics()["feature_cache_memory_bytes"] == 0
+    np.testing.assert_array_equal(cache.get("a"), entry(1.0))
+
+
+def test_disk_tier_is_bounded_in_bytes(tmp_path):
+    # Room for two entries with their .npy headers, not three
+    cache = FeatureCache(max_memory_bytes=0, disk_dir=str(tmp_path), max_disk_bytes=2 * KIB + 512)
+    for key in "abc":
+        cache.put(key, entry(1.0))
+
+    assert disk_files(tmp_path) == {"b.npy", "c.npy"}
+    assert cache.get("a") is None
+    assert cache.get_metrics()["feature_cache_disk_bytes"] <= 2 * KIB + 512
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    cache = FeatureCache(max_memory_bytes=0, disk_dir=str(tmp_path), max_disk_bytes=16 * KIB)
+    cache.put("a", entry(3.0))
+
+    reopened = FeatureCache(max_memory_bytes=0, disk_dir=str(tmp_path), max_disk_bytes=16 * KIB)
+    np.testing.assert_array_equal(reopened.get("a"), entry(3.0))
+    assert reopened.get_metrics()["feature_cache_disk_bytes"] == os.path.getsize(tmp_path / "a.npy")
+
+
+def test_restart_with_a_smaller_limit_trims_the_disk_tier(tmp_path):
+    cache = FeatureCache(max_memory_bytes=0, disk_dir=str(tmp_path), max_disk_bytes=16 * KIB)
+    for key in "abc":
+        cache.put(key, entry(1.0))
+
+    FeatureCache(max_memory_bytes=0, disk_dir=str(tmp_path), max_disk_bytes=KIB + 512)
+    assert len(disk_files(tmp_path)) == 1
+
+
+def test_unreadable_disk_entries_are_dropped(tmp_path):
+    cache = FeatureCache(max_memory_bytes=0, disk_dir=str(tmp_path), max_disk_bytes=16 * KIB)
+    cache.put("a", entry(1.0))
+    (tmp_path / "a.npy").write_bytes(b"not an npy file")
+
+    assert cache.get("a") is None
+    assert disk_files(tmp_path) == set()
+    assert cache.get_metrics()["feature_cache_disk_bytes"] == 0
+
+
+@pytest.mark.parametrize("max_disk_bytes", [0, -1])
+def test_disk_tier_is_off_without_a_byte_budget(tmp_path, max_disk_bytes):
+    cache = FeatureCache(max_memory_bytes=KIB, disk_dir=str(tmp_path / "cache"), max_disk_bytes=max_disk_bytes)
+    cache.put("a", entry(1.0))
+    cache.put("b", entry(2.0))
+
+    assert not (tmp_path / "cache").exists()
+    assert cache.get("a") is None
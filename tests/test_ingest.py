@@ -0,0 +1,225 @@
+import asyncio
+from typing import List
+
+import numpy as np
+import pytest
+
+from backend.ingest import IngestFrame, SequenceTracker, SessionIngest
+
+SAMPLE_RATE = 16000
+EPOCH = 7
+
+
+def frame(seconds: float, sequence: int, language: str = "en") -> IngestFrame:
+    samples = np.full(int(seconds * SAMPLE_RATE), sequence, dtype=np.float32)
+    return IngestFrame(samples, SAMPLE_RATE, language, False, ((EPOCH, sequence),))
+
+
+def numbers(frame: IngestFrame):
+    """Sequence numbers of the frames making up a window"""
+    return tuple(sequence for _, sequence in frame.sequences)
+
+
+class TestSequenceTracker:
+    def test_duplicates_are_counted(self):
+        tracker = SequenceTracker()
+        assert tracker.mark((7, 1))
+        assert tracker.mark((7, 2))
+        assert not tracker.mark((7, 1))
+        assert tracker.duplicates == 1
+
+    def test_only_the_window_is_remembered(self):
+        tracker = SequenceTracker(window=3)
+        for sequence in range(4):
+            assert tracker.mark((7, sequence))
+        assert tracker.mark((7, 0))
+        assert not tracker.mark((7, 3))
+
+    def test_forgotten_frames_can_be_resent(self):
+        tracker = SequenceTracker()
+        tracker.mark((7, 5))
+        tracker.mark((7, 6))
+        tracker.forget([(7, 5), (7, 7)])
+        assert tracker.mark((7, 5))
+        assert not tracker.mark((7, 6))
+
+    def test_results_are_shared_by_coalesced_frames_and_bounded(self):
+        tracker = SequenceTracker(max_results=3)
+        tracker.mark((7, 1))
+        tracker.store_result([(7, 1), (7, 2)], "first")
+        assert tracker.result((7, 1)) == tracker.result((7, 2)) == "first"
+        tracker.store_result([(7, 3), (7, 4)], "second")
+        assert tracker.result((7, 1)) is None
+        assert tracker.result((7, 4)) == "second"
+        assert tracker.result((7, 99)) is None
+
+    def test_a_new_epoch_restarts_numbering(self):
+        tracker = SequenceTracker()
+        for sequence in range(3):
+            tracker.mark((7, sequence))
+        tracker.store_result([(7, 0)], "old")
+
+        # A reloaded client counts from 0 again under a fresh epoch
+        assert tracker.mark((8, 0))
+        assert tracker.mark((8, 1))
+        assert tracker.result((7, 0)) is None
+        assert not tracker.mark((8, 0))
+
+        # A window of the replaced epoch finishing late is not cached
+        tracker.store_result([(7, 2)], "late")
+        assert tracker.result((7, 2)) is None
+
+
+class Recorder:
+    def __init__(self):
+        self.windows: List[IngestFrame] = []
+        self.events: List[str] = []
+        self.dropped: List[IngestFrame] = []
+
+    async def handler(self, window: IngestFrame):
+        self.windows.append(window)
+
+    async def notify(self, event: str, queued_seconds: float):
+        self.events.append(event)
+
+
+@pytest.mark.asyncio
+async def test_compatible_frames_are_coalesced_into_windows():
+    recorder = Recorder()
+    ingest = SessionIngest("session", recorder.handler, recorder.notify, window_seconds=1.0, max_delay_seconds=0.05)
+    for sequence in range(5):
+        await ingest.put(frame(0.25, sequence))
+    await ingest.put(frame(0.25, 5, language="de"))
+    ingest.start()
+    await ingest.drain()
+    await ingest.stop()
+
+    assert [numbers(window) for window in recorder.windows] == [(0, 1, 2, 3), (4,), (5,)]
+    assert recorder.windows[0].seconds == pytest.approx(1.0)
+    np.testing.assert_array_equal(recorder.windows[0].samples[::4000], [0, 1, 2, 3])
+    assert recorder.windows[2].language == "de"
+    assert ingest.queued_seconds == pytest.approx(0.0)
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_reports_evicted_frames():
+    recorder = Recorder()
+    ingest = SessionIngest(
+        "session", recorder.handler, recorder.notify,
+        high_water_seconds=100.0, max_seconds=1.0, drop_policy="drop_oldest",
+        on_drop=recorder.dropped.append
+    )
+    for sequence in range(6):
+        await ingest.put(frame(0.25, sequence))
+
+    assert [numbers(dropped) for dropped in recorder.dropped] == [(0,), (1,)]
+    assert [numbers(queued) for queued in ingest.frames] == [(2,), (3,), (4,), (5,)]
+    assert ingest.dropped_seconds == pytest.approx(0.5)
+
+
+@pytest.mark.asyncio
+async def test_block_policy_waits_for_the_consumer():
+    recorder = Recorder()
+    ingest = SessionIngest(
+        "session", recorder.handler, recorder.notify,
+        window_seconds=0.5, max_delay_seconds=0.0, high_water_seconds=100.0, max_seconds=1.0
+    )
+    for sequence in range(4):
+        await ingest.put(frame(0.25, sequence))
+
+    blocked = asyncio.create_task(ingest.put(frame(0.25, 4)))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    ingest.start()
+    await asyncio.wait_for(blocked, 1.0)
+    await ingest.drain()
+    await ingest.stop()
+    assert [s for window in recorder.windows for s in numbers(window)] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_pause_and_resume_around_the_water_marks():
+    recorder = Recorder()
+    ingest = SessionIngest(
+        "session", recorder.handler, recorder.notify,
+        window_seconds=0.5, max_delay_seconds=0.0, high_water_seconds=1.0, low_water_seconds=0.25
+    )
+    for sequence in range(4):
+        await ingest.put(frame(0.25, sequence))
+    assert recorder.events == ["pause"]
+    assert ingest.paused
+
+    ingest.start()
+    await ingest.drain()
+    await ingest.stop()
+    assert recorder.events == ["pause", "resume"]
+    assert not ingest.paused
+
+
+@pytest.mark.asyncio
+async def test_handler_errors_do_not_stop_the_consumer():
+    recorder = Recorder()
+
+    async def handler(window: IngestFrame):
+        if numbers(window) == (0,):
+            raise RuntimeError("inference failed")
+        await recorder.handler(window)
+
+    ingest = SessionIngest("session", handler, recorder.notify, window_seconds=0.25, max_delay_seconds=0.0)
+    ingest.start()
+    await ingest.put(frame(0.25, 0))
+    await ingest.drain()
+    await ingest.put(frame(0.25, 1))
+    await ingest.drain()
+    await ingest.stop()
+    assert [numbers(window) for window in recorder.windows] == [(1,)]
+
+
+@pytest.mark.asyncio
+async def test_real_time_input_fills_whole_windows():
+    recorder = Recorder()
+    ingest = SessionIngest(
+        "session", recorder.handler, recorder.notify,
+        window_seconds=0.4, max_delay_seconds=0.1
+    )
+    ingest.start()
+    # 0.8 s of audio in 20 ms frames, sent at the pace it is recorded
+    for sequence in range(40):
+        await ingest.put(frame(0.02, sequence))
+        await asyncio.sleep(0.02)
+    await ingest.drain()
+    await ingest.stop()
+
+    assert [window.seconds for window in recorder.windows] == pytest.approx([0.4, 0.4])
+
+
+@pytest.mark.asyncio
+async def test_partial_window_is_flushed_when_input_pauses():
+    recorder = Recorder()
+    ingest = SessionIngest(
+        "session", recorder.handler, recorder.notify,
+        window_seconds=5.0, max_delay_seconds=0.05
+    )
+    ingest.start()
+    for sequence in range(3):
+        await ingest.put(frame(0.02, sequence))
+    await asyncio.sleep(0.3)
+
+    assert [numbers(window) for window in recorder.windows] == [(0, 1, 2)]
+    await ingest.stop()
+
+
+@pytest.mark.asyncio
+async def test_drain_flushes_a_partial_window_without_waiting():
+    recorder = Recorder()
+    ingest = SessionIngest(
+        "session", recorder.handler, recorder.notify,
+        window_seconds=5.0, max_delay_seconds=60.0
+    )
+    ingest.start()
+    await ingest.put(frame(0.25, 0))
+    await asyncio.wait_for(ingest.drain(), 1.0)
+    await ingest.stop()
+
+    assert [numbers(window) for window in recorder.windows] == [(0,)]
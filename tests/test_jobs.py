@@ -0,0 +1,168 @@
+import numpy as np
+import pytest
+from bson import ObjectId
+
+from backend.jobs import TranscriptionJobQueue
+from backend.models import SpeakerSegment
+
+SAMPLE_RATE = 16000
+
+
+class FakeSpeechProcessor:
+    sample_rate = SAMPLE_RATE
+
+    def __init__(self, segments=(), error=None):
+        self.segments = list(segments)
+        self.error = error
+        self.audio_lengths = []
+
+    async def process_long_audio(self, audio, sample_rate, language, progress=None):
+        self.audio_lengths.append(len(audio))
+        if self.error is not None:
+            raise self.error
+        if progress is not None:
+            progress(len(audio) / sample_rate, len(audio) / sample_rate)
+        return list(self.segments)
+
+
+class FakeJobRepo:
+    def __init__(self):
+        self.jobs = {}
+
+    async def create_job(self, job_data):
+        job_id = ObjectId()
+        self.jobs[str(job_id)] = {"_id": job_id, **job_data}
+        return str(job_id)
+
+    async def get_job(self, job_id):
+        job = self.jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def update_job(self, job_id, update_data):
+        self.jobs[job_id].update(update_data)
+
+
+class FakeTranscriptRepo:
+    """Upserts job segments by (job_id, job_index) like the real repository"""
+
+    def __init__(self):
+        self.segments = {}  # (job_id, job_index) -> stored segment
+        self.sessions = {}
+
+    async def add_job_segments(self, session_id, job_id, segments):
+        segment_ids = []
+        for index, segment in enumerate(segments):
+            stored = self.segments.setdefault(
+                (job_id, index), {"_id": ObjectId(), **segment, "session_id": session_id}
+            )
+            segment_ids.append(stored["_id"])
+        return segment_ids
+
+    async def update_session(self, session_id, update_data):
+        self.sessions.setdefault(session_id, {}).update(update_data)
+
+
+def segment(text: str, start: float) -> SpeakerSegment:
+    return SpeakerSegment(speaker_id="Speaker 1", start_time=start, end_time=start + 1.0, text=text, confidence=0.9)
+
+
+def make_queue(tmp_path, speech_processor):
+    notifications = []
+    published = []
+
+    async def notify(job):
+        notifications.append(job)
+
+    async def publish_segments(session_id, segment_ids, segments):
+        published.append((session_id, segment_ids, segments))
+
+    queue = TranscriptionJobQueue(
+        speech_processor,
+        FakeJobRepo(),
+        FakeTranscriptRepo(),
+        notify=notify,
+        publish_segments=publish_segments,
+        upload_dir=str(tmp_path),
+        progress_interval_seconds=60
+    )
+    return queue, notifications, published
+
+
+async def submit_upload(queue, tmp_path, seconds: float = 1.0) -> dict:
+    path = tmp_path / "upload.pcm"
+    path.write_bytes(np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16).tobytes())
+    job_id = await queue.submit("session-1", str(path), "upload.pcm", None)
+    return await queue.job_repo.get_job(job_id)
+
+
+@pytest.mark.asyncio
+async def test_completed_job_stores_and_publishes_its_segments(tmp_path):
+    segments = [segment("hello", 0.0), segment("world", 1.0)]
+    queue, notifications, published = make_queue(tmp_path, FakeSpeechProcessor(segments))
+    job = await submit_upload(queue, tmp_path)
+
+    await queue._run_job(job)
+
+    stored = [queue.transcript_repo.segments[(job["_id"], index)] for index in range(2)]
+    assert [s["text"] for s in stored] == ["hello", "world"]
+    assert published == [("session-1", [s["_id"] for s in stored], segments)]
+    assert notifications[-1]["state"] == "completed"
+    assert notifications[-1]["segments_added"] == 2
+    assert queue.transcript_repo.sessions["session-1"]["audio_file_path"] == "upload.pcm"
+    assert not (tmp_path / "upload.pcm").exists()
+
+
+@pytest.mark.asyncio
+async def test_uploads_are_decoded_as_raw_pcm_at_the_processor_rate(tmp_path):
+    speech_processor = FakeSpeechProcessor([segment("hello", 0.0)])
+    queue, _, _ = make_queue(tmp_path, speech_processor)
+    job = await submit_upload(queue, tmp_path, seconds=2.0)
+
+    await queue._run_job(job)
+
+    assert speech_processor.audio_lengths == [2 * SAMPLE_RATE]
+
+
+@pytest.mark.asyncio
+async def test_segment_ids_sort_after_segments_stored_before_the_job_finished(tmp_path):
+    queue, _, published = make_queue(tmp_path, FakeSpeechProcessor([segment("late", 0.0)]))
+    job = await submit_upload(queue, tmp_path)
+    # A live segment stored while the upload was being transcribed
+    live_segment_id = ObjectId()
+
+    await queue._run_job(job)
+
+    _, segment_ids, _ = published[0]
+    assert job["_id"] < live_segment_id < segment_ids[0]
+
+
+@pytest.mark.asyncio
+async def test_rerun_job_keeps_the_segments_of_its_first_run(tmp_path):
+    segments = [segment("hello", 0.0), segment("world", 1.0)]
+    queue, _, published = make_queue(tmp_path, FakeSpeechProcessor(segments))
+    job = await submit_upload(queue, tmp_path)
+    upload = (tmp_path / "upload.pcm").read_bytes()
+
+    await queue._run_job(job)
+    # Requeued after its worker died between storing and completing
+    (tmp_path / "upload.pcm").write_bytes(upload)
+    await queue._run_job(job)
+
+    assert len(queue.transcript_repo.segments) == 2
+    assert published[0][1] == published[1][1]
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_reported_and_its_upload_removed(tmp_path):
+    queue, notifications, published = make_queue(
+        tmp_path, FakeSpeechProcessor(error=RuntimeError("model exploded"))
+    )
+    job = await submit_upload(queue, tmp_path)
+
+    await queue._run_job(job)
+
+    assert notifications[-1]["state"] == "failed"
+    assert notifications[-1]["error"] == "model exploded"
+    assert published == []
+    assert queue.transcript_repo.segments == {}
+    assert not (tmp_path / "upload.pcm").exists()
@@ -0,0 +1,95 @@
+import numpy as np
+
+from backend.long_audio import AudioWindow, frame_energy, plan_windows, stitch_transcriptions
+
+SAMPLE_RATE = 16000
+FRAME = 480  # 30 ms
+
+
+def speech_with_pauses(seconds: float, pauses) -> np.ndarray:
+    """Noise standing in for speech, silent in the given (start, end) second ranges"""
+    audio = np.random.default_rng(0).uniform(-0.5, 0.5, int(seconds * SAMPLE_RATE)).astype(np.float32)
+    for start, end in pauses:
+        audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] = 0.0
+    return audio
+
+
+def test_short_recording_is_one_window():
+    audio = speech_with_pauses(20.0, [])
+    windows = plan_windows(len(audio), SAMPLE_RATE, frame_energy(audio, FRAME), FRAME)
+    assert windows == [AudioWindow(0, len(audio), 0, len(audio))]
+
+
+def test_windows_cover_the_recording_and_respect_the_limits():
+    audio = speech_with_pauses(300.0, [(23.0, 24.0), (70.0, 70.5), (130.0, 131.0)])
+    window_seconds, overlap_seconds = 28.0, 1.0
+    windows = plan_windows(
+        len(audio), SAMPLE_RATE, frame_energy(audio, FRAME), FRAME,
+        window_seconds=window_seconds, overlap_seconds=overlap_seconds
+    )
+
+    assert len(windows) > 1
+    assert windows[0].keep_start == 0
+    assert windows[-1].keep_end == len(audio)
+    for previous, window in zip(windows, windows[1:]):
+        # Keep ranges tile the recording and neighbours overlap around each cut
+        assert window.keep_start == previous.keep_end
+        assert window.start < previous.end
+    for window in windows:
+        assert window.start <= window.keep_start < window.keep_end <= window.end
+        assert window.end - window.start <= window_seconds * SAMPLE_RATE
+
+
+def test_cuts_are_placed_in_pauses():
+    audio = speech_with_pauses(50.0, [(23.0, 24.0)])
+    windows = plan_windows(len(audio), SAMPLE_RATE, frame_energy(audio, FRAME), FRAME)
+    assert len(windows) == 2
+    assert 23.0 * SAMPLE_RATE <= windows[0].keep_end <= 24.0 * SAMPLE_RATE
+
+
+def word(text: str, start: float, end: float) -> dict:
+    return {"word": text, "start": start, "end": end, "probability": 0.9}
+
+
+def test_stitch_keeps_overlap_words_once_and_shifts_times():
+    windows = [
+        AudioWindow(0, 10 * SAMPLE_RATE, 0, 9 * SAMPLE_RATE),
+        AudioWindow(8 * SAMPLE_RATE, 20 * SAMPLE_RATE, 9 * SAMPLE_RATE, 20 * SAMPLE_RATE),
+    ]
+    results = [
+        {"language": "en", "segments": [
+            {"start": 0.0, "end": 9.8, "text": " one two three",
+             "words": [word(" one", 0.0, 1.0), word(" two", 8.0, 8.8), word(" three", 9.2, 9.8)]},
+        ]},
+        {"language": "en", "segments": [
+            {"start": 0.2, "end": 4.0, "text": " two three four",
+             "words": [word(" two", 0.0, 0.8), word(" three", 1.2, 1.8), word(" four", 3.0, 4.0)]},
+        ]},
+    ]
+
+    stitched = stitch_transcriptions(list(zip(windows, results)), SAMPLE_RATE)
+
+    assert stitched["language"] == "en"
+    assert stitched["text"] == " one two three four"
+    assert [s["id"] for s in stitched["segments"]] == [0, 1]
+    second = stitched["segments"][1]
+    assert second["start"] == 9.2
+    assert second["end"] == 12.0
+
+
+def test_stitch_drops_words_repeated_across_the_cut():
+    windows = [
+        AudioWindow(0, 10 * SAMPLE_RATE, 0, 9 * SAMPLE_RATE),
+        AudioWindow(8 * SAMPLE_RATE, 20 * SAMPLE_RATE, 9 * SAMPLE_RATE, 20 * SAMPLE_RATE),
+    ]
+    results = [
+        {"segments": [{"start": 7.0, "end": 8.9, "text": " hello there",
+                       "words": [word(" hello", 7.0, 7.8), word(" there", 8.0, 8.9)]}]},
+        # Timestamps drifted: the repeat lands after the cut
+        {"segments": [{"start": 1.2, "end": 3.0, "text": " there friend",
+                       "words": [word(" there", 1.2, 1.8), word(" friend", 2.0, 3.0)]}]},
+    ]
+
+    stitched = stitch_transcriptions(list(zip(windows, results)), SAMPLE_RATE)
+
+    assert stitched["text"] == " hello there friend"
@@ -0,0 +1,51 @@
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+
+from backend import process_pool
+
+
+class FakeModel:
+    """Keeps the audio it was given, like tensors built from it would"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.audio = None
+
+    def transcribe(self, audio, **options):
+        self.audio = audio
+        if self.error is not None:
+            raise self.error
+        return {"text": f"{len(audio)} samples", "options": options}
+
+
+@pytest.fixture
+def shared_audio():
+    audio = np.linspace(-1.0, 1.0, 1600, dtype=np.float32)
+    shm = SharedMemory(create=True, size=audio.nbytes)
+    np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+    yield shm, audio
+    shm.close()
+    shm.unlink()
+
+
+def test_worker_transcribes_audio_from_shared_memory(monkeypatch, shared_audio):
+    shm, audio = shared_audio
+    model = FakeModel()
+    monkeypatch.setattr(process_pool, "_worker_model", model)
+
+    result = process_pool._transcribe_worker(shm.name, audio.shape, {"language": "en"})
+
+    assert result == {"text": "1600 samples", "options": {"language": "en"}}
+    np.testing.assert_array_equal(model.audio, audio)
+    # The model's reference does not pin the shared block
+    assert not np.shares_memory(model.audio, np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf))
+
+
+def test_worker_errors_are_not_masked_by_cleanup(monkeypatch, shared_audio):
+    shm, audio = shared_audio
+    monkeypatch.setattr(process_pool, "_worker_model", FakeModel(RuntimeError("decoder failed")))
+
+    with pytest.raises(RuntimeError, match="decoder failed"):
+        process_pool._transcribe_worker(shm.name, audio.shape, {})
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from scipy.signal import resample_poly
+
+from backend.resampler import StreamingResampler, resample
+
+RATES = [(44100, 16000), (48000, 16000), (22050, 16000), (8000, 16000)]
+
+
+def stream(resampler: StreamingResampler, audio: np.ndarray, chunk_sizes) -> np.ndarray:
+    """Feed audio through the resampler in chunks of the given sizes, cycling"""
+    out, pos, i = [], 0, 0
+    while pos < len(audio):
+        size = chunk_sizes[i % len(chunk_sizes)]
+        out.append(resampler.process(audio[pos:pos + size]))
+        pos += size
+        i += 1
+    out.append(resampler.flush())
+    return np.concatenate(out)
+
+
+@pytest.fixture
+def audio():
+    return np.random.default_rng(0).uniform(-1.0, 1.0, 20000).astype(np.float32)
+
+
+@pytest.mark.parametrize("orig_rate,target_rate", RATES)
+def test_resample_matches_resample_poly(audio, orig_rate, target_rate):
+    resampler = StreamingResampler(orig_rate, target_rate)
+    expected = resample_poly(audio, resampler.up, resampler.down)
+    result = resample(audio, orig_rate, target_rate)
+    assert result.dtype == np.float32
+    assert len(result) == len(expected)
+    np.testing.assert_allclose(result, expected, atol=1e-5)
+
+
+@pytest.mark.parametrize("orig_rate,target_rate", RATES)
+@pytest.mark.parametrize("chunk_sizes", [[1], [7], [160], [4410], [1, 333, 50, 4096]])
+def test_chunked_output_matches_one_piece(audio, orig_rate, target_rate, chunk_sizes):
+    resampler = StreamingResampler(orig_rate, target_rate)
+    expected = resample_poly(audio, resampler.up, resampler.down)
+    result = stream(resampler, audio, chunk_sizes)
+    assert len(result) == len(expected)
+    np.testing.assert_allclose(result, expected, atol=1e-5)
+
+
+def test_flush_resets_for_the_next_signal(audio):
+    resampler = StreamingResampler(48000, 16000)
+    first = stream(resampler, audio, [480])
+    second = stream(resampler, audio, [480])
+    np.testing.assert_array_equal(first, second)
+
+
+def test_equal_rates_pass_through(audio):
+    resampler = StreamingResampler(16000, 16000)
+    assert resampler.process(audio) is audio
+    assert len(resampler.flush()) == 0
@@ -0,0 +1,192 @@
+import asyncio
+
+import pytest
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from backend import segment_writer as segment_writer_module
+from backend.segment_writer import DUPLICATE_KEY_ERROR, SegmentWriteBuffer
+
+
+class FakeTranscriptRepo:
+    """Stores segments per session, failing the next calls with scripted errors.
+
+    Like an unordered insert_many, segments whose _id is already stored are
+    reported as duplicate keys after the others are inserted.
+    """
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.stored = {}
+        self.calls = 0
+
+    async def add_segments(self, session_id, segments):
+        self.calls += 1
+        if self.errors:
+            error = self.errors.pop(0)
+            if error is not None:
+                raise error
+        stored = self.stored.setdefault(session_id, [])
+        known = {segment["_id"] for segment in stored}
+        duplicates = [i for i, segment in enumerate(segments) if segment["_id"] in known]
+        stored.extend(segment for segment in segments if segment["_id"] not in known)
+        if duplicates:
+            raise BulkWriteError({
+                "writeErrors": [{"index": i, "code": DUPLICATE_KEY_ERROR} for i in duplicates],
+                "writeConcernErrors": []
+            })
+        return [segment["_id"] for segment in segments]
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+
+    async def fake_sleep(seconds):
+        recorded.append(seconds)
+
+    monkeypatch.setattr(segment_writer_module.asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+def make_buffer(repo, **kwargs):
+    kwargs.setdefault("retry_backoff_seconds", 0.5)
+    return SegmentWriteBuffer(repo, **kwargs)
+
+
+def duplicate_error(count=1, write_concern_errors=()):
+    return BulkWriteError({
+        "writeErrors": [{"index": i, "code": DUPLICATE_KEY_ERROR} for i in range(count)],
+        "writeConcernErrors": list(write_concern_errors)
+    })
+
+
+@pytest.mark.asyncio
+async def test_add_returns_ids_at_once_and_flush_writes_by_session():
+    repo = FakeTranscriptRepo()
+    buffer = make_buffer(repo)
+
+    ids = buffer.add("a", [{"text": "one"}, {"text": "two"}])
+    buffer.add("b", [{"text": "three"}])
+
+    assert len(ids) == 2
+    assert repo.calls == 0
+    assert buffer.queue_depth == 3
+
+    await buffer.flush()
+
+    assert [segment["_id"] for segment in repo.stored["a"]] == ids
+    assert [segment["text"] for segment in repo.stored["b"]] == ["three"]
+    assert buffer.queue_depth == 0
+    assert buffer.get_metrics()["segments_written"] == 3
+
+
+@pytest.mark.asyncio
+async def test_flush_splits_the_queue_into_batches():
+    repo = FakeTranscriptRepo()
+    buffer = make_buffer(repo, max_batch=2)
+
+    buffer.add("a", [{"text": str(i)} for i in range(5)])
+    await buffer.flush()
+
+    assert repo.calls == 3
+    assert [segment["text"] for segment in repo.stored["a"]] == ["0", "1", "2", "3", "4"]
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_with_backoff(sleeps):
+    repo = FakeTranscriptRepo(errors=[PyMongoError("down"), PyMongoError("down")])
+    buffer = make_buffer(repo)
+
+    buffer.add("a", [{"text": "one"}])
+    await buffer.flush()
+
+    assert sleeps == [0.5, 1.0]
+    assert len(repo.stored["a"]) == 1
+    assert buffer.get_metrics()["segment_write_retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_duplicate_keys_from_an_earlier_attempt_count_as_written(sleeps):
+    repo = FakeTranscriptRepo(errors=[duplicate_error(count=2)])
+    buffer = make_buffer(repo)
+
+    buffer.add("a", [{"text": "one"}, {"text": "two"}])
+    await buffer.flush()
+
+    assert repo.calls == 1
+    assert sleeps == []
+    assert buffer.queue_depth == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [
+    duplicate_error(count=0),
+    duplicate_error(count=1, write_concern_errors=[{"code": 64, "errmsg": "waiting for replication timed out"}]),
+    BulkWriteError({"writeErrors": [{"index": 0, "code": 121}], "writeConcernErrors": []})
+])
+async def test_other_bulk_write_errors_are_retried(sleeps, error):
+    repo = FakeTranscriptRepo(errors=[error])
+    buffer = make_buffer(repo)
+
+    buffer.add("a", [{"text": "one"}])
+    await buffer.flush()
+
+    assert repo.calls == 2
+    assert sleeps == [0.5]
+    assert len(repo.stored["a"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_segments_stay_queued_in_order_when_retries_run_out(sleeps):
+    repo = FakeTranscriptRepo(errors=[PyMongoError("down")] * 3)
+    buffer = make_buffer(repo, max_retries=2)
+
+    ids = buffer.add("a", [{"text": "one"}, {"text": "two"}])
+    await buffer.flush()
+
+    assert repo.stored == {}
+    assert buffer.queue_depth == 2
+    assert buffer.get_metrics()["segment_flush_failures"] == 1
+
+    later = buffer.add("a", [{"text": "three"}])
+    await buffer.flush()
+
+    assert [segment["_id"] for segment in repo.stored["a"]] == ids + later
+
+
+@pytest.mark.asyncio
+async def test_a_failing_session_does_not_hold_back_others(sleeps):
+    class PerSessionRepo(FakeTranscriptRepo):
+        async def add_segments(self, session_id, segments):
+            if session_id == "bad":
+                raise PyMongoError("down")
+            return await super().add_segments(session_id, segments)
+
+    repo = PerSessionRepo()
+    buffer = make_buffer(repo, max_retries=0)
+
+    buffer.add("bad", [{"text": "retried"}])
+    buffer.add("good", [{"text": "kept"}])
+    await buffer.flush()
+
+    assert [segment["text"] for segment in repo.stored["good"]] == ["kept"]
+    assert buffer.queue_depth == 1
+
+
+@pytest.mark.asyncio
+async def test_full_batch_wakes_the_flush_task_and_stop_drains():
+    repo = FakeTranscriptRepo()
+    buffer = make_buffer(repo, max_batch=2, flush_interval_seconds=60)
+    buffer.start()
+
+    buffer.add("a", [{"text": "one"}, {"text": "two"}])
+    for _ in range(100):
+        if repo.calls:
+            break
+        await asyncio.sleep(0)
+    assert len(repo.stored["a"]) == 2
+
+    buffer.add("a", [{"text": "three"}])
+    await buffer.stop()
+
+    assert [segment["text"] for segment in repo.stored["a"]] == ["one", "two", "three"]
@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+
+from backend.speaker_index import (
+    ExactSpeakerIndex,
+    IVFSpeakerIndex,
+    SpeakerIndex,
+    create_speaker_index,
+    normalize_embeddings,
+)
+
+DIM = 32
+
+
+@pytest.fixture
+def embeddings():
+    return normalize_embeddings(np.random.default_rng(0).normal(size=(200, DIM)))
+
+
+def enroll(index, embeddings):
+    for i, embedding in enumerate(embeddings):
+        index.add(f"speaker_{i}", embedding)
+    return index
+
+
+def test_exact_search_finds_the_enrolled_speaker(embeddings):
+    index = enroll(ExactSpeakerIndex(), embeddings)
+    results = index.search(embeddings[:5] * 3.0, k=2)
+    for i, candidates in enumerate(results):
+        assert len(candidates) == 2
+        assert candidates[0][0] == f"speaker_{i}"
+        assert candidates[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert candidates[0][1] >= candidates[1][1]
+
+
+def test_ivf_trains_once_enough_speakers_are_enrolled(embeddings):
+    index = IVFSpeakerIndex(nlist=4, nprobe=2)
+    enroll(index, embeddings[:31])
+    assert not index.trained
+    enroll(index, embeddings[:32])
+    assert index.trained
+    assert sum(len(members) for members in index._lists) == 32
+
+
+def test_ivf_probing_every_list_matches_exact_search(embeddings):
+    exact = enroll(ExactSpeakerIndex(), embeddings)
+    ivf = enroll(IVFSpeakerIndex(nlist=8, nprobe=8), embeddings)
+    assert ivf.trained
+
+    queries = np.random.default_rng(1).normal(size=(20, DIM))
+    for expected, result in zip(exact.search(queries, k=3), ivf.search(queries, k=3)):
+        assert [name for name, _ in result] == [name for name, _ in expected]
+        np.testing.assert_allclose([s for _, s in result], [s for _, s in expected], atol=1e-5)
+
+
+def test_ivf_finds_enrolled_speakers_with_few_probes(embeddings):
+    ivf = enroll(IVFSpeakerIndex(nlist=8, nprobe=2), embeddings)
+    results = ivf.search(embeddings, k=1)
+    assert [candidates[0][0] for candidates in results] == [f"speaker_{i}" for i in range(len(embeddings))]
+
+
+@pytest.mark.parametrize("index_class", [ExactSpeakerIndex, IVFSpeakerIndex])
+def test_remove_and_replace(index_class, embeddings):
+    index = enroll(index_class(nlist=4) if index_class is IVFSpeakerIndex else index_class(), embeddings[:40])
+    index.remove("speaker_3")
+    assert "speaker_3" not in index
+    assert len(index) == 39
+    assert all(candidates[0][0] != "speaker_3" for candidates in index.search(embeddings[3], k=5))
+
+    # The freed slot is reused
+    index.add("newcomer", embeddings[3])
+    assert len(index._slot_names) == 40
+    assert index.search(embeddings[3])[0][0][0] == "newcomer"
+
+    index.add("speaker_0", embeddings[1])
+    np.testing.assert_allclose(index["speaker_0"], embeddings[1], atol=1e-6)
+
+
+@pytest.mark.parametrize("backend", ["exact", "ivf"])
+def test_save_and_load_round_trip(backend, embeddings, tmp_path):
+    kwargs = {"nlist": 4, "nprobe": 2} if backend == "ivf" else {}
+    index = enroll(create_speaker_index(backend, **kwargs), embeddings[:50])
+    index.remove("speaker_7")
+    path = str(tmp_path / "index" / "speakers.npz")
+    index.save(path)
+
+    loaded = create_speaker_index(backend, **kwargs)
+    assert loaded.load(path)
+    assert set(loaded) == set(index)
+    assert loaded.search(embeddings[:10], k=3) == index.search(embeddings[:10], k=3)
+
+
+def test_load_ignores_another_backend(embeddings, tmp_path):
+    path = str(tmp_path / "speakers.npz")
+    enroll(ExactSpeakerIndex(), embeddings[:5]).save(path)
+    assert not IVFSpeakerIndex().load(path)
+    assert not ExactSpeakerIndex().load(str(tmp_path / "missing.npz"))
+
+
+def test_dimension_mismatch_is_rejected(embeddings):
+    index = enroll(ExactSpeakerIndex(), embeddings[:1])
+    with pytest.raises(ValueError):
+        index.add("other", np.ones(DIM + 1))
+
+
+def test_empty_index_returns_no_candidates(embeddings):
+    assert ExactSpeakerIndex().search(embeddings[:2]) == [[], []]
+    assert IVFSpeakerIndex().search(embeddings[:2]) == [[], []]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_speaker_index("annoy")
+
+
+def test_incomplete_backend_fails_on_creation():
+    class SearchOnly(SpeakerIndex):
+        def search(self, embeddings, k=1):
+            return []
+
+    with pytest.raises(TypeError):
+        SearchOnly()
+
+
+def test_untrained_ivf_index_trains_on_load(embeddings, tmp_path):
+    path = str(tmp_path / "speakers.npz")
+    saved = enroll(IVFSpeakerIndex(nlist=64), embeddings[:100])
+    assert not saved.trained
+    saved.save(path)
+
+    loaded = IVFSpeakerIndex(nlist=4, nprobe=4)
+    assert loaded.load(path)
+    assert loaded.trained
+    assert sum(len(members) for members in loaded._lists) == 100
+    assert loaded.search(embeddings[:3])[0][0][0] == "speaker_0"
@@ -0,0 +1,178 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from pymongo.errors import OperationFailure, PyMongoError
+
+from backend import speaker_sync as speaker_sync_module
+from backend.config import settings
+from backend.speaker_index import ExactSpeakerIndex
+from backend.speaker_sync import SpeakerSync
+
+DIM = 8
+
+# Tests wait with the real sleep; speaker_sync's backoff sleeps are recorded instead
+real_sleep = asyncio.sleep
+
+
+def speaker(speaker_id: str, name: str, seed: int) -> dict:
+    embedding = np.random.default_rng(seed).normal(size=DIM).tolist()
+    return {"_id": speaker_id, "name": name, "voice_embedding": embedding}
+
+
+class FakeChangeStream:
+    """Yields scripted changes, raising exceptions among them, then waits"""
+
+    def __init__(self, changes=(), error_on_open=None):
+        self.changes = list(changes)
+        self.error_on_open = error_on_open
+
+    async def __aenter__(self):
+        if self.error_on_open is not None:
+            raise self.error_on_open
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for change in self.changes:
+            if isinstance(change, Exception):
+                raise change
+            yield change
+        await asyncio.Event().wait()
+
+
+class FakeSpeakerRepo:
+    def __init__(self, speakers, streams=()):
+        self.speakers = {s["_id"]: s for s in speakers}
+        self.streams = list(streams)
+        self.fetched = []
+
+    async def iter_speaker_names(self, batch_size: int = 1000):
+        for s in list(self.speakers.values()):
+            yield {"_id": s["_id"], "name": s["name"]}
+
+    async def iter_voice_embeddings(self, speaker_ids, batch_size: int = 1000):
+        self.fetched.extend(speaker_ids)
+        for speaker_id in speaker_ids:
+            if speaker_id in self.speakers:
+                yield self.speakers[speaker_id]
+
+    def watch(self):
+        return self.streams.pop(0) if self.streams else FakeChangeStream()
+
+
+async def wait_until(condition, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await real_sleep(0.01)
+
+
+@pytest.fixture
+def sync_settings(monkeypatch):
+    monkeypatch.setattr(settings, "speaker_sync_mode", "auto")
+    monkeypatch.setattr(settings, "speaker_sync_poll_seconds", 0.05)
+    monkeypatch.setattr(settings, "speaker_sync_retry_max_seconds", 60.0)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays without waiting them out"""
+    delays = []
+
+    async def fake_sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(speaker_sync_module.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def make_sync(repo: FakeSpeakerRepo) -> SpeakerSync:
+    return SpeakerSync(SimpleNamespace(known_speakers=ExactSpeakerIndex()), repo)
+
+
+@pytest.mark.asyncio
+async def test_load_fetches_only_missing_embeddings_and_drops_deleted(sync_settings):
+    repo = FakeSpeakerRepo([speaker("a", "alice", 1), speaker("b", "bob", 2)])
+    sync = make_sync(repo)
+    index = sync.speech_processor.known_speakers
+    index.add("alice", np.ones(DIM))
+    index.add("ghost", np.ones(DIM))
+
+    await sync.load()
+
+    assert set(index) == {"alice", "bob"}
+    assert repo.fetched == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_change_stream_applies_inserts_renames_and_deletes(sync_settings):
+    changes = [
+        {"operationType": "insert", "fullDocument": speaker("c", "carol", 3)},
+        {"operationType": "update", "fullDocument": speaker("b", "robert", 2)},
+        {"operationType": "delete", "documentKey": {"_id": "a"}},
+    ]
+    repo = FakeSpeakerRepo([speaker("a", "alice", 1), speaker("b", "bob", 2)], [FakeChangeStream(changes)])
+    sync = make_sync(repo)
+    await sync.load()
+
+    sync.start()
+    index = sync.speech_processor.known_speakers
+    await wait_until(lambda: set(index) == {"robert", "carol"})
+    await sync.stop()
+
+
+@pytest.mark.asyncio
+async def test_speaker_added_before_the_stream_opens_is_not_missed(sync_settings):
+    repo = FakeSpeakerRepo([speaker("a", "alice", 1)])
+    sync = make_sync(repo)
+    await sync.load()
+    repo.speakers["d"] = speaker("d", "dave", 4)
+
+    sync.start()
+    index = sync.speech_processor.known_speakers
+    await wait_until(lambda: "dave" in index)
+    await sync.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_stream_is_reopened_with_backoff(sync_settings, sleeps):
+    streams = [
+        FakeChangeStream(error_on_open=PyMongoError("connection reset")),
+        FakeChangeStream(error_on_open=PyMongoError("connection reset")),
+        FakeChangeStream([PyMongoError("cursor killed")]),
+        FakeChangeStream([{"operationType": "insert", "fullDocument": speaker("c", "carol", 3)}]),
+    ]
+    repo = FakeSpeakerRepo([speaker("a", "alice", 1)], streams)
+    sync = make_sync(repo)
+    await sync.load()
+    repo.speakers["b"] = speaker("b", "bob", 2)
+
+    sync.start()
+    index = sync.speech_processor.known_speakers
+    await wait_until(lambda: set(index) == {"alice", "bob", "carol"})
+    await sync.stop()
+    # Doubling while the stream cannot open, reset once it did
+    assert sleeps == [1.0, 2.0, 1.0]
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_polling_without_change_streams(sync_settings):
+    streams = [FakeChangeStream(error_on_open=OperationFailure("The $changeStream stage is only supported on replica sets"))]
+    repo = FakeSpeakerRepo([speaker("a", "alice", 1)], streams)
+    sync = make_sync(repo)
+    await sync.load()
+
+    sync.start()
+    repo.speakers["b"] = speaker("b", "bob", 2)
+    del repo.speakers["a"]
+    index = sync.speech_processor.known_speakers
+    await wait_until(lambda: set(index) == {"bob"})
+    await sync.stop()
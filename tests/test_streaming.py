@@ -0,0 +1,114 @@
+import numpy as np
+
+from backend.streaming import AudioRingBuffer, StreamingSession
+
+SAMPLE_RATE = 100
+
+
+def ramp(start: int, count: int) -> np.ndarray:
+    return np.arange(start, start + count, dtype=np.float32)
+
+
+def word(text: str, start: float, end: float) -> dict:
+    return {"word": text, "start": start, "end": end, "probability": 0.9}
+
+
+class TestAudioRingBuffer:
+    def test_read_across_the_wrap(self):
+        ring = AudioRingBuffer(10)
+        ring.append(ramp(0, 7))
+        ring.append(ramp(7, 6))
+        assert ring.total_written == 13
+        assert ring.oldest_index == 3
+        np.testing.assert_array_equal(ring.read_from(5), ramp(5, 8))
+
+    def test_read_before_the_oldest_sample_is_clamped(self):
+        ring = AudioRingBuffer(10)
+        ring.append(ramp(0, 25))
+        np.testing.assert_array_equal(ring.read_from(0), ramp(15, 10))
+
+    def test_append_larger_than_capacity_keeps_the_newest_samples(self):
+        ring = AudioRingBuffer(10)
+        ring.append(ramp(0, 3))
+        ring.append(ramp(3, 24))
+        assert ring.total_written == 27
+        np.testing.assert_array_equal(ring.read_from(ring.oldest_index), ramp(17, 10))
+
+    def test_read_returns_a_copy(self):
+        ring = AudioRingBuffer(10)
+        ring.append(ramp(0, 5))
+        chunk = ring.read_from(0)
+        ring.append(ramp(5, 10))
+        np.testing.assert_array_equal(chunk, ramp(0, 5))
+
+    def test_read_past_the_end_is_empty(self):
+        ring = AudioRingBuffer(10)
+        ring.append(ramp(0, 5))
+        assert len(ring.read_from(5)) == 0
+
+
+class TestLocalAgreement:
+    def make_session(self) -> StreamingSession:
+        return StreamingSession(SAMPLE_RATE, window_seconds=10.0, min_step_seconds=1.0)
+
+    def test_words_commit_once_two_hypotheses_agree(self):
+        session = self.make_session()
+        session.insert_audio(np.zeros(200, dtype=np.float32))
+
+        committed, partial = session.update([word(" hello", 0.0, 0.5), word(" wor", 0.6, 1.0)])
+        assert committed == []
+        assert [w["word"] for w in partial] == [" hello", " wor"]
+
+        committed, partial = session.update([word(" Hello", 0.0, 0.5), word(" world", 0.6, 1.2)])
+        assert [w["word"] for w in committed] == [" Hello"]
+        assert [w["word"] for w in partial] == [" world"]
+        assert session.prompt() == " Hello"
+        # The window moves past the committed word
+        assert session.window_start == 50
+
+    def test_flush_commits_pending_words(self):
+        session = self.make_session()
+        session.insert_audio(np.zeros(200, dtype=np.float32))
+        session.update([word(" hi", 0.0, 0.4)])
+        assert [w["word"] for w in session.flush()] == [" hi"]
+        assert session.flush() == []
+        assert session.prompt() == " hi"
+
+    def test_full_window_without_agreement_forces_a_commit(self):
+        session = self.make_session()
+        session.insert_audio(np.zeros(500, dtype=np.float32))
+        assert session.update([word(" a", 0.0, 1.0)]) == ([], [word(" a", 0.0, 1.0)])
+        session.insert_audio(np.zeros(500, dtype=np.float32))
+        committed, partial = session.update([word(" b", 0.0, 1.0), word(" c", 1.0, 9.0)])
+        assert [w["word"] for w in committed] == [" b", " c"]
+        assert partial == []
+        assert session.window_start == 900
+
+    def test_ready_after_min_step(self):
+        session = self.make_session()
+        session.insert_audio(np.zeros(50, dtype=np.float32))
+        assert not session.ready()
+        session.insert_audio(np.zeros(50, dtype=np.float32))
+        assert session.ready()
+        audio, start = session.window()
+        assert len(audio) == 100 and start == 0.0
+        assert not session.ready()
+
+    def test_skip_silence_only_without_pending_words(self):
+        session = self.make_session()
+        session.insert_audio(np.zeros(100, dtype=np.float32))
+        session.window()
+        session.insert_audio(np.zeros(100, dtype=np.float32))
+        assert session.skip_silence(100)
+        assert session.window_start == 200
+
+        session.insert_audio(np.zeros(100, dtype=np.float32))
+        session.update([word(" pending", 2.0, 2.5)])
+        session.insert_audio(np.zeros(100, dtype=np.float32))
+        assert not session.skip_silence(100)
+
+    def test_extract_words_applies_the_offset(self):
+        transcription = {"segments": [{"words": [{"word": " x", "start": 0.5, "end": 1.0}]}]}
+        assert StreamingSession.extract_words(transcription, 2.0) == [
+            {"word": " x", "start": 2.5, "end": 3.0, "probability": 0.0}
+        ]